@@ -0,0 +1,4549 @@
+import os
+import sys
+import codecs
+import io
+import struct
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager, nullcontext
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, chain, islice
+from operator import add
+
+# Size of the blocks used when streaming file contents
+READ_BLOCK_SIZE = 64 * 1024
+
+# Files smaller than this are scanned directly instead of through a LineIndex
+LINE_INDEX_MIN_SIZE = 1024 * 1024
+
+# Seconds between checks of followed files when inotify is unavailable
+FOLLOW_POLL_INTERVAL = 0.5
+
+# Buffered appends (see AppendBuffer): open append handles kept, pending bytes
+# that trigger a flush and the longest time a line stays pending
+APPEND_MAX_HANDLES = 64
+APPEND_FLUSH_SIZE = 1024 * 1024
+APPEND_FLUSH_DELAY = 1.0
+
+# Largest piece of command output sent in one message by guyOS --serve
+SERVE_CHUNK_SIZE = 64 * 1024
+
+# Commands that report through the daemon's own stdout and are refused over --serve
+SERVE_UNSUPPORTED = {"jobs", "wait", "kill", "parallel"}
+
+# Linux ioctl making a file share (reflink) the data blocks of another
+FICLONE = 0x40049409
+
+# Unchanged ranges at least this long are copied inside the kernel when a file
+# is rewritten; shorter ones go through a buffer of REWRITE_BUFFER_SIZE bytes
+REWRITE_COPY_MIN = 256 * 1024
+REWRITE_BUFFER_SIZE = 1024 * 1024
+
+# cp/mv: bytes copied between progress updates, threads copying a tree and
+# seconds between progress readouts
+COPY_PIECE_SIZE = 64 * 1024 * 1024
+COPY_WORKERS = 8
+COPY_PROGRESS_INTERVAL = 0.5
+
+# Wall times kept per command for the percentiles of 'stats'. Beyond this,
+# reservoir sampling picks which to keep, so a long-running daemon stays bounded.
+PROFILE_MAX_SAMPLES = 10000
+
+# Most milliseconds from starting 'python guyOS.py' to its first prompt (--startup-profile)
+STARTUP_BUDGET_MS = 20
+
+# The script that starts guyOS; it imports this module, which is then loaded from
+# cached bytecode
+LAUNCHER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "guyOS.py")
+
+# Larger files are left out of the full-text index
+TEXT_INDEX_MAX_FILE_SIZE = 64 * 1024 * 1024
+
+# Files smaller than this are counted and searched without a process pool
+PARALLEL_MIN_SIZE = 32 * 1024 * 1024
+
+# Upper bound for the piece of a file a single worker decodes at once
+PARALLEL_CHUNK_SIZE = 16 * 1024 * 1024
+
+LS_USAGE = "Usage: ls [--sort name|size|time] [--reverse] [--limit N] [--offset N]"
+
+READ_USAGE = ("Usage: read {directory} {filename} [modifiers]\n"
+              "       read -lines {directory} {filename} {start} {end}\n"
+              "       read -tail {directory} {filename} {lines}\n"
+              "       read -head {directory} {filename} {lines}\n"
+              "       read -count {directory} {filename} [--jobs N]\n"
+              "       read -follow {directory} {filename} [{directory} {filename} ...]")
+
+WRITE_USAGE = ("Usage: write {directory} {filename} {content}\n"
+               "       write -add {directory} {filename} {content}\n"
+               "       write -line {directory} {filename} {line_number} {content}\n"
+               "       write -replace {directory} {filename} {old_text} {new_text}\n"
+               "       write -insert {directory} {filename} {line_number} {content}")
+
+FIND_USAGE = ("Usage: find [directory] [-name {pattern}] [-type f|d] [-size [+|-]{size}] "
+              "[-mtime [+|-]{days}] [--max-count N]")
+
+GREP_USAGE = "Usage: grep [-r] [-i] [--max-count N] [--jobs N] {pattern} [path ...]"
+
+CP_USAGE = "Usage: cp [-r] {source} {destination}"
+
+MV_USAGE = "Usage: mv {source} {destination}"
+
+PARALLEL_USAGE = ("Usage: parallel [-j N] guython {script} [script ...]\n"
+                  "       parallel [-j N] count {directory} {filename} [filename ...]")
+
+# Built once at import; help() only adds the lines of plugin commands
+HELP_TEXT = """guyOS Commands:
+===============
+
+ls [--sort name|size|time] [--reverse] [--limit N] [--offset N] - List REAL directory contents
+cd {directory}              - Change to REAL directory (use '..' for parent directory)
+read {directory} {filename} - Read a REAL file (directory can be empty for current dir)
+read -lines {directory} {filename} {start} {end} - Read specific lines from file
+read -tail {directory} {filename} {lines} - Read last N lines from file
+read -head {directory} {filename} {lines} - Read first N lines from file
+read -count {directory} {filename} [--jobs N] - Show file statistics (lines, words, characters)
+read -follow {directory} {filename} [...] - Print lines as they are appended to one or more files
+write {directory} {filename} {content} - Write to a REAL file (overwrites existing)
+write -add {directory} {filename} {content} - Add content to a REAL file on new line
+write -line {directory} {filename} {line_number} {content} - Replace specific line
+write -replace {directory} {filename} {old_text} {new_text} - Replace text in file
+write -insert {directory} {filename} {line_number} {content} - Insert line at position
+cp [-r] {source} {destination} - Copy files or directory trees (binary safe)
+mv {source} {destination}    - Move or rename files and directories
+find [directory] [-name {pattern}] [-type f|d] [-size [+|-]{size}] [-mtime [+|-]{days}] - Find files in a directory tree
+grep [-r] [-i] [--max-count N] {pattern} [path ...] - Search files for a regular expression
+sync                        - Write out buffered appends and fsync the files they went to
+index [--rebuild]            - Build or update the full-text index of the current directory tree
+search {word} [word ...] [--limit N] - Find lines containing every word using the index
+{command} | grep [-i] [-v] {pattern} | head [N] | tail [N] | count - Filter the lines of a command's output
+guython {script_file.gy/.guy} [args] - Execute Guython script file (.gy or .guy)
+guython -c "code"           - Execute Guython code directly
+guython --stream [--tee {file}] {script_file} [args] - Show Guython output while it runs
+{command} &                 - Run a command as a background job
+jobs                        - List background jobs
+wait [job_id ...]           - Wait for background jobs to finish
+kill {job_id} [job_id ...]  - Stop background jobs
+parallel [-j N] guython {script} [script ...] - Run Guython scripts side by side
+parallel [-j N] count {directory} {filename} [filename ...] - Count several files side by side
+time {command} [args]       - Run a command and show its time, I/O and memory use
+stats                       - Show per-command timing percentiles for this session
+ver                         - Show version information
+help                        - Show this help message
+pwd                         - Show current REAL directory
+exit                        - Exit guyOS"""
+
+# Commands that change or inspect the shell itself and cannot run as jobs
+FOREGROUND_COMMANDS = {"cd", "exit", "jobs", "wait", "kill"}
+
+# Results starting with one of these mark a failed command in batch mode
+# (commands whose failure does not show in the text return a CommandFailure)
+BATCH_FAILURE_PREFIXES = ("Error", "Usage:", "Unknown command:")
+
+GUYTHON_USAGE = ("Usage: guython {script_file.gy/.guy} [args]\n"
+                 "       guython -c \"code to execute\"\n"
+                 "       guython --stream [--tee {file}] {script_file.gy/.guy} [args]")
+
+# Lines of stderr kept for the summary of a streamed guython run
+GUYTHON_TAIL_LINES = 20
+
+
+class CommandFailure(str):
+    """Command output that marks its command as failed whatever the text says
+    
+    Handlers return one, or yield one as a chunk of their output, when the
+    failure cannot be told from BATCH_FAILURE_PREFIXES, such as a Guython
+    script that exits with a non-zero code.
+    """
+    
+    def __new__(cls, text, returncode=1):
+        failure = super().__new__(cls, text)
+        failure.returncode = returncode
+        return failure
+
+
+# Leading bytes of the compressed formats read transparently (gzip with its
+# deflate method byte). A bz2 header is 'BZh', the block size ('1'-'9') and the
+# magic of the first block or, for an empty stream, of the end of the stream.
+COMPRESSION_MAGIC = (
+    (b'\x1f\x8b\x08', 'gzip'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+)
+BZ2_BLOCK_MAGIC = (b'1AY&SY', b'\x17rE8P\x90')
+
+
+def _compression(file_path):
+    """Return the compressed format of a file ('gzip', 'bz2', 'xz' or 'zstd'), or None
+    
+    A file whose header matches is only taken as compressed once the start
+    of it decompresses, so text that happens to begin like a header stays
+    plain text.
+    """
+    with open(file_path, 'rb') as f:
+        head = f.read(10)
+    compression = next((name for magic, name in COMPRESSION_MAGIC if head.startswith(magic)), None)
+    if compression is None and head[:3] == b'BZh' and b'1' <= head[3:4] <= b'9' and head[4:] in BZ2_BLOCK_MAGIC:
+        compression = 'bz2'
+    if compression is None:
+        return None
+    stream = _open_compressed(file_path, compression)
+    try:
+        with stream:
+            stream.read(1)
+    except Exception:
+        return None
+    return compression
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise OSError("the 'zstandard' package is needed for zstd-compressed files") from None
+    return zstandard
+
+
+def _open_compressed(file_path, compression):
+    """Open a compressed file as a stream of its decompressed bytes"""
+    if compression == 'gzip':
+        import gzip
+        return gzip.open(file_path, 'rb')
+    if compression == 'bz2':
+        import bz2
+        return bz2.open(file_path, 'rb')
+    if compression == 'xz':
+        import lzma
+        return lzma.open(file_path, 'rb')
+    return _zstandard().open(file_path, 'rb')
+
+
+def _compress(data, compression):
+    """Compress data as one self-contained member/stream/frame of the given format"""
+    if compression == 'gzip':
+        import gzip
+        return gzip.compress(data)
+    if compression == 'bz2':
+        import bz2
+        return bz2.compress(data)
+    if compression == 'xz':
+        import lzma
+        return lzma.compress(data)
+    return _zstandard().ZstdCompressor().compress(data)
+
+
+def _open_text(file_path, compression=None):
+    """Open a file for streaming text reads, decompressing it on the fly if compression is set"""
+    if compression:
+        return io.TextIOWrapper(_open_compressed(file_path, compression), encoding='utf-8', errors='replace')
+    return open(file_path, 'r', encoding='utf-8', errors='replace')
+
+
+def _count_stream(f):
+    """Return (lines, words, characters) of a text stream, reading it block by block"""
+    lines = words = chars = 0
+    last = ""
+    while True:
+        text = f.read(READ_BLOCK_SIZE)
+        if not text:
+            break
+        lines += text.count('\n')
+        words += len(text.split())
+        if last and not last.isspace() and not text[0].isspace():
+            # A word split across two blocks was counted twice
+            words -= 1
+        chars += len(text)
+        last = text[-1]
+    if last and last != '\n':
+        lines += 1
+    return lines, words, chars
+
+
+def _decode_line(raw):
+    """Decode a raw line the way text mode would (utf-8, universal newlines)"""
+    line = raw.decode('utf-8', errors='replace')
+    if line.endswith('\r\n'):
+        return line[:-2] + '\n'
+    if line.endswith('\r'):
+        return line[:-1] + '\n'
+    return line
+
+
+def _tail_lines(file_path, num_lines, block_size=READ_BLOCK_SIZE):
+    """Return the last num_lines lines of a file, seeking backwards from EOF"""
+    if num_lines <= 0:
+        return []
+    blocks = []
+    newlines = 0
+    with open(file_path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            block = f.read(step)
+            if not blocks and block.endswith(b'\n'):
+                # The terminator of the last line does not start a new one
+                newlines -= 1
+            newlines += block.count(b'\n')
+            blocks.append(block)
+            if newlines >= num_lines:
+                break
+    data = b''.join(reversed(blocks))
+    return [_decode_line(line) for line in data.splitlines(keepends=True)[-num_lines:]]
+
+
+_created_cache_dirs = set()
+
+
+def _cache_dir(*parts):
+    """Return (and create) a directory under guyOS's persistent cache"""
+    root = os.environ.get('GUYOS_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.guyOS', 'cache')
+    path = os.path.join(root, *parts)
+    if path not in _created_cache_dirs:
+        os.makedirs(path, exist_ok=True)
+        _created_cache_dirs.add(path)
+    return path
+
+
+def _line_ending(file_path):
+    """Return the line terminator used by a file (os.linesep for files without one)"""
+    with open(file_path, 'rb') as f:
+        sample = f.read(READ_BLOCK_SIZE)
+    newline = sample.find(b'\n')
+    if newline == -1:
+        return os.linesep.encode()
+    return b'\r\n' if sample[newline - 1:newline] == b'\r' else b'\n'
+
+
+def _terminate(file_path):
+    """Return the bytes needed to terminate the last line of a file, if any"""
+    with open(file_path, 'rb') as f:
+        if f.seek(0, os.SEEK_END) == 0:
+            return b''
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) == b'\n':
+            return b''
+    return _line_ending(file_path)
+
+
+def _copy_range(src_fd, dst_fd, offset, count):
+    """Copy count bytes at offset of src_fd to the current position of dst_fd
+    
+    os.copy_file_range and os.sendfile keep the data inside the kernel; a
+    plain read/write loop is only used where neither is available.
+    """
+    end = offset + count
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while offset < end:
+                copied = os.copy_file_range(src_fd, dst_fd, end - offset, offset)
+                if not copied:
+                    break
+                offset += copied
+        except OSError:
+            pass
+    if offset < end and hasattr(os, 'sendfile'):
+        try:
+            while offset < end:
+                sent = os.sendfile(dst_fd, src_fd, offset, end - offset)
+                if not sent:
+                    break
+                offset += sent
+        except OSError:
+            pass
+    if offset < end:
+        os.lseek(src_fd, offset, os.SEEK_SET)
+        while offset < end:
+            block = os.read(src_fd, min(READ_BLOCK_SIZE * 16, end - offset))
+            if not block:
+                break
+            view = memoryview(block)
+            while view:
+                view = view[os.write(dst_fd, view):]
+            offset += len(block)
+
+
+def _reflink(src_fd, dst_fd):
+    """Make dst share the data blocks of src (FICLONE); False where the filesystem cannot"""
+    try:
+        import fcntl
+        fcntl.ioctl(dst_fd, FICLONE, src_fd)
+    except (ImportError, OSError):
+        return False
+    return True
+
+
+class _CopyProgress:
+    """Files and bytes copied so far by cp/mv, shown on stderr while a long copy runs"""
+    
+    def __init__(self, total_files=0, total_bytes=0):
+        self.total_files = total_files
+        self.total_bytes = total_bytes
+        self.files = 0
+        self.bytes = 0
+        self.reflinked = 0
+        self.start = time.perf_counter()
+        self._shown = None
+        self._lock = threading.Lock()
+        self._interactive = sys.stderr.isatty()
+    
+    def add(self, size, files=0, reflinked=0):
+        with self._lock:
+            self.bytes += size
+            self.files += files
+            self.reflinked += reflinked
+            now = time.perf_counter()
+            if self._interactive and now - (self._shown or self.start) >= COPY_PROGRESS_INTERVAL:
+                self._shown = now
+                sys.stderr.write(f"\r{self.readout()}   ")
+                sys.stderr.flush()
+    
+    def elapsed(self):
+        return time.perf_counter() - self.start
+    
+    def readout(self):
+        rate = self.bytes / max(self.elapsed(), 1e-9)
+        return (f"{self.files}/{self.total_files} files, {_format_bytes(self.bytes)} of "
+                f"{_format_bytes(self.total_bytes)} ({_format_bytes(rate)}/s)")
+    
+    def finish(self):
+        if self._shown is not None:
+            sys.stderr.write("\r" + " " * (len(self.readout()) + 3) + "\r")
+            sys.stderr.flush()
+
+
+def _copy_file(src, dst, progress):
+    """Copy a file's bytes and permission bits (symbolic links are copied as links)
+    
+    The data never enters Python: the copy is a reflink where the filesystem
+    supports one, else _copy_range in COPY_PIECE_SIZE pieces so that progress
+    can be reported.
+    """
+    import shutil
+    if os.path.islink(src):
+        if os.path.lexists(dst):
+            os.unlink(dst)
+        os.symlink(os.readlink(src), dst)
+        progress.add(0, files=1)
+        return
+    with open(src, 'rb', buffering=0) as fsrc, open(dst, 'wb', buffering=0) as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        if size and _reflink(fsrc.fileno(), fdst.fileno()):
+            progress.add(size, files=1, reflinked=1)
+        else:
+            offset = 0
+            while offset < size:
+                count = min(COPY_PIECE_SIZE, size - offset)
+                _copy_range(fsrc.fileno(), fdst.fileno(), offset, count)
+                offset += count
+                progress.add(count)
+            progress.add(0, files=1)
+    shutil.copymode(src, dst)
+
+
+def _copy_tree(src, dst, progress, workers=None):
+    """Copy a directory tree, its files on a thread pool; returns [(source, error)] of the failures"""
+    import shutil
+    from concurrent.futures import ThreadPoolExecutor
+    directories = [(src, dst)]
+    files = []
+    for path, is_dir, size, _ in _walk_parallel(src, need_stat=True):
+        target = os.path.join(dst, os.path.relpath(path, src))
+        if is_dir:
+            directories.append((path, target))
+        else:
+            files.append((path, target))
+            progress.total_bytes += size or 0
+    progress.total_files += len(files)
+    for _, target in directories:
+        os.makedirs(target, exist_ok=True)
+    
+    def copy(paths):
+        try:
+            _copy_file(paths[0], paths[1], progress)
+        except OSError as e:
+            return paths[0], e.strerror or str(e)
+        return None
+    
+    with ThreadPoolExecutor(max_workers=workers or COPY_WORKERS) as pool:
+        failures = [failure for failure in pool.map(copy, files) if failure]
+    # Directory modes last, in case they make the directories read-only
+    for path, target in reversed(directories):
+        shutil.copymode(path, target)
+    return failures
+
+@contextmanager
+def _atomic_replace(file_path):
+    """Yield an unbuffered temporary file that atomically replaces file_path on success
+    
+    Symbolic links are followed, so the file they point to is replaced and
+    the link is kept. The new file gets the mode, owner and group of the old
+    one; where the owner cannot be kept (not running as root), the data is
+    copied back over the original file instead of renaming.
+    """
+    import shutil
+    import tempfile
+    file_path = os.path.realpath(file_path)
+    directory, name = os.path.split(file_path)
+    fd, tmp_path = tempfile.mkstemp(prefix=f'.{name}.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb', buffering=0) as tmp:
+            yield tmp
+            os.fsync(tmp.fileno())
+        before = os.stat(file_path)
+        created = os.stat(tmp_path)
+        try:
+            if (before.st_uid, before.st_gid) != (created.st_uid, created.st_gid):
+                os.chown(tmp_path, before.st_uid, before.st_gid)
+        except PermissionError:
+            with open(tmp_path, 'rb') as src, open(file_path, 'r+b') as dst:
+                size = os.fstat(src.fileno()).st_size
+                _copy_range(src.fileno(), dst.fileno(), 0, size)
+                dst.truncate(size)
+                os.fsync(dst.fileno())
+            os.remove(tmp_path)
+            return
+        shutil.copymode(file_path, tmp_path)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _rewrite_file(file_path, pieces):
+    """Atomically rewrite a file from pieces
+    
+    Every piece is either bytes to write or an (offset, count) range of the
+    current file. Ranges of REWRITE_COPY_MIN bytes or more are copied
+    without passing through Python; shorter ones and the bytes are gathered
+    in a buffer, so many small pieces cost one write per REWRITE_BUFFER_SIZE
+    bytes rather than a system call each.
+    """
+    import mmap
+    with open(file_path, 'rb') as src, _atomic_replace(file_path) as tmp:
+        mm = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(src.fileno()).st_size else None
+        out = io.BufferedWriter(tmp, REWRITE_BUFFER_SIZE)
+        try:
+            for piece in pieces:
+                if isinstance(piece, bytes):
+                    out.write(piece)
+                elif piece[1] >= REWRITE_COPY_MIN:
+                    out.flush()
+                    _copy_range(src.fileno(), tmp.fileno(), *piece)
+                elif piece[1] > 0:
+                    out.write(mm[piece[0]:piece[0] + piece[1]])
+            out.flush()
+        finally:
+            # Leave tmp open for _atomic_replace to sync and rename
+            out.detach()
+            if mm is not None:
+                mm.close()
+
+
+def _patch_in_place(file_path, patches):
+    """Overwrite (offset, data) patches of the same length as the bytes they replace"""
+    import mmap
+    with open(file_path, 'r+b') as f, mmap.mmap(f.fileno(), 0) as mm:
+        for offset, data in patches:
+            mm[offset:offset + len(data)] = data
+            _counters.mapped_written += len(data)
+        mm.flush()
+
+
+def _chunk_bounds(file_path, size, jobs):
+    """Split a file into (start, end) chunks that end right after a newline"""
+    import mmap
+    if size == 0:
+        return []
+    chunk_size = max(min(size // (jobs * 4), PARALLEL_CHUNK_SIZE), READ_BLOCK_SIZE)
+    bounds = []
+    start = 0
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        while start < size:
+            newline = mm.find(b'\n', min(start + chunk_size, size) - 1)
+            end = size if newline == -1 else newline + 1
+            bounds.append((start, end))
+            start = end
+    return bounds
+
+
+def _imap_chunks(func, file_path, bounds, jobs, *args):
+    """Yield func(file_path, start, end, *args) for every chunk in order, from a process pool if worthwhile
+    
+    At most two chunks per job are in flight, so only their results are held
+    at any one time.
+    """
+    calls = [(file_path, start, end) + args for start, end in bounds]
+    if jobs <= 1 or len(calls) <= 1 or bounds[-1][1] < PARALLEL_MIN_SIZE:
+        for call in calls:
+            yield func(*call)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=min(jobs, len(calls))) as pool:
+        running = deque()
+        for call in calls:
+            running.append(pool.submit(func, *call))
+            if len(running) >= 2 * jobs:
+                yield running.popleft().result()
+        while running:
+            yield running.popleft().result()
+
+
+def _map_chunks(func, file_path, bounds, jobs, *args):
+    """Run func(file_path, start, end, *args) over every chunk, in a process pool if worthwhile"""
+    return list(_imap_chunks(func, file_path, bounds, jobs, *args))
+
+
+def _count_chunk(file_path, start, end):
+    """Return (lines, words, characters) of a newline-aligned chunk, as text mode counts them"""
+    import mmap
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        text = mm[start:end].decode('utf-8', errors='replace')
+        at_eof = end == len(mm)
+    crlf = text.count('\r\n')
+    lines = text.count('\n') + text.count('\r') - crlf
+    if at_eof and text and not text.endswith(('\n', '\r')):
+        lines += 1
+    return lines, len(text.split()), len(text) - crlf
+
+
+def _count_file(file_path, jobs):
+    """Return (lines, words, characters) of a file using up to jobs processes"""
+    size = os.path.getsize(file_path)
+    _counters.mapped_read += size
+    bounds = _chunk_bounds(file_path, size, jobs)
+    counts = _map_chunks(_count_chunk, file_path, bounds, jobs)
+    return tuple(sum(column) for column in zip(*counts)) if counts else (0, 0, 0)
+
+
+def _find_chunk(file_path, start, end, needle):
+    """Return the offsets of the non-overlapping matches of needle that start inside a chunk"""
+    import mmap
+    matches = []
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        limit = min(end + len(needle) - 1, len(mm))
+        found = mm.find(needle, start, limit)
+        while found != -1:
+            matches.append(found)
+            found = mm.find(needle, found + len(needle), limit)
+    return matches
+
+
+def _iter_matches(file_path, needle, jobs=None):
+    """Yield the offsets of the non-overlapping occurrences of needle in a file, in order
+    
+    Chunks are searched independently, so a match that runs over the end of
+    one chunk can shadow the first matches another worker reported. Those are
+    dropped and the region is rescanned until both scans agree again, which
+    gives the same result as a single left-to-right search. Offsets are
+    passed on chunk by chunk instead of being collected for the whole file.
+    """
+    import mmap
+    jobs = jobs or os.cpu_count() or 1
+    size = os.path.getsize(file_path)
+    _counters.mapped_read += size
+    bounds = _chunk_bounds(file_path, size, jobs)
+    position = 0
+    mm = None
+    try:
+        for (start, end), matches in zip(bounds, _imap_chunks(_find_chunk, file_path, bounds, jobs, needle)):
+            i = bisect_left(matches, position)
+            if i:
+                if mm is None:
+                    with open(file_path, 'rb') as f:
+                        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                limit = min(end + len(needle) - 1, len(mm))
+                found = mm.find(needle, position, limit)
+                while found != -1:
+                    while i < len(matches) and matches[i] < found:
+                        i += 1
+                    if i < len(matches) and matches[i] == found:
+                        break
+                    yield found
+                    position = found + len(needle)
+                    found = mm.find(needle, position, limit)
+                else:
+                    i = len(matches)
+            if i < len(matches):
+                yield from islice(matches, i, None)
+                position = matches[-1] + len(needle)
+    finally:
+        if mm is not None:
+            mm.close()
+
+
+def _find_all(file_path, needle, jobs=None):
+    """Return the offsets of the non-overlapping occurrences of needle in a file"""
+    return list(_iter_matches(file_path, needle, jobs))
+
+
+def _replace_chunk(file_path, start, end, needle, data):
+    """Replace needle with data of the same length inside a chunk, in place; returns the count"""
+    import mmap
+    with open(file_path, 'r+b') as f, mmap.mmap(f.fileno(), 0) as mm:
+        first = mm.find(needle, start, end)
+        if first == -1:
+            return 0
+        last = mm.rfind(needle, first, end) + len(needle)
+        region = mm[first:last]
+        mm[first:last] = region.replace(needle, data)
+        return region.count(needle)
+
+
+def _replace_all(file_path, needle, data, jobs=None):
+    """Replace every non-overlapping occurrence of needle in a file with data; returns the count
+    
+    Chunks end right after a newline, so a needle without one never runs
+    over a chunk end and each chunk is replaced on its own: in place by the
+    workers when data has the same length, else with bytes.replace while
+    the file is rewritten (chunks without a match are copied as ranges).
+    A needle with a newline is located with _iter_matches, whose offsets
+    are patched or rewritten as they come.
+    """
+    import mmap
+    jobs = jobs or os.cpu_count() or 1
+    size = os.path.getsize(file_path)
+    if not needle or not size:
+        return 0
+    if b'\n' not in needle:
+        _counters.mapped_read += size
+        bounds = _chunk_bounds(file_path, size, jobs)
+        if len(data) == len(needle):
+            count = sum(_imap_chunks(_replace_chunk, file_path, bounds, jobs, needle, data))
+            _counters.mapped_written += count * len(data)
+            return count
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(needle) == -1:
+                return 0
+            counts = []
+            
+            def pieces():
+                for start, end in bounds:
+                    if mm.find(needle, start, end) == -1:
+                        yield (start, end - start)
+                    else:
+                        chunk = mm[start:end]
+                        counts.append(chunk.count(needle))
+                        yield chunk.replace(needle, data)
+            _rewrite_file(file_path, pieces())
+        return sum(counts)
+    matches = _iter_matches(file_path, needle, jobs)
+    first = next(matches, None)
+    if first is None:
+        return 0
+    matches = chain((first,), matches)
+    count = 0
+    if len(data) == len(needle):
+        # Bytes are only patched behind the search, never where it still has to look
+        with open(file_path, 'r+b') as f, mmap.mmap(f.fileno(), 0) as mm:
+            for offset in matches:
+                mm[offset:offset + len(data)] = data
+                count += 1
+        _counters.mapped_written += count * len(data)
+        return count
+    
+    def pieces():
+        nonlocal count
+        position = 0
+        for offset in matches:
+            count += 1
+            yield (position, offset - position)
+            yield data
+            position = offset + len(needle)
+        yield (position, size - position)
+    _rewrite_file(file_path, pieces())
+    return count
+
+
+def _line_starts(block, position):
+    """Offsets of the lines that start after each '\\n' of block, which begins at position"""
+    lines = block.split(b'\n')
+    lines.pop()
+    # Each line start is the length of the lines before it plus one byte per newline
+    return map(add, accumulate(map(len, lines)), range(position + 1, position + 1 + len(lines)))
+
+
+def _same_line_breaks(old, new):
+    """Whether two byte strings of equal length have their newlines in the same places"""
+    return [len(part) for part in old.split(b'\n')] == [len(part) for part in new.split(b'\n')]
+
+
+class _Inotify:
+    """Minimal inotify binding (Linux only) through ctypes"""
+    IN_MODIFY = 0x002
+    IN_ATTRIB = 0x004
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = (ctypes.c_int, ctypes.c_int)
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+    
+    def watch(self, path, mask):
+        import ctypes
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"Cannot watch '{path}'")
+        return wd
+    
+    def unwatch(self, wd):
+        self._rm_watch(self.fd, wd)
+    
+    def events(self, timeout=None):
+        """Block until events arrive (or timeout passes); returns the watch descriptors they are for"""
+        import select
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        wds = set()
+        if ready:
+            try:
+                while True:
+                    data = os.read(self.fd, 65536)
+                    if not data:
+                        break
+                    offset = 0
+                    while offset < len(data):
+                        wd, _, _, length = struct.unpack_from('iIII', data, offset)
+                        wds.add(wd)
+                        offset += 16 + length
+            except BlockingIOError:
+                pass
+        return wds
+    
+    def wait(self, timeout):
+        """Block until events arrive or timeout passes, then discard the events"""
+        import select
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if ready:
+            try:
+                while os.read(self.fd, 65536):
+                    pass
+            except BlockingIOError:
+                pass
+    
+    def close(self):
+        os.close(self.fd)
+
+
+class _FollowedFile:
+    """Read position in a file that is being followed, across truncation and rotation"""
+    
+    def __init__(self, path, label):
+        self.path = path
+        self.label = label
+        self.file = open(path, 'rb', buffering=0)
+        self.offset = self.file.seek(0, os.SEEK_END)
+        self.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self.pending = ""
+    
+    def poll(self):
+        """Return (text appended since the last poll, notice or None)"""
+        notice = None
+        data = b''
+        try:
+            current = os.stat(self.path)
+        except FileNotFoundError:
+            current = None
+        if self.file is not None:
+            opened = os.fstat(self.file.fileno())
+            if opened.st_size < self.offset:
+                notice = "file truncated"
+                self.offset = self.file.seek(0)
+            data = self.file.read()
+            self.offset += len(data)
+            if current is None or (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino):
+                # Rotated or removed: the old file has been drained, the new one is read from its start
+                self.file.close()
+                self.file = None
+        if notice:
+            self.decoder.reset()
+        if self.file is None and current is not None:
+            try:
+                self.file = open(self.path, 'rb', buffering=0)
+            except FileNotFoundError:
+                pass
+            else:
+                notice = "file replaced, following the new file"
+                self.offset = 0
+                more = self.file.read()
+                self.offset += len(more)
+                data += more
+        return self.decoder.decode(data), notice
+    
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+class LineIndex:
+    """Persistent index of the byte offset at which every line of a file starts
+    
+    The offsets live in a compact array('Q') that is saved to a sidecar file
+    in the guyOS cache, keyed by the file's path, size and mtime. If the file
+    has only been appended to since the index was built the new lines are
+    indexed incrementally, and edits made through guyOS (see spliced) shift
+    the offsets that follow them; any other change rebuilds the index from
+    scratch. Lines are terminated by '\\n' ('\\r\\n' included).
+    
+    Indexes are shared by the threads of a process (daemon sessions and
+    background jobs); each one is refreshed, patched and read under its own
+    lock.
+    """
+    MAGIC = b'GLIX1'
+    HEADER = struct.Struct('<5sQqH')
+    TAIL_SIZE = 256
+    
+    # Indexes already loaded by this process, keyed by absolute path
+    _loaded = {}
+    _loaded_lock = threading.Lock()
+    
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.size = 0
+        self.mtime_ns = 0
+        self.tail = b''
+        self.offsets = array('Q', [0])
+        self.lock = threading.RLock()
+    
+    @staticmethod
+    def sidecar_path(file_path):
+        import hashlib
+        digest = hashlib.sha1(file_path.encode('utf-8', errors='surrogateescape')).hexdigest()
+        return os.path.join(_cache_dir('lineindex'), digest + '.idx')
+    
+    @classmethod
+    def get(cls, file_path):
+        """Return an up-to-date index for file_path, building it if needed"""
+        file_path = os.path.abspath(file_path)
+        with cls._loaded_lock:
+            index = cls._loaded.get(file_path)
+            if index is None:
+                index = cls._load(file_path) or cls(file_path)
+                cls._loaded[file_path] = index
+        with index.lock:
+            index.refresh()
+        return index
+    
+    @classmethod
+    def appended(cls, file_path):
+        """Extend an existing index after data was appended to file_path"""
+        file_path = os.path.abspath(file_path)
+        if file_path in cls._loaded:
+            cls.get(file_path)
+        elif os.path.getsize(file_path) >= LINE_INDEX_MIN_SIZE and os.path.exists(cls.sidecar_path(file_path)):
+            cls.get(file_path)
+    
+    @classmethod
+    def patched(cls, file_path, before):
+        """Keep the index of a file patched in place without moving any line break
+        
+        before is the stat result of the file taken just ahead of the patch.
+        """
+        file_path = os.path.abspath(file_path)
+        with cls._loaded_lock:
+            index = cls._loaded.get(file_path) or cls._load(file_path)
+        if index is None:
+            return
+        with index.lock:
+            if index.size != before.st_size or index.mtime_ns != before.st_mtime_ns:
+                cls.invalidate(file_path)
+                return
+            with open(file_path, 'rb') as f:
+                f.seek(index.size - len(index.tail))
+                index.tail = f.read(len(index.tail))
+                index.mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+            index.save()
+    
+    @classmethod
+    def spliced(cls, file_path, before, offsets, length, data):
+        """Shift the index of a file after the length bytes at each of the sorted offsets were replaced with data
+        
+        before is the stat result of the file taken just ahead of the splice.
+        Lines that start before a replaced range keep their offsets, the ones
+        inside it are replaced by those of data and the ones after it move by
+        len(data) - length.
+        """
+        file_path = os.path.abspath(file_path)
+        with cls._loaded_lock:
+            index = cls._loaded.get(file_path) or cls._load(file_path)
+        if index is None:
+            return
+        with index.lock:
+            if index.size != before.st_size or index.mtime_ns != before.st_mtime_ns:
+                cls.invalidate(file_path)
+                return
+            old = index.offsets
+            new = array('Q')
+            kept = 0
+            shift = 0
+            for offset in offsets:
+                first = bisect_right(old, offset, kept)
+                new.extend(map(shift.__add__, old[kept:first]) if shift else old[kept:first])
+                new.extend(_line_starts(data, offset + shift))
+                kept = bisect_right(old, offset + length, first)
+                shift += len(data) - length
+            new.extend(map(shift.__add__, old[kept:]) if shift else old[kept:])
+            with open(file_path, 'rb') as f:
+                stat_info = os.fstat(f.fileno())
+                if stat_info.st_size != index.size + shift:
+                    cls.invalidate(file_path)
+                    return
+                f.seek(max(stat_info.st_size - cls.TAIL_SIZE, 0))
+                index.tail = f.read()
+            index.offsets = new
+            index.size = stat_info.st_size
+            index.mtime_ns = stat_info.st_mtime_ns
+            index.save()
+    
+    @classmethod
+    def invalidate(cls, file_path):
+        """Forget the index of a file that was rewritten"""
+        file_path = os.path.abspath(file_path)
+        with cls._loaded_lock:
+            index = cls._loaded.pop(file_path, None)
+        # Wait for a refresh in progress, so that it cannot save the sidecar again afterwards
+        with index.lock if index is not None else nullcontext():
+            try:
+                os.remove(cls.sidecar_path(file_path))
+            except OSError:
+                pass
+    
+    @classmethod
+    def _load(cls, file_path):
+        try:
+            with open(cls.sidecar_path(file_path), 'rb') as f:
+                magic, size, mtime_ns, tail_len = cls.HEADER.unpack(f.read(cls.HEADER.size))
+                if magic != cls.MAGIC:
+                    return None
+                index = cls(file_path)
+                index.size = size
+                index.mtime_ns = mtime_ns
+                index.tail = f.read(tail_len)
+                index.offsets = array('Q')
+                index.offsets.frombytes(f.read())
+        except (OSError, ValueError, struct.error):
+            return None
+        return index if index.offsets else None
+    
+    def save(self):
+        sidecar = self.sidecar_path(self.file_path)
+        tmp_path = f"{sidecar}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.size, self.mtime_ns, len(self.tail)))
+            f.write(self.tail)
+            self.offsets.tofile(f)
+        os.replace(tmp_path, sidecar)
+    
+    def refresh(self):
+        """Bring the index in line with the file on disk"""
+        stat_info = os.stat(self.file_path)
+        if stat_info.st_size == self.size and stat_info.st_mtime_ns == self.mtime_ns:
+            return
+        with open(self.file_path, 'rb') as f:
+            appended = stat_info.st_size > self.size
+            if appended and self.tail:
+                f.seek(self.size - len(self.tail))
+                appended = f.read(len(self.tail)) == self.tail
+            if not appended:
+                self.size = 0
+                self.tail = b''
+                self.offsets = array('Q', [0])
+            self._scan(f, stat_info.st_size)
+        self.mtime_ns = stat_info.st_mtime_ns
+        self.save()
+    
+    def _scan(self, f, end):
+        f.seek(self.size)
+        offsets = self.offsets
+        pos = self.size
+        block = b''
+        while pos < end:
+            block = f.read(min(READ_BLOCK_SIZE * 16, end - pos))
+            if not block:
+                break
+            offsets.extend(_line_starts(block, pos))
+            pos += len(block)
+        if pos > self.size:
+            f.seek(max(pos - self.TAIL_SIZE, 0))
+            self.tail = f.read(pos - f.tell())
+        self.size = pos
+    
+    @property
+    def line_count(self):
+        with self.lock:
+            if self.offsets[-1] == self.size:
+                return len(self.offsets) - 1
+            return len(self.offsets)
+    
+    def span(self, start, stop):
+        """Byte range covering lines start..stop-1 (0-based, clamped to the file)"""
+        with self.lock:
+            count = self.line_count
+            start = min(max(start, 0), count)
+            stop = min(max(stop, start), count)
+            start_offset = self.offsets[start] if start < len(self.offsets) else self.size
+            end_offset = self.offsets[stop] if stop < len(self.offsets) else self.size
+            return start_offset, end_offset
+
+class ListingCache:
+    """LRU cache of the sorted entry names of directories, keyed by the directory's mtime
+    
+    Creating, removing or renaming an entry changes the directory's mtime;
+    writing to a file does not. So only the names are cached, and the size,
+    mtime and type of the entries being shown are read by stat() each time.
+    The cache can be shared by the threads of a daemon; with watch_changes(),
+    listings are also dropped as soon as inotify reports a change to one of
+    the directory's entries (for filesystems with coarse timestamps).
+    """
+    
+    def __init__(self, max_dirs=64):
+        self.max_dirs = max_dirs
+        self._listings = OrderedDict()
+        self._lock = threading.Lock()
+        self._inotify = None
+        # Directory -> inotify watch descriptor, and back
+        self._watches = {}
+        self._watched = {}
+    
+    def get(self, directory):
+        """Return the sorted names of the entries of a directory"""
+        mtime_ns = os.stat(directory).st_mtime_ns
+        with self._lock:
+            cached = self._listings.get(directory)
+            if cached is not None and cached[0] == mtime_ns:
+                self._listings.move_to_end(directory)
+                return cached[1]
+        with os.scandir(directory) as it:
+            names = sorted(entry.name for entry in it)
+        with self._lock:
+            self._listings[directory] = (mtime_ns, names)
+            self._listings.move_to_end(directory)
+            if self._inotify is not None and directory not in self._watches:
+                self._watch(directory)
+            if len(self._listings) > self.max_dirs:
+                evicted, _ = self._listings.popitem(last=False)
+                if evicted in self._watches:
+                    wd = self._watches.pop(evicted)
+                    del self._watched[wd]
+                    self._inotify.unwatch(wd)
+        return names
+    
+    @staticmethod
+    def stat(directory, names):
+        """Return (name, is_dir, size, mtime) for names in a directory, as they are now
+        
+        is_dir, size and mtime are None for entries that cannot be stat'ed.
+        """
+        import stat
+        entries = []
+        for name in names:
+            try:
+                stat_info = os.stat(os.path.join(directory, name))
+                entries.append((name, stat.S_ISDIR(stat_info.st_mode), stat_info.st_size, stat_info.st_mtime))
+            except OSError:
+                entries.append((name, None, None, None))
+        _counters.stat += len(entries)
+        return entries
+    
+    def invalidate(self, directory):
+        """Drop a listing whose files changed without touching the directory's mtime"""
+        self._listings.pop(os.path.normpath(directory), None)
+    
+    def watch_changes(self):
+        """Invalidate listings from inotify events; returns False where inotify is unavailable"""
+        try:
+            self._inotify = _Inotify()
+        except (OSError, AttributeError):
+            return False
+        threading.Thread(target=self._watch_loop, name="guyOS-listings", daemon=True).start()
+        return True
+    
+    def _watch(self, directory):
+        try:
+            wd = self._inotify.watch(directory, _Inotify.IN_MODIFY | _Inotify.IN_ATTRIB | _Inotify.IN_CLOSE_WRITE |
+                                     _Inotify.IN_CREATE | _Inotify.IN_DELETE |
+                                     _Inotify.IN_MOVED_FROM | _Inotify.IN_MOVED_TO)
+        except OSError:
+            return
+        self._watches[directory] = wd
+        self._watched[wd] = directory
+    
+    def _watch_loop(self):
+        while True:
+            for wd in self._inotify.events():
+                directory = self._watched.get(wd)
+                if directory is not None:
+                    self._listings.pop(directory, None)
+
+
+class AppendBuffer:
+    """Group commit for write -add: lines are queued per file and written in batches
+    
+    Pending lines are written once max_bytes of them are queued, max_delay
+    seconds after the first of them was queued, on flush() and at exit. All
+    the lines of a file go out in a single write through an append handle
+    kept open in an LRU of max_handles files. With fsync, every file written
+    is synced once per flush. Whether a line needs a leading newline is
+    decided when it is written, so the result is the same as appending the
+    lines one at a time.
+    """
+    
+    def __init__(self, fsync=False, max_handles=APPEND_MAX_HANDLES, max_bytes=APPEND_FLUSH_SIZE,
+                 max_delay=APPEND_FLUSH_DELAY, on_flush=None):
+        import atexit
+        self.fsync = fsync
+        self.max_handles = max_handles
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        # Called with (path, size before the append or None) after a file is written
+        self.on_flush = on_flush
+        self._pending = OrderedDict()
+        self._pending_bytes = 0
+        self._handles = OrderedDict()
+        # Files written since the last sync() without an fsync
+        self._unsynced = set()
+        self._lock = threading.RLock()
+        self._timer = None
+        atexit.register(self.close)
+    
+    def add(self, path, content):
+        """Queue a line for path; returns False if the file must be appended to directly"""
+        with self._lock:
+            lines = self._pending.get(path)
+            if lines is None:
+                if path not in self._handles:
+                    if os.path.exists(path):
+                        if os.path.getsize(path) and _compression(path):
+                            return False
+                        # Open now so that errors are reported by the write that caused them
+                        self._open(path)
+                    else:
+                        self._check_creatable(path)
+                lines = self._pending[path] = []
+            lines.append(content)
+            self._pending_bytes += len(content) + 1
+            if self._pending_bytes >= self.max_bytes:
+                self.flush()
+            elif self._timer is None and self.max_delay is not None:
+                self._timer = threading.Timer(self.max_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        return True
+    
+    @staticmethod
+    def _check_creatable(path):
+        """Raise the error opening path for appending would raise, without creating it"""
+        import errno
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+        if not os.access(directory, os.W_OK):
+            raise PermissionError(errno.EACCES, os.strerror(errno.EACCES), path)
+    
+    def pending(self):
+        """Return (pending lines, files they belong to)"""
+        with self._lock:
+            return sum(len(lines) for lines in self._pending.values()), len(self._pending)
+    
+    def flush(self, sync=False):
+        """Write every pending line; with sync, also fsync every file written since the last sync"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            pending, self._pending = self._pending, OrderedDict()
+            self._pending_bytes = 0
+            for path, lines in pending.items():
+                try:
+                    appended_from = self._write(path, lines)
+                except OSError as e:
+                    print(f"guyOS: Error appending {len(lines)} lines to '{path}': {e}", file=sys.stderr)
+                    continue
+                if self.on_flush is not None:
+                    self.on_flush(path, appended_from)
+            if sync:
+                for path in self._unsynced:
+                    try:
+                        fd = self._handles.get(path)
+                        if fd is not None:
+                            os.fsync(fd)
+                        else:
+                            fd = os.open(path, os.O_RDONLY)
+                            try:
+                                os.fsync(fd)
+                            finally:
+                                os.close(fd)
+                    except OSError as e:
+                        print(f"guyOS: Error syncing '{path}': {e}", file=sys.stderr)
+                self._unsynced.clear()
+    
+    def _open(self, path):
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o666)
+        self._handles[path] = fd
+        if len(self._handles) > self.max_handles:
+            os.close(self._handles.popitem(last=False)[1])
+        return fd
+    
+    def _write(self, path, lines):
+        """Append lines to path; returns the size of the file before, or None if it did not exist"""
+        try:
+            before = os.stat(path)
+        except FileNotFoundError:
+            before = None
+        fd = self._handles.get(path)
+        if fd is not None:
+            opened = os.fstat(fd)
+            if before is None or (opened.st_dev, opened.st_ino) != (before.st_dev, before.st_ino):
+                # Removed or replaced since the handle was opened
+                del self._handles[path]
+                os.close(fd)
+                fd = None
+            else:
+                self._handles.move_to_end(path)
+        if fd is None:
+            fd = self._open(path)
+        # Text mode appends (the unbuffered path) write os.linesep for '\n'
+        data = (os.linesep if before is not None else "") + os.linesep.join(lines)
+        view = memoryview(data.encode('utf-8'))
+        while view:
+            view = view[os.write(fd, view):]
+        if self.fsync:
+            os.fsync(fd)
+        else:
+            self._unsynced.add(path)
+        return before.st_size if before is not None else None
+    
+    def close(self):
+        """Flush pending lines and close every handle"""
+        with self._lock:
+            self.flush(sync=self.fsync)
+            while self._handles:
+                os.close(self._handles.popitem()[1])
+
+
+# Commands added by plugins: name -> (handler(shell, args), help line or None)
+_plugin_commands = {}
+_plugins_loaded = False
+
+
+def register_command(name, handler, help_line=None):
+    """Add a command to every guyOS shell
+    
+    handler(shell, args) returns a string or an iterable of text chunks, like
+    the built-in handlers (see guyOS._command_table). Built-in commands
+    cannot be replaced. The plugins named in $GUYOS_PLUGINS are passed this
+    function through their register() hook.
+    """
+    _plugin_commands[name.lower()] = (handler, help_line)
+
+
+def _load_plugins():
+    """Import the plugins in $GUYOS_PLUGINS (module names or .py files, os.pathsep separated) once"""
+    global _plugins_loaded
+    if _plugins_loaded:
+        return
+    _plugins_loaded = True
+    plugins = os.environ.get('GUYOS_PLUGINS')
+    if not plugins:
+        return
+    import importlib
+    import importlib.util
+    for plugin in filter(None, plugins.split(os.pathsep)):
+        try:
+            if plugin.endswith('.py'):
+                name = "guyos_plugin_" + os.path.splitext(os.path.basename(plugin))[0]
+                spec = importlib.util.spec_from_file_location(name, plugin)
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+            else:
+                module = importlib.import_module(plugin)
+            module.register(register_command)
+        except Exception as e:
+            print(f"guyOS: Cannot load plugin '{plugin}': {e}", file=sys.stderr)
+
+
+def _find_guython():
+    """Locate the Guython interpreter ($GUYTHON_PATH or the default Windows install)"""
+    path = os.environ.get('GUYTHON_PATH')
+    if path:
+        return path
+    import getpass
+    username = getpass.getuser()
+    return f"C:\\Users\\{username}\\AppData\\Local\\Programs\\Guython\\guython.exe"
+
+
+class _GuythonWorker:
+    """One long-lived Guython process speaking the worker protocol of GuythonPool"""
+    
+    def __init__(self, command):
+        import queue
+        import subprocess
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL, text=True, encoding='utf-8',
+                                        errors='replace', bufsize=1)
+        self.jobs_done = 0
+        self._replies = queue.Queue()
+        self._next_id = 0
+        reader = threading.Thread(target=self._read_replies, daemon=True)
+        reader.start()
+    
+    def _read_replies(self):
+        for line in self.process.stdout:
+            self._replies.put(line)
+        self._replies.put(None)
+    
+    def call(self, request, timeout=None):
+        """Send one job and wait for its reply"""
+        import json
+        import queue
+        import subprocess
+        self._next_id += 1
+        request = dict(request, id=self._next_id)
+        try:
+            self.process.stdin.write(json.dumps(request) + "\n")
+            self.process.stdin.flush()
+        except OSError:
+            # Died while idle (BrokenPipeError): the job never reached it
+            self.close()
+            raise
+        while True:
+            try:
+                line = self._replies.get(timeout=timeout)
+            except queue.Empty:
+                self.close()
+                raise subprocess.TimeoutExpired(self.process.args, timeout)
+            if line is None:
+                # Reap it now: its stdout can reach EOF before poll() sees it exit
+                self.close()
+                raise RuntimeError("Guython worker exited unexpectedly")
+            try:
+                reply = json.loads(line)
+            except ValueError:
+                continue
+            if reply.get("id") == self._next_id:
+                self.jobs_done += 1
+                return reply
+    
+    def alive(self):
+        return self.process.poll() is None
+    
+    def close(self):
+        if self.alive():
+            self.process.kill()
+        self.process.wait()
+        try:
+            self.process.stdin.close()
+        except OSError:
+            # Lines left in the buffer of a broken pipe
+            pass
+
+
+class GuythonPool:
+    """Pool of warm Guython worker processes
+    
+    Each worker is started as command (the interpreter plus its worker-mode
+    arguments) and exchanges one JSON object per line over its stdin/stdout:
+    
+        -> {"id": 1, "code": "...", "cwd": "..."}
+        -> {"id": 2, "script": "/abs/path.gy", "args": [...], "cwd": "..."}
+        <- {"id": 1, "stdout": "...", "stderr": "...", "returncode": 0}
+    
+    Workers are recycled after max_jobs jobs and killed (then replaced) when
+    a job runs past its timeout.
+    """
+    
+    def __init__(self, command, size=2, max_jobs=100, timeout=None):
+        import queue
+        self.command = list(command)
+        self.size = size
+        self.max_jobs = max_jobs
+        self.timeout = timeout
+        # Idle workers; None stands for a slot whose worker has to be started
+        self._idle = queue.LifoQueue()
+        for _ in range(size):
+            self._idle.put(None)
+    
+    def warm_up(self):
+        """Start every worker and wait until each has answered an empty job"""
+        workers = [self._idle.get() for _ in range(self.size)]
+        try:
+            for i, worker in enumerate(workers):
+                if worker is None:
+                    workers[i] = worker = _GuythonWorker(self.command)
+                worker.call({"code": ""}, self.timeout)
+        finally:
+            for worker in workers:
+                self._release(worker)
+    
+    def run(self, request, timeout=None):
+        """Run one job on an idle worker and return it as a CompletedProcess"""
+        import subprocess
+        worker = self._idle.get()
+        try:
+            if worker is None:
+                worker = _GuythonWorker(self.command)
+            try:
+                reply = worker.call(request, timeout or self.timeout)
+            except OSError:
+                # The worker died while idle and never got the job: run it on a fresh one
+                worker = _GuythonWorker(self.command)
+                try:
+                    reply = worker.call(request, timeout or self.timeout)
+                except OSError as e:
+                    raise RuntimeError(f"Could not send the job to a Guython worker: {e}") from e
+        finally:
+            self._release(worker)
+        return subprocess.CompletedProcess(self.command, reply.get("returncode", 0),
+                                           reply.get("stdout", ""), reply.get("stderr", ""))
+    
+    def _release(self, worker):
+        if worker is not None and (not worker.alive() or worker.jobs_done >= self.max_jobs):
+            worker.close()
+            worker = None
+        self._idle.put(worker)
+    
+    def close(self):
+        """Stop every idle worker"""
+        import queue
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if worker is not None:
+                worker.close()
+
+def _scan_dir(path, need_stat):
+    """List one directory for _walk_parallel: ([(path, is_dir, size, mtime)], [subdirectories])"""
+    entries = []
+    subdirs = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    stat_info = entry.stat(follow_symlinks=False) if need_stat else None
+                except OSError:
+                    continue
+                if stat_info is None:
+                    entries.append((entry.path, is_dir, None, None))
+                else:
+                    entries.append((entry.path, is_dir, stat_info.st_size, stat_info.st_mtime))
+                if is_dir:
+                    subdirs.append(entry.path)
+    except OSError:
+        pass
+    return entries, subdirs
+
+
+def _walk_parallel(root, need_stat=False, workers=None):
+    """Yield (path, is_dir, size, mtime) for everything below root
+    
+    Directories are listed by a thread pool (os.scandir releases the GIL) and
+    entries are yielded as soon as their directory has been read, so callers
+    can stop early. Symbolic links to directories are not followed.
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+    pool = ThreadPoolExecutor(max_workers=workers or min(32, (os.cpu_count() or 1) * 4))
+    pending = {pool.submit(_scan_dir, root, need_stat)}
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                entries, subdirs = future.result()
+                for subdir in subdirs:
+                    pending.add(pool.submit(_scan_dir, subdir, need_stat))
+                if need_stat:
+                    _counters.stat += len(entries)
+                yield from entries
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _grep_files(paths, pattern, ignore_case, max_count):
+    """Search files for a regular expression; returns [(path, [(line_number, line)])]
+    
+    Files are scanned through mmap. Files with a NUL byte in their first
+    block are taken as binary and skipped, and at most max_count matching
+    lines are reported per file. The pattern applies to one line at a time:
+    ^ and $ match at line boundaries, and a match found across a newline
+    only counts if the pattern also matches within the line it starts on.
+    """
+    import mmap
+    import re
+    regex = re.compile(pattern.encode('utf-8'), re.MULTILINE | (re.IGNORECASE if ignore_case else 0))
+    results = []
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                if b'\0' in f.read(8192) or os.fstat(f.fileno()).st_size == 0:
+                    continue
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    matches = []
+                    line_number = 1
+                    counted = 0
+                    match = regex.search(mm)
+                    while match and (max_count is None or len(matches) < max_count):
+                        line_start = mm.rfind(b'\n', 0, match.start()) + 1
+                        if line_start == len(mm):
+                            # Nothing follows the final newline
+                            break
+                        line_end = mm.find(b'\n', match.start())
+                        if line_end == -1:
+                            line_end = len(mm)
+                        if match.end() > line_end and regex.search(mm, line_start, line_end) is None:
+                            match = regex.search(mm, line_end + 1)
+                            continue
+                        line_number += mm[counted:line_start].count(b'\n')
+                        counted = line_start
+                        matches.append((line_number, _decode_line(mm[line_start:line_end]).rstrip('\n')))
+                        match = regex.search(mm, line_end + 1)
+        except (OSError, ValueError):
+            continue
+        if matches:
+            results.append((path, matches))
+    return results
+
+
+def _chunk_lines(chunks):
+    """Split a stream of text chunks into lines (without their newlines)"""
+    pending = ""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        lines = (pending + chunk).split("\n")
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+def _pipe_grep(args):
+    """grep [-i] [-v] {pattern}: keep the lines matching a regular expression"""
+    import re
+    flags = 0
+    invert = False
+    patterns = []
+    for arg in args:
+        if arg == "-i":
+            flags |= re.IGNORECASE
+        elif arg == "-v":
+            invert = True
+        else:
+            patterns.append(arg)
+    if len(patterns) != 1:
+        raise ValueError("Usage: ... | grep [-i] [-v] {pattern}")
+    try:
+        search = re.compile(patterns[0], flags).search
+    except re.error as e:
+        raise ValueError(f"Error: Invalid pattern '{patterns[0]}': {e}")
+    
+    def grep(lines):
+        for line in lines:
+            if (search(line) is None) == invert:
+                yield line
+    return grep
+
+
+def _pipe_size(args, usage):
+    """Parse the optional line count (default 10) of head and tail"""
+    if len(args) > 1:
+        raise ValueError(f"Usage: ... | {usage} [N]")
+    try:
+        return int(args[0]) if args else 10
+    except ValueError:
+        raise ValueError("Error: Number of lines must be an integer")
+
+
+def _pipe_head(args):
+    """head [N]: the first N lines; the upstream stages stop once they are through"""
+    count = max(_pipe_size(args, "head"), 0)
+    return lambda lines: islice(lines, count)
+
+
+def _pipe_tail(args):
+    """tail [N]: the last N lines"""
+    count = max(_pipe_size(args, "tail"), 0)
+    return lambda lines: iter(deque(lines, maxlen=count))
+
+
+def _pipe_count(args):
+    """count: the number of lines"""
+    if args:
+        raise ValueError("Usage: ... | count")
+    return lambda lines: iter((str(sum(1 for _ in lines)),))
+
+
+# Stages that can follow the first command of a pipeline. Each takes the
+# stage's arguments (raising ValueError with a message for bad ones) and
+# returns a function from an iterator of lines to an iterator of lines.
+PIPELINE_FILTERS = {
+    "grep": _pipe_grep,
+    "head": _pipe_head,
+    "tail": _pipe_tail,
+    "count": _pipe_count,
+}
+
+
+class TextIndex:
+    """Persistent inverted index (token -> file/line postings) of a directory tree
+    
+    Each indexed root has an SQLite database in the guyOS cache. Rebuilding
+    only re-reads files whose size or mtime changed, and files written
+    through guyOS are re-indexed as they change (appends only index the new
+    bytes). Binary files and files over TEXT_INDEX_MAX_FILE_SIZE are skipped.
+    """
+    TOKEN = r'\w{1,64}'
+    
+    # Roots that have an index, loaded from roots.json on first use
+    _roots = None
+    # Open indexes, keyed by root
+    _open = {}
+    
+    def __init__(self, root):
+        import hashlib
+        import re
+        import sqlite3
+        self.root = root
+        self.tokens = re.compile(self.TOKEN).findall
+        digest = hashlib.sha1(root.encode('utf-8', errors='surrogateescape')).hexdigest()
+        self.db_path = os.path.join(_cache_dir('textindex'), digest + '.db')
+        self.db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                id INTEGER PRIMARY KEY, path TEXT UNIQUE, size INTEGER, mtime REAL, newlines INTEGER);
+            CREATE TABLE IF NOT EXISTS postings (
+                token TEXT, file_id INTEGER, line INTEGER, PRIMARY KEY (token, file_id, line)) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_file ON postings (file_id);
+        """)
+    
+    @classmethod
+    def _registry(cls):
+        return os.path.join(_cache_dir('textindex'), 'roots.json')
+    
+    @classmethod
+    def roots(cls):
+        import json
+        if cls._roots is None:
+            try:
+                with open(cls._registry(), 'r', encoding='utf-8') as f:
+                    cls._roots = set(json.load(f))
+            except (OSError, ValueError):
+                cls._roots = set()
+        return cls._roots
+    
+    @classmethod
+    def open(cls, root, create=False):
+        """Return the index of root, or None if there is none and create is false"""
+        import json
+        index = cls._open.get(root)
+        if index is None:
+            if not create and root not in cls.roots():
+                return None
+            index = cls._open[root] = cls(root)
+            if root not in cls.roots():
+                cls.roots().add(root)
+                with open(cls._registry(), 'w', encoding='utf-8') as f:
+                    json.dump(sorted(cls.roots()), f)
+        return index
+    
+    @classmethod
+    def covering(cls, path):
+        """Return the indexes whose root contains path"""
+        return [cls.open(root) for root in cls.roots() if path.startswith(root.rstrip(os.sep) + os.sep)]
+    
+    def build(self):
+        """Bring the index up to date with the tree; returns (indexed, unchanged, removed)"""
+        known = {path: (file_id, size, mtime) for file_id, path, size, mtime
+                 in self.db.execute("SELECT id, path, size, mtime FROM files")}
+        cache_root = _cache_dir()
+        indexed = unchanged = 0
+        with self.db:
+            for path, is_dir, size, mtime in _walk_parallel(self.root, need_stat=True):
+                if is_dir or path.startswith(cache_root):
+                    continue
+                previous = known.pop(path, None)
+                if previous is not None and previous[1:] == (size, mtime):
+                    unchanged += 1
+                    continue
+                if self._index_file(path, previous[0] if previous else None):
+                    indexed += 1
+            for file_id, _, _ in known.values():
+                self._forget(file_id)
+        return indexed, unchanged, len(known)
+    
+    def update(self, path, appended_from=None):
+        """Re-index one file after it changed; appended_from is its size before an append"""
+        row = self.db.execute("SELECT id, size, newlines FROM files WHERE path = ?", (path,)).fetchone()
+        with self.db:
+            if row is not None and appended_from is not None and row[1] == appended_from:
+                self._index_file(path, row[0], start=appended_from, first_line=row[2] + 1)
+            else:
+                self._index_file(path, row[0] if row else None)
+    
+    def remove_tree(self, directory):
+        """Drop the files below directory, which was removed or moved out of the index"""
+        prefix = directory + os.sep
+        with self.db:
+            for file_id, in self.db.execute("SELECT id FROM files WHERE substr(path, 1, ?) = ?",
+                                            (len(prefix), prefix)).fetchall():
+                self._forget(file_id)
+    
+    def move_tree(self, src, dst):
+        """Re-key the files of a directory renamed from src to dst, keeping their postings"""
+        self.remove_tree(dst)
+        prefix = src + os.sep
+        with self.db:
+            self.db.execute("UPDATE files SET path = ? || substr(path, ?) WHERE substr(path, 1, ?) = ?",
+                            (dst + os.sep, len(prefix) + 1, len(prefix), prefix))
+    
+    def _forget(self, file_id):
+        self.db.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+        self.db.execute("DELETE FROM files WHERE id = ?", (file_id,))
+    
+    def _index_file(self, path, file_id, start=0, first_line=1):
+        """Add the postings of a file (from byte start, which lies on line first_line)"""
+        try:
+            with open(path, 'rb') as f:
+                stat_info = os.fstat(f.fileno())
+                if start == 0 and (stat_info.st_size > TEXT_INDEX_MAX_FILE_SIZE or b'\0' in f.read(8192)):
+                    if file_id is not None:
+                        self._forget(file_id)
+                    return False
+                f.seek(start)
+                data = f.read()
+        except OSError:
+            if file_id is not None:
+                self._forget(file_id)
+            return False
+        
+        newlines = first_line - 1 + data.count(b'\n')
+        if file_id is None:
+            file_id = self.db.execute("INSERT INTO files (path, size, mtime, newlines) VALUES (?, ?, ?, ?)",
+                                      (path, stat_info.st_size, stat_info.st_mtime, newlines)).lastrowid
+        else:
+            if start == 0:
+                self.db.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+            self.db.execute("UPDATE files SET size = ?, mtime = ?, newlines = ? WHERE id = ?",
+                            (stat_info.st_size, stat_info.st_mtime, newlines, file_id))
+        postings = ((token, file_id, line_number)
+                    for line_number, line in enumerate(data.decode('utf-8', errors='replace').split('\n'), first_line)
+                    for token in set(self.tokens(line.lower())))
+        self.db.executemany("INSERT OR IGNORE INTO postings VALUES (?, ?, ?)", postings)
+        return True
+    
+    def search(self, query, limit=100):
+        """Return (path, line number) pairs of the lines containing every token of query"""
+        tokens = sorted(set(self.tokens(query.lower())))
+        if not tokens:
+            return []
+        match = " INTERSECT ".join(["SELECT file_id, line FROM postings WHERE token = ?"] * len(tokens))
+        return self.db.execute(
+            f"SELECT files.path, hits.line FROM ({match}) AS hits JOIN files ON files.id = hits.file_id "
+            f"ORDER BY files.path, hits.line LIMIT ?", tokens + [limit]).fetchall()
+
+def _pump_pipe(pipe, name, lines, stop):
+    """Forward the lines of a pipe into a bounded queue until EOF or until stop is set"""
+    import queue
+    def put(item):
+        while not stop.is_set():
+            try:
+                lines.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+    
+    with pipe:
+        for line in iter(lambda: pipe.readline(READ_BLOCK_SIZE), b''):
+            if not put((name, line)):
+                return
+    put((name, None))
+
+
+class Job:
+    """A command running in the background under a JobScheduler"""
+    
+    def __init__(self, job_id, line):
+        self.id = job_id
+        self.line = line
+        self.status = "Queued"
+        self.process = None
+        self.task = None
+        self.cancelled = False
+        self.done = threading.Event()
+
+
+class JobScheduler:
+    """Background jobs of a guyOS shell, run on an asyncio loop in a helper thread
+    
+    Guython scripts run as asyncio subprocesses and every other command runs
+    in a worker thread. Output is streamed line by line, each line prefixed
+    with the id of the job that printed it.
+    """
+    
+    def __init__(self, shell, out=None):
+        self.shell = shell
+        self.out = out or sys.stdout
+        self.jobs = {}
+        self._next_id = 1
+        self._loop = None
+        self._write_lock = threading.Lock()
+    
+    def _ensure_loop(self):
+        if self._loop is None:
+            import asyncio
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(target=self._loop.run_forever, name="guyOS-jobs", daemon=True).start()
+        return self._loop
+    
+    def submit(self, commands, limit=None):
+        """Start (command, args) pairs as jobs, at most limit at a time; returns the jobs"""
+        import asyncio
+        jobs = []
+        for command, args in commands:
+            job = Job(self._next_id, " ".join([command] + list(args)))
+            self.jobs[job.id] = job
+            self._next_id += 1
+            jobs.append((job, command, args))
+        asyncio.run_coroutine_threadsafe(self._run_group(jobs, limit or len(jobs)), self._ensure_loop())
+        return [job for job, _, _ in jobs]
+    
+    async def _run_group(self, jobs, limit):
+        import asyncio
+        semaphore = asyncio.Semaphore(limit)
+        
+        async def run_one(job, command, args):
+            try:
+                async with semaphore:
+                    if job.cancelled:
+                        raise asyncio.CancelledError
+                    job.status = "Running"
+                    returncode = await self._run_job(job, command, args)
+                job.status = "Done" if returncode == 0 else f"Exit {returncode}"
+            except asyncio.CancelledError:
+                job.status = "Killed"
+            except Exception as e:
+                self._write(job, f"Error: {str(e)}")
+                job.status = "Failed"
+            if job.cancelled:
+                job.status = "Killed"
+            self._write(job, f"{job.status}\t{job.line}")
+            job.done.set()
+        
+        for job, command, args in jobs:
+            job.task = asyncio.ensure_future(run_one(job, command, args))
+        await asyncio.gather(*(job.task for job, _, _ in jobs), return_exceptions=True)
+    
+    async def _run_job(self, job, command, args):
+        import asyncio
+        loop = asyncio.get_running_loop()
+        if command == "guython" and args:
+            guython_path, found = self.shell._guython_interpreter()
+            if found and self.shell._guython_runner(guython_path) is None:
+                spec = self.shell._guython_job(guython_path, args)
+                if not isinstance(spec, str):
+                    return await self._run_process(job, spec[0])
+        return await loop.run_in_executor(None, self._run_in_thread, job, command, args)
+    
+    async def _run_process(self, job, argv):
+        import asyncio
+        process = await asyncio.create_subprocess_exec(*argv, stdout=asyncio.subprocess.PIPE,
+                                                       stderr=asyncio.subprocess.PIPE,
+                                                       cwd=self.shell.current_dir, limit=1024 * 1024)
+        job.process = process
+        try:
+            await asyncio.wait_for(asyncio.gather(self._pump(job, process.stdout, ""),
+                                                  self._pump(job, process.stderr, "stderr: ")),
+                                   self.shell._guython_timeout())
+        except asyncio.TimeoutError:
+            process.kill()
+            self._write(job, "Error: Guython execution timed out")
+        return await process.wait()
+    
+    async def _pump(self, job, stream, prefix):
+        while True:
+            line = await stream.readline()
+            if not line:
+                break
+            self._write(job, prefix + line.decode('utf-8', errors='replace').rstrip('\r\n'))
+    
+    def _run_in_thread(self, job, command, args):
+        """Run an in-process command, forwarding its output line by line"""
+        result = self.shell.execute(command, args)
+        if isinstance(result, str):
+            result = (result,)
+        returncode = 0
+        first = True
+        pending = ""
+        try:
+            for chunk in result:
+                if job.cancelled:
+                    break
+                if first and chunk:
+                    returncode = 1 if chunk.startswith(BATCH_FAILURE_PREFIXES) else 0
+                    first = False
+                if isinstance(chunk, CommandFailure):
+                    returncode = chunk.returncode
+                lines = (pending + chunk).split("\n")
+                pending = lines.pop()
+                for line in lines:
+                    self._write(job, line)
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+        if pending:
+            self._write(job, pending)
+        return returncode
+    
+    def _write(self, job, line):
+        with self._write_lock:
+            self.out.write(f"[{job.id}] {line}\n")
+            self.out.flush()
+    
+    def list(self):
+        if not self.jobs:
+            return "No jobs"
+        return "\n".join(f"[{job.id}] {job.status}\t{job.line}" for job in self.jobs.values())
+    
+    def wait(self, jobs=None):
+        """Block until the given jobs (default: all) have finished"""
+        for job in list(jobs if jobs is not None else self.jobs.values()):
+            while not job.done.wait(0.2):
+                pass
+    
+    def kill(self, job):
+        """Stop a job; in-process commands stop at their next chunk of output"""
+        if job.done.is_set():
+            return False
+        job.cancelled = True
+        if job.process is not None:
+            self._loop.call_soon_threadsafe(self._kill_process, job.process)
+        elif job.task is not None:
+            self._loop.call_soon_threadsafe(job.task.cancel)
+        return True
+    
+    @staticmethod
+    def _kill_process(process):
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+    
+    def shutdown(self):
+        """Kill every job that is still running"""
+        for job in self.jobs.values():
+            self.kill(job)
+
+class _Counters(threading.local):
+    """Counters bumped by code paths that do work the generic probes cannot see
+    
+    DirEntry.stat() does not go through os.stat, and bytes reached through
+    mmap (by this process or the workers it hands chunks to) never show up in
+    the read/write system call counters of /proc/self/io. The counters are
+    kept per thread, so that commands running side by side in a daemon are
+    measured apart; work handed to helper threads is counted by the thread
+    that collects its results.
+    """
+    
+    def __init__(self):
+        self.stat = 0
+        self.mapped_read = 0
+        self.mapped_written = 0
+
+
+_counters = _Counters()
+
+
+def _io_counters():
+    """Return (bytes read, bytes written) by this process so far, or None if unknown"""
+    try:
+        with open('/proc/self/io', 'rb') as f:
+            fields = dict(line.split(b': ') for line in f.read().splitlines())
+        return int(fields[b'rchar']), int(fields[b'wchar'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class _CommandSamples:
+    """Totals of one command and a uniform sample of at most PROFILE_MAX_SAMPLES of its wall times"""
+    __slots__ = ("count", "cpu", "max_wall", "walls")
+    
+    def __init__(self):
+        self.count = 0
+        self.cpu = 0.0
+        self.max_wall = 0.0
+        self.walls = []
+    
+    def add(self, metrics):
+        self.count += 1
+        self.cpu += metrics["cpu"]
+        wall = metrics["wall"]
+        self.max_wall = max(self.max_wall, wall)
+        if len(self.walls) < PROFILE_MAX_SAMPLES:
+            self.walls.append(wall)
+        else:
+            import random
+            kept = random.randrange(self.count)
+            if kept < PROFILE_MAX_SAMPLES:
+                self.walls[kept] = wall
+
+
+class CommandProfiler:
+    """Per-command metrics for a guyOS session
+    
+    Wall and CPU time are recorded for every command. A detailed measurement
+    (the time prefix, or every command under --profile) also counts the bytes
+    moved by read/write system calls (where /proc/self/io exists), the bytes
+    of files searched, counted or patched through mmap, files stat'ed and
+    peak Python memory, and --profile runs each command under cProfile.
+    Files stat'ed and mmap'd bytes are counted for the command's own thread;
+    the other figures are process-wide, so they include the work of any
+    command running at the same time.
+    """
+    
+    # Detailed measurements in progress in any thread. os.stat/os.lstat are
+    # replaced by counting versions (and tracemalloc started, unless it already
+    # was) while there is at least one.
+    _active = 0
+    _active_lock = threading.Lock()
+    _originals = None
+    _started_tracing = False
+    
+    def __init__(self):
+        # Command -> _CommandSamples; shared by the sessions of a daemon
+        self.samples = {}
+        self._samples_lock = threading.Lock()
+        self.cprofile = None
+    
+    def enable_cprofile(self):
+        import cProfile
+        self.cprofile = cProfile.Profile()
+    
+    def track(self, command, run, report=False):
+        """Run a command (run returns its result) and yield its output, recording metrics at the end"""
+        detailed = report or self.cprofile is not None
+        snapshot = self._start(detailed)
+        try:
+            result = run()
+            if isinstance(result, str):
+                yield result
+            else:
+                yield from result
+        finally:
+            metrics = self._stop(snapshot)
+            with self._samples_lock:
+                samples = self.samples.get(command)
+                if samples is None:
+                    samples = self.samples[command] = _CommandSamples()
+                samples.add(metrics)
+        if report:
+            yield "\n" + self.format(command, metrics)
+    
+    def _start(self, detailed):
+        snapshot = {"detailed": detailed, "cpu": self._cpu_time()}
+        if detailed:
+            self._activate()
+            snapshot["io"] = _io_counters()
+            snapshot["counters"] = dict(vars(_counters))
+            if self.cprofile is not None:
+                self.cprofile.enable()
+        snapshot["wall"] = time.perf_counter()
+        return snapshot
+    
+    def _stop(self, snapshot):
+        metrics = {"wall": time.perf_counter() - snapshot["wall"], "cpu": self._cpu_time() - snapshot["cpu"]}
+        if snapshot["detailed"]:
+            import tracemalloc
+            if self.cprofile is not None:
+                self.cprofile.disable()
+            for name, value in snapshot["counters"].items():
+                metrics[name] = getattr(_counters, name) - value
+            io_after = _io_counters()
+            if snapshot["io"] and io_after:
+                metrics["read"] = io_after[0] - snapshot["io"][0]
+                metrics["written"] = io_after[1] - snapshot["io"][1]
+            metrics["peak_memory"] = tracemalloc.get_traced_memory()[1]
+            self._deactivate()
+        return metrics
+    
+    @classmethod
+    def _activate(cls):
+        """Start a detailed measurement, counting stat calls and tracing memory if it is the first"""
+        import tracemalloc
+        with cls._active_lock:
+            cls._active += 1
+            if cls._active > 1:
+                # Overlapping measurements share one memory peak, taken from the first start
+                return
+            cls._originals = cls._count_stats()
+            cls._started_tracing = not tracemalloc.is_tracing()
+            if cls._started_tracing:
+                tracemalloc.start()
+            else:
+                tracemalloc.reset_peak()
+    
+    @classmethod
+    def _deactivate(cls):
+        """End a detailed measurement, putting os.stat/os.lstat back after the last one"""
+        import tracemalloc
+        with cls._active_lock:
+            cls._active -= 1
+            if cls._active:
+                return
+            os.stat, os.lstat = cls._originals
+            cls._originals = None
+            if cls._started_tracing:
+                tracemalloc.stop()
+    
+    @staticmethod
+    def _cpu_time():
+        """CPU time of this process and of the child processes it has waited for"""
+        times = os.times()
+        return time.process_time() + times.children_user + times.children_system
+    
+    @staticmethod
+    def _count_stats():
+        """Count os.stat/os.lstat calls until the returned originals are put back"""
+        stat, lstat = os.stat, os.lstat
+        
+        def counted_stat(*args, **kwargs):
+            _counters.stat += 1
+            return stat(*args, **kwargs)
+        
+        def counted_lstat(*args, **kwargs):
+            _counters.stat += 1
+            return lstat(*args, **kwargs)
+        
+        os.stat, os.lstat = counted_stat, counted_lstat
+        return stat, lstat
+    
+    @staticmethod
+    def format(command, metrics):
+        parts = [f"wall {metrics['wall'] * 1000:.3f} ms", f"cpu {metrics['cpu'] * 1000:.3f} ms"]
+        if "read" in metrics:
+            parts.append(f"syscall read {_format_bytes(metrics['read'])}")
+            parts.append(f"syscall written {_format_bytes(metrics['written'])}")
+        if metrics.get("mapped_read"):
+            parts.append(f"mmap read {_format_bytes(metrics['mapped_read'])}")
+        if metrics.get("mapped_written"):
+            parts.append(f"mmap written {_format_bytes(metrics['mapped_written'])}")
+        if "stat" in metrics:
+            parts.append(f"{metrics['stat']} files stat'ed")
+        if "peak_memory" in metrics:
+            parts.append(f"peak memory {_format_bytes(metrics['peak_memory'])}")
+        return f"[time] {command}: " + ", ".join(parts)
+    
+    def summary(self):
+        """Per-command wall time percentiles for the session
+        
+        Percentiles come from the sampled wall times; count, max and cpu
+        cover every run.
+        """
+        with self._samples_lock:
+            recorded = [(command, samples.count, samples.max_wall, samples.cpu, list(samples.walls))
+                        for command, samples in self.samples.items()]
+        if not recorded:
+            return "No commands recorded yet"
+        
+        def percentile(values, fraction):
+            return values[min(int(len(values) * fraction), len(values) - 1)]
+        
+        lines = [f"{'command':<12}{'count':>8}{'p50 ms':>12}{'p90 ms':>12}{'p99 ms':>12}{'max ms':>12}{'cpu ms':>12}"]
+        for command, count, max_wall, cpu, walls in sorted(recorded):
+            walls = sorted(wall * 1000 for wall in walls)
+            lines.append(f"{command:<12}{count:>8}{percentile(walls, 0.5):>12.3f}{percentile(walls, 0.9):>12.3f}"
+                         f"{percentile(walls, 0.99):>12.3f}{max_wall * 1000:>12.3f}{cpu * 1000:>12.3f}")
+        return "\n".join(lines)
+    
+    def dump(self, path=None, limit=25):
+        """Save the cProfile data to path, or print the top functions to stderr"""
+        if self.cprofile is None:
+            return
+        if path:
+            self.cprofile.dump_stats(path)
+            print(f"Profile written to {path}", file=sys.stderr)
+        else:
+            import pstats
+            pstats.Stats(self.cprofile, stream=sys.stderr).sort_stats("cumulative").print_stats(limit)
+
+class guyOS:
+    def __init__(self):
+        self.version = "1.0.0"
+        # Use real current working directory
+        self.current_dir = os.getcwd()
+        # cd also changes the process's directory, except in daemon sessions
+        self.change_process_dir = True
+        # Keep persistent line indexes for large files (see LineIndex)
+        self.use_line_index = True
+        self.listings = ListingCache()
+        self.commands = self._command_table()
+        # Guython interpreter, resolved once on first use
+        self._guython_path = None
+        self.guython_pool = None
+        self._scheduler = None
+        self.profiler = CommandProfiler()
+        # AppendBuffer for write -add, or None to append directly (see buffer_appends)
+        self.appends = None
+        
+    def ls(self, *args):
+        """List real directory contents"""
+        return "".join(self._ls_lines(*args))
+    
+    def _ls_lines(self, *args):
+        """Stream the lines of a directory listing
+        
+        Names come from the ListingCache. Sorted by name, only the entries
+        of the requested page are stat'ed and formatted; modification times
+        are formatted once per distinct second.
+        """
+        sort_key = "name"
+        reverse = False
+        limit = None
+        offset = 0
+        try:
+            options = iter(args)
+            for option in options:
+                if option == "--sort":
+                    sort_key = next(options)
+                    if sort_key not in ("name", "size", "time"):
+                        raise ValueError
+                elif option in ("--reverse", "-r"):
+                    reverse = True
+                elif option == "--limit":
+                    limit = int(next(options))
+                elif option == "--offset":
+                    offset = int(next(options))
+                else:
+                    raise ValueError
+        except (StopIteration, ValueError):
+            yield LS_USAGE
+            return
+        
+        try:
+            names = self.listings.get(self.current_dir)
+            if not names:
+                yield "Directory is empty"
+                return
+            
+            stop = None if limit is None else max(offset, 0) + max(limit, 0)
+            if sort_key == "name":
+                # Only the entries on the page are stat'ed
+                page = islice(reversed(names) if reverse else names, max(offset, 0), stop)
+                entries = ListingCache.stat(self.current_dir, page)
+            else:
+                entries = ListingCache.stat(self.current_dir, names)
+                if sort_key == "size":
+                    entries.sort(key=lambda entry: entry[2] or 0)
+                else:
+                    entries.sort(key=lambda entry: entry[3] or 0)
+                if reverse:
+                    entries.reverse()
+                entries = entries[max(offset, 0):stop]
+            
+            formatted_times = {}
+            separator = ""
+            for item, is_dir, size, mtime in entries:
+                if is_dir is None:
+                    line = f"{item}\t\t<UNKNOWN>\t<UNKNOWN>"
+                else:
+                    second = int(mtime)
+                    modified_time = formatted_times.get(second)
+                    if modified_time is None:
+                        modified_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(second))
+                        formatted_times[second] = modified_time
+                    if is_dir:
+                        line = f"{item}/\t\t<DIR>\t\t{modified_time}"
+                    else:
+                        line = f"{item}\t\t{size} bytes\t{modified_time}"
+                yield separator + line
+                separator = "\n"
+        except PermissionError:
+            yield "Error: Permission denied"
+        except FileNotFoundError:
+            yield "Error: Directory not found"
+        except Exception as e:
+            yield f"Error: {str(e)}"
+    
+    def cd(self, directory):
+        """Change to real directory"""
+        if not directory:
+            return "Error: No directory specified"
+        
+        if directory == "..":
+            parent_dir = os.path.dirname(self.current_dir)
+            if parent_dir != self.current_dir:  # Not at root
+                try:
+                    self._enter(parent_dir)
+                    return f"Changed to directory: {self.current_dir}"
+                except PermissionError:
+                    return "Error: Permission denied"
+                except Exception as e:
+                    return f"Error: {str(e)}"
+            else:
+                return "Already at root directory"
+        
+        # Handle relative and absolute paths
+        if os.path.isabs(directory):
+            target_path = directory
+        else:
+            target_path = os.path.join(self.current_dir, directory)
+        
+        if os.path.exists(target_path) and os.path.isdir(target_path):
+            try:
+                self._enter(target_path)
+                return f"Changed to directory: {self.current_dir}"
+            except PermissionError:
+                return "Error: Permission denied"
+            except Exception as e:
+                return f"Error: {str(e)}"
+        else:
+            return f"Error: Directory '{directory}' not found"
+    
+    def _enter(self, path):
+        """Make path the current directory"""
+        if self.change_process_dir:
+            os.chdir(path)
+            self.current_dir = os.getcwd()
+            return
+        # Sessions of a daemon share the process, so only check what chdir would
+        if not os.access(path, os.X_OK):
+            raise PermissionError(f"Permission denied: '{path}'")
+        self.current_dir = os.path.realpath(path)
+    
+    def session(self):
+        """Return a shell for one client of a daemon (see GuyOSServer)
+        
+        It has its own current directory, which cd no longer applies to the
+        process, and shares this shell's caches, buffered appends, Guython
+        interpreter and worker pool, and statistics.
+        """
+        shell = guyOS()
+        shell.current_dir = self.current_dir
+        shell.change_process_dir = False
+        shell.use_line_index = self.use_line_index
+        shell.listings = self.listings
+        shell._guython_path = self._guython_path
+        shell.guython_pool = self.guython_pool
+        shell.profiler = self.profiler
+        shell.appends = self.appends
+        return shell
+    
+    def _resolve_file(self, directory, filename):
+        """Build the normalized path of filename inside directory"""
+        if directory:
+            if os.path.isabs(directory):
+                file_path = os.path.join(directory, filename)
+            else:
+                file_path = os.path.join(self.current_dir, directory, filename)
+        else:
+            file_path = os.path.join(self.current_dir, filename)
+        return os.path.normpath(file_path)
+    
+    def _line_index(self, file_path):
+        """Return the LineIndex of file_path, or None if the file is too small to need one"""
+        if not self.use_line_index or os.path.getsize(file_path) < LINE_INDEX_MIN_SIZE:
+            return None
+        return LineIndex.get(file_path)
+    
+    def _line_span(self, file_path, line_number):
+        """Locate a 0-based line in a file
+        
+        Returns (start, end, found, line_count): the byte range of the line
+        including its terminator, whether it exists and, when it does not,
+        how many lines the file has (start and end are then the file size).
+        """
+        index = self._line_index(file_path)
+        if index is not None:
+            with index.lock:
+                count = index.line_count
+                start, end = index.span(line_number, line_number + 1)
+            return start, end, line_number < count, count
+        
+        offset = 0
+        count = 0
+        with open(file_path, 'rb') as f:
+            for line in f:
+                if count == line_number:
+                    return offset, offset + len(line), True, count
+                offset += len(line)
+                count += 1
+        return offset, offset, False, count
+    
+    def _splice(self, file_path, start, end, data):
+        """Replace the bytes start..end of a file with data
+        
+        Appends stay appends, replacements of the same length are patched in
+        place and anything else goes through an atomically renamed copy.
+        """
+        self._replace_ranges(file_path, [start], end - start, data)
+    
+    def _replace_text(self, file_path, old, new):
+        """Replace every occurrence of old in a file with new; returns how many there were"""
+        before = os.stat(file_path)
+        count = _replace_all(file_path, old, new)
+        if count:
+            if len(old) == len(new) and _same_line_breaks(old, new):
+                LineIndex.patched(file_path, before)
+            else:
+                LineIndex.invalidate(file_path)
+        return count
+    
+    def _replace_ranges(self, file_path, offsets, length, data):
+        """Replace the length bytes found at each of the sorted offsets with data"""
+        before = os.stat(file_path)
+        if offsets == [before.st_size] and length == 0:
+            with open(file_path, 'ab') as f:
+                f.write(data)
+            LineIndex.appended(file_path)
+        elif length == len(data) and length > 0:
+            with open(file_path, 'rb') as f:
+                f.seek(offsets[0])
+                old = f.read(length)
+            _patch_in_place(file_path, [(offset, data) for offset in offsets])
+            if _same_line_breaks(old, data):
+                LineIndex.patched(file_path, before)
+            else:
+                LineIndex.spliced(file_path, before, offsets, length, data)
+        else:
+            def pieces():
+                position = 0
+                for offset in offsets:
+                    yield (position, offset - position)
+                    yield data
+                    position = offset + length
+                yield (position, before.st_size - position)
+            _rewrite_file(file_path, pieces())
+            LineIndex.spliced(file_path, before, offsets, length, data)
+    
+    def read(self, *args):
+        """Read a real file with optional modifiers"""
+        return "".join(self._read_chunks(*args))
+    
+    def _read_chunks(self, *args, headers=True):
+        """Stream the output of read as text chunks
+        
+        Memory use is bounded by the size of the requested output, never by
+        the size of the file: -head and -lines stop reading once the range is
+        reached, -tail seeks backwards from the end of the file and a plain
+        read is forwarded block by block. Compressed files (gzip, bz2, xz and
+        zstd, recognised by their magic bytes) are decompressed as a stream;
+        -tail then keeps only the last lines while reading forward.
+        
+        Without headers (in pipelines), the header line of the output is
+        replaced by an empty chunk, leaving the file's text alone.
+        """
+        if len(args) < 2 or (args[0].startswith('-') and len(args) < 3):
+            yield READ_USAGE
+            return
+        
+        # Parse modifiers
+        modifier = None
+        if args[0].startswith('-'):
+            modifier = args[0]
+            directory = args[1]
+            filename = args[2]
+            extra_args = args[3:] if len(args) > 3 else []
+        else:
+            directory = args[0]
+            filename = args[1]
+            extra_args = []
+        
+        try:
+            file_path = self._resolve_file(directory, filename)
+            
+            if not os.path.exists(file_path):
+                yield f"Error: File '{filename}' not found"
+                return
+            
+            if not os.path.isfile(file_path):
+                yield f"Error: '{filename}' is not a file"
+                return
+            
+            # Compressed files are decompressed as a stream by every modifier
+            compression = _compression(file_path)
+            
+            # Apply modifiers
+            if modifier == "-lines":
+                if len(extra_args) >= 2:
+                    try:
+                        start = int(extra_args[0]) - 1  # Convert to 0-based indexing
+                        end = int(extra_args[1])
+                    except ValueError:
+                        yield "Error: Line numbers must be integers"
+                        return
+                    if start < 0:
+                        start = 0
+                    index = None if compression else self._line_index(file_path)
+                    if index is not None:
+                        # Jump straight to the first line with a single seek
+                        start_offset, end_offset = index.span(start, end)
+                        with open(file_path, 'rb') as f:
+                            f.seek(start_offset)
+                            data = f.read(end_offset - start_offset)
+                        content = ''.join(_decode_line(line) for line in data.splitlines(keepends=True))
+                    else:
+                        with _open_text(file_path, compression) as f:
+                            content = ''.join(islice(f, start, max(start, end)))
+                    yield f"Lines {start+1}-{end} of {filename}:\n{'-' * 30}\n" if headers else ""
+                    yield content
+                else:
+                    yield "Usage: read -lines {directory} {filename} {start_line} {end_line}"
+            
+            elif modifier == "-tail":
+                if len(extra_args) >= 1:
+                    try:
+                        num_lines = int(extra_args[0])
+                    except ValueError:
+                        yield "Error: Number of lines must be an integer"
+                        return
+                    if compression:
+                        # No seeking backwards in a compressed stream
+                        with _open_text(file_path, compression) as f:
+                            tail_lines = list(deque(f, maxlen=max(num_lines, 0)))
+                    else:
+                        tail_lines = _tail_lines(file_path, num_lines)
+                    content = ''.join(tail_lines)
+                    yield f"Last {len(tail_lines)} lines of {filename}:\n{'-' * 30}\n" if headers else ""
+                    yield content
+                else:
+                    yield "Usage: read -tail {directory} {filename} {number_of_lines}"
+            
+            elif modifier == "-head":
+                if len(extra_args) >= 1:
+                    try:
+                        num_lines = int(extra_args[0])
+                    except ValueError:
+                        yield "Error: Number of lines must be an integer"
+                        return
+                    with _open_text(file_path, compression) as f:
+                        head_lines = list(islice(f, max(num_lines, 0)))
+                    content = ''.join(head_lines)
+                    yield f"First {len(head_lines)} lines of {filename}:\n{'-' * 30}\n" if headers else ""
+                    yield content
+                else:
+                    yield "Usage: read -head {directory} {filename} {number_of_lines}"
+            
+            elif modifier == "-count":
+                jobs = os.cpu_count() or 1
+                if extra_args:
+                    if len(extra_args) != 2 or extra_args[0] != "--jobs":
+                        yield "Usage: read -count {directory} {filename} [--jobs N]"
+                        return
+                    try:
+                        jobs = int(extra_args[1])
+                    except ValueError:
+                        yield "Error: Number of jobs must be an integer"
+                        return
+                    if jobs < 1:
+                        yield "Error: Number of jobs must be at least 1"
+                        return
+                if compression:
+                    with _open_text(file_path, compression) as f:
+                        line_count, word_count, char_count = _count_stream(f)
+                else:
+                    line_count, word_count, char_count = _count_file(file_path, jobs)
+                yield f"File statistics for {filename}:\nLines: {line_count}\nWords: {word_count}\nCharacters: {char_count}"
+            
+            elif modifier == "-follow":
+                if len(extra_args) % 2:
+                    yield READ_USAGE
+                    return
+                files = [(file_path, filename)]
+                for other_directory, other_filename in zip(extra_args[::2], extra_args[1::2]):
+                    other_path = self._resolve_file(other_directory, other_filename)
+                    if not os.path.isfile(other_path):
+                        yield f"Error: File '{other_filename}' not found"
+                        return
+                    files.append((other_path, other_filename))
+                yield from self._follow_chunks(files, headers)
+            
+            else:
+                # No modifier or unknown modifier - stream entire file
+                with _open_text(file_path, compression) as f:
+                    yield f"Content of {filename}:\n{'-' * 30}\n" if headers else ""
+                    while True:
+                        chunk = f.read(READ_BLOCK_SIZE)
+                        if not chunk:
+                            break
+                        yield chunk
+            
+        except PermissionError:
+            yield f"Error: Permission denied reading '{filename}'"
+        except UnicodeDecodeError:
+            yield f"Error: Cannot read '{filename}' - file may be binary"
+        except Exception as e:
+            yield f"Error reading file: {str(e)}"
+    
+    def _follow_chunks(self, files, headers=True):
+        """Stream what is appended to files (a list of (path, label)) until interrupted
+        
+        Only the appended bytes are read on each change. Changes are waited
+        for with inotify on the files' directories, which also reports
+        rotation, or by polling every FOLLOW_POLL_INTERVAL seconds where
+        inotify is unavailable. Several files are followed with their lines
+        prefixed by '[label] '. An empty chunk is yielded whenever there is
+        nothing to show, so that the output can be flushed.
+        """
+        followed = [_FollowedFile(path, label) for path, label in files]
+        prefixed = len(followed) > 1
+        try:
+            inotify = _Inotify()
+            for directory in {os.path.dirname(path) for path, _ in files}:
+                inotify.watch(directory, _Inotify.IN_MODIFY | _Inotify.IN_ATTRIB |
+                              _Inotify.IN_CREATE | _Inotify.IN_MOVED_TO)
+            wait = inotify.wait
+        except (OSError, AttributeError):
+            inotify = None
+            wait = time.sleep
+        try:
+            names = ", ".join(entry.label for entry in followed)
+            yield f"Following {names} (Ctrl-C to stop):\n{'-' * 30}\n" if headers else ""
+            while True:
+                for entry in followed:
+                    text, notice = entry.poll()
+                    if notice and prefixed:
+                        if entry.pending:
+                            yield f"[{entry.label}] {entry.pending}\n"
+                            entry.pending = ""
+                        yield f"[{entry.label}] ({notice})\n"
+                    elif notice:
+                        yield f"\n[{entry.label}: {notice}]\n"
+                    if not text:
+                        continue
+                    if prefixed:
+                        lines = (entry.pending + text).split("\n")
+                        entry.pending = lines.pop()
+                        if lines:
+                            yield "".join(f"[{entry.label}] {line}\n" for line in lines)
+                    else:
+                        yield text
+                yield ""
+                wait(FOLLOW_POLL_INTERVAL)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for entry in followed:
+                entry.close()
+            if inotify is not None:
+                inotify.close()
+    
+    def write(self, *args):
+        """Write to a real file with optional modifiers"""
+        if len(args) < 3:
+            return WRITE_USAGE
+        
+        # Check for modifiers
+        modifier = None
+        if args[0].startswith('-'):
+            modifier = args[0]
+            directory = args[1]
+            filename = args[2]
+            extra_args = args[3:]
+        else:
+            directory = args[0]
+            filename = args[1]
+            content = " ".join(args[2:])
+            extra_args = []
+        
+        try:
+            # Construct the file path
+            if directory:
+                if os.path.isabs(directory):
+                    dir_path = directory
+                    file_path = os.path.join(directory, filename)
+                else:
+                    dir_path = os.path.join(self.current_dir, directory)
+                    file_path = os.path.join(self.current_dir, directory, filename)
+            else:
+                dir_path = self.current_dir
+                file_path = os.path.join(self.current_dir, filename)
+            
+            # Normalize the paths
+            dir_path = os.path.normpath(dir_path)
+            file_path = os.path.normpath(file_path)
+            
+            # Create directory if it doesn't exist
+            if not os.path.exists(dir_path):
+                os.makedirs(dir_path)
+            # Only -add and overwrites keep a compressed file intact
+            if modifier in ("-line", "-insert", "-replace") and os.path.isfile(file_path) \
+                    and os.path.getsize(file_path):
+                compression = _compression(file_path)
+                if compression:
+                    return f"Error: Cannot use write {modifier} on '{filename}' ({compression}-compressed)"
+            
+            # Handle different modifiers
+            if modifier == "-add":
+                content = " ".join(extra_args)
+                if self.appends is not None and self.appends.add(file_path, content):
+                    return f"Content added to '{filename}' at {file_path}"
+                # Check if file exists to determine if we need a newline
+                try:
+                    appended_from = os.path.getsize(file_path)
+                except OSError:
+                    appended_from = None
+                compression = _compression(file_path) if appended_from else None
+                if compression:
+                    # Concatenated members decompress as one stream
+                    with open(file_path, 'ab') as f:
+                        f.write(_compress(('\n' + content).encode('utf-8'), compression))
+                    LineIndex.invalidate(file_path)
+                    self._file_changed(file_path)
+                    return f"Content added to '{filename}' at {file_path} ({compression})"
+                with open(file_path, 'a', encoding='utf-8') as f:
+                    if appended_from is not None:
+                        f.write('\n' + content)
+                    else:
+                        f.write(content)
+                self._appended(file_path, appended_from)
+                return f"Content added to '{filename}' at {file_path}"
+            
+            elif modifier == "-line":
+                if len(extra_args) >= 2:
+                    try:
+                        line_number = int(extra_args[0]) - 1  # Convert to 0-based indexing
+                    except ValueError:
+                        return "Error: Line number must be an integer"
+                    if line_number < 0:
+                        return "Error: Line numbers start at 1"
+                    new_content = " ".join(extra_args[1:])
+                    
+                    if not os.path.exists(file_path):
+                        open(file_path, 'wb').close()
+                    start, end, found, line_count = self._line_span(file_path, line_number)
+                    eol = _line_ending(file_path)
+                    if found:
+                        # Replace only the bytes of the specific line
+                        self._splice(file_path, start, end, new_content.encode('utf-8') + eol)
+                    else:
+                        # Extend the file with empty lines up to the new one
+                        padding = eol * (line_number - line_count)
+                        self._splice(file_path, start, end,
+                                     _terminate(file_path) + padding + new_content.encode('utf-8') + eol)
+                    
+                    self._file_changed(file_path)
+                    return f"Line {line_number + 1} in '{filename}' replaced successfully"
+                else:
+                    return "Usage: write -line {directory} {filename} {line_number} {content}"
+            
+            elif modifier == "-replace":
+                if len(extra_args) >= 2:
+                    old_text = extra_args[0]
+                    new_text = " ".join(extra_args[1:])
+                    
+                    if not os.path.exists(file_path):
+                        return f"Error: File '{filename}' does not exist"
+                    
+                    # Replace text
+                    if self._replace_text(file_path, old_text.encode('utf-8'), new_text.encode('utf-8')):
+                        self._file_changed(file_path)
+                        return f"Text replaced in '{filename}' successfully"
+                    else:
+                        return f"Text '{old_text}' not found in '{filename}'"
+                else:
+                    return "Usage: write -replace {directory} {filename} {old_text} {new_text}"
+            
+            elif modifier == "-insert":
+                if len(extra_args) >= 2:
+                    try:
+                        line_number = int(extra_args[0]) - 1  # Convert to 0-based indexing
+                    except ValueError:
+                        return "Error: Line number must be an integer"
+                    if line_number < 0:
+                        return "Error: Line numbers start at 1"
+                    new_content = " ".join(extra_args[1:])
+                    
+                    if not os.path.exists(file_path):
+                        open(file_path, 'wb').close()
+                    start, end, found, line_count = self._line_span(file_path, line_number)
+                    eol = _line_ending(file_path)
+                    if found:
+                        # Insert new line in front of the existing one
+                        self._splice(file_path, start, start, new_content.encode('utf-8') + eol)
+                    else:
+                        # If line number is beyond file, pad with empty lines
+                        padding = eol * (line_number - line_count)
+                        self._splice(file_path, start, end,
+                                     _terminate(file_path) + padding + new_content.encode('utf-8') + eol)
+                    
+                    self._file_changed(file_path)
+                    return f"Content inserted at line {line_number + 1} in '{filename}' successfully"
+                else:
+                    return "Usage: write -insert {directory} {filename} {line_number} {content}"
+            
+            else:
+                # No modifier - write entire file (overwrite)
+                if os.path.exists(file_path):
+                    with _atomic_replace(file_path) as f:
+                        f.write(content.encode('utf-8'))
+                    LineIndex.invalidate(file_path)
+                else:
+                    with open(file_path, 'w', encoding='utf-8') as f:
+                        f.write(content)
+                self._file_changed(file_path)
+                return f"File '{filename}' written successfully to {file_path}"
+            
+        except PermissionError:
+            return f"Error: Permission denied writing to '{filename}'"
+        except Exception as e:
+            return f"Error writing file: {str(e)}"
+    
+    def _relative(self, path):
+        """Show a path relative to the current directory when it lies below it"""
+        relative = os.path.relpath(path, self.current_dir)
+        return path if relative.startswith('..') else relative
+    
+    def _copy_paths(self, source, destination):
+        """Resolve the source and destination of cp/mv, or return an error message"""
+        src = os.path.normpath(os.path.join(self.current_dir, source))
+        dst = os.path.normpath(os.path.join(self.current_dir, destination))
+        if not os.path.lexists(src):
+            return f"Error: '{source}' not found"
+        if os.path.isdir(dst):
+            dst = os.path.join(dst, os.path.basename(src))
+        if os.path.exists(dst) and os.path.samefile(src, dst):
+            return f"Error: '{source}' and '{destination}' are the same file"
+        if os.path.isdir(src) and not os.path.islink(src) and (dst + os.sep).startswith(src + os.sep):
+            return f"Error: Cannot copy '{source}' into itself"
+        return src, dst
+    
+    def _copy(self, src, dst, progress):
+        """Copy a file or tree; returns [(source, error)] of the files that failed"""
+        if os.path.isdir(src) and not os.path.islink(src):
+            failures = _copy_tree(src, dst, progress)
+            copied = (os.path.join(path, name) for path, _, names in os.walk(dst) for name in names)
+        else:
+            progress.total_files += 1
+            progress.total_bytes += os.lstat(src).st_size
+            _copy_file(src, dst, progress)
+            failures = []
+            copied = (dst,)
+        self.listings.invalidate(os.path.dirname(dst))
+        if TextIndex.covering(dst + os.sep):
+            for path in copied:
+                LineIndex.invalidate(path)
+                self._file_changed(path)
+        elif not failures and not os.path.isdir(dst):
+            LineIndex.invalidate(dst)
+        return failures
+    
+    def _copy_report(self, verb, source, destination, progress, failures):
+        elapsed = progress.elapsed()
+        report = (f"{verb} {progress.files} files ({_format_bytes(progress.bytes)}) from '{source}' to "
+                  f"'{destination}' in {elapsed:.2f}s ({_format_bytes(progress.bytes / max(elapsed, 1e-9))}/s)")
+        if progress.reflinked:
+            report += f", {progress.reflinked} reflinked"
+        if failures:
+            errors = "\n".join(f"  {self._relative(path)}: {error}" for path, error in failures)
+            return f"Error: {len(failures)} files could not be copied\n{errors}\n{report}"
+        return report
+    
+    def cp(self, *args):
+        """Copy files, or directory trees with -r, without decoding them"""
+        recursive = bool(args) and args[0] in ("-r", "-R")
+        paths = args[1:] if recursive else args
+        if len(paths) != 2:
+            return CP_USAGE
+        resolved = self._copy_paths(*paths)
+        if isinstance(resolved, str):
+            return resolved
+        src, dst = resolved
+        if os.path.isdir(src) and not os.path.islink(src) and not recursive:
+            return f"Error: '{paths[0]}' is a directory (use -r)"
+        progress = _CopyProgress()
+        try:
+            failures = self._copy(src, dst, progress)
+        except PermissionError:
+            return f"Error: Permission denied copying '{paths[0]}'"
+        except OSError as e:
+            return f"Error copying '{paths[0]}': {e.strerror or e}"
+        finally:
+            progress.finish()
+        return self._copy_report("Copied", *paths, progress, failures)
+    
+    def mv(self, *args):
+        """Move files or directories, by renaming them where possible"""
+        import shutil
+        if len(args) != 2:
+            return MV_USAGE
+        resolved = self._copy_paths(*args)
+        if isinstance(resolved, str):
+            return resolved
+        src, dst = resolved
+        is_tree = os.path.isdir(src) and not os.path.islink(src)
+        try:
+            try:
+                # A rename moves whole trees at once but only within one filesystem
+                (os.rename if is_tree else os.replace)(src, dst)
+            except OSError as e:
+                import errno
+                if e.errno != errno.EXDEV:
+                    raise
+            else:
+                self.listings.invalidate(os.path.dirname(dst))
+                if is_tree:
+                    self._tree_moved(src, dst)
+                else:
+                    LineIndex.invalidate(dst)
+                    self._file_changed(src)
+                    self._file_changed(dst)
+                return f"Moved '{args[0]}' to '{args[1]}'"
+            progress = _CopyProgress()
+            try:
+                failures = self._copy(src, dst, progress)
+            finally:
+                progress.finish()
+            if failures:
+                return self._copy_report("Copied", *args, progress, failures) + f"\n'{args[0]}' was left in place"
+            if is_tree:
+                shutil.rmtree(src)
+                for text_index in TextIndex.covering(src + os.sep):
+                    text_index.remove_tree(src)
+            else:
+                os.unlink(src)
+                self._file_changed(src)
+            return self._copy_report("Moved", *args, progress, failures) + " (copied across filesystems)"
+        except PermissionError:
+            return f"Error: Permission denied moving '{args[0]}'"
+        except OSError as e:
+            return f"Error moving '{args[0]}': {e.strerror or e}"
+    
+    def find(self, *args):
+        """Find files by name, type, size and modification time"""
+        return "".join(self._find_lines(*args))
+    
+    def _find_lines(self, *args):
+        """Stream the paths below a directory that pass every filter"""
+        directory = "."
+        name = None
+        kind = None
+        size_test = None
+        mtime_test = None
+        max_count = None
+        try:
+            options = iter(args)
+            for option in options:
+                if option == "-name":
+                    name = next(options)
+                elif option == "-type":
+                    kind = next(options)
+                    if kind not in ("f", "d"):
+                        raise ValueError
+                elif option == "-size":
+                    value = next(options)
+                    size_test = (value[:1] if value[:1] in "+-" else "", _parse_size(value.lstrip("+-")))
+                elif option == "-mtime":
+                    value = next(options)
+                    mtime_test = (value[:1] if value[:1] in "+-" else "", float(value.lstrip("+-")) * 86400)
+                elif option == "--max-count":
+                    max_count = int(next(options))
+                elif option.startswith("-"):
+                    raise ValueError
+                else:
+                    directory = option
+        except (StopIteration, ValueError):
+            yield FIND_USAGE
+            return
+        
+        root = os.path.normpath(os.path.join(self.current_dir, directory))
+        if not os.path.isdir(root):
+            yield f"Error: Directory '{directory}' not found"
+            return
+        
+        import fnmatch
+        now = time.time()
+        found = 0
+        for path, is_dir, size, mtime in _walk_parallel(root, need_stat=bool(size_test or mtime_test)):
+            if kind == "f" and is_dir or kind == "d" and not is_dir:
+                continue
+            if name is not None and not fnmatch.fnmatch(os.path.basename(path), name):
+                continue
+            if size_test is not None:
+                sign, limit = size_test
+                if sign == "+" and size <= limit or sign == "-" and size >= limit or not sign and size != limit:
+                    continue
+            if mtime_test is not None:
+                sign, age = mtime_test
+                if sign == "+" and now - mtime <= age or sign == "-" and now - mtime >= age:
+                    continue
+                if not sign and not age <= now - mtime < age + 86400:
+                    continue
+            yield ("\n" if found else "") + self._relative(path)
+            found += 1
+            if max_count is not None and found >= max_count:
+                return
+        if not found:
+            yield "No files found"
+    
+    def grep(self, *args):
+        """Search files for a regular expression"""
+        return "".join(self._grep_lines(*args))
+    
+    def _grep_lines(self, *args):
+        """Stream path:line:text for every matching line
+        
+        Files are scanned in batches. Once enough data has gone through to
+        make it worthwhile the batches are spread over a process pool, and
+        results are printed as soon as each batch finishes (so files from
+        different batches may appear in any order).
+        """
+        import re
+        recursive = False
+        ignore_case = False
+        max_count = None
+        jobs = os.cpu_count() or 1
+        positional = []
+        try:
+            options = iter(args)
+            for option in options:
+                if option in ("-r", "-R"):
+                    recursive = True
+                elif option == "-i":
+                    ignore_case = True
+                elif option == "--max-count":
+                    max_count = int(next(options))
+                elif option == "--jobs":
+                    jobs = int(next(options))
+                elif option.startswith("-") and not positional:
+                    raise ValueError
+                else:
+                    positional.append(option)
+        except (StopIteration, ValueError):
+            yield GREP_USAGE
+            return
+        if not positional:
+            yield GREP_USAGE
+            return
+        pattern = positional[0]
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            yield f"Error: Invalid pattern '{pattern}': {e}"
+            return
+        
+        def files():
+            for target in positional[1:] or ["."]:
+                path = os.path.normpath(os.path.join(self.current_dir, target))
+                if os.path.isdir(path):
+                    if not recursive:
+                        yield f"Error: '{target}' is a directory (use -r)"
+                        continue
+                    for entry_path, is_dir, _, _ in _walk_parallel(path):
+                        if not is_dir:
+                            yield entry_path
+                elif os.path.isfile(path):
+                    yield path
+                else:
+                    yield f"Error: File '{target}' not found"
+        
+        from concurrent.futures import wait, FIRST_COMPLETED
+        pool = None
+        pending = set()
+        scanned = 0
+        shown = 0
+        
+        def batches():
+            batch = []
+            batch_size = 0
+            for path in files():
+                if path.startswith("Error:"):
+                    yield path
+                    continue
+                batch.append(path)
+                try:
+                    batch_size += os.path.getsize(path)
+                except OSError:
+                    pass
+                if len(batch) >= 64 or batch_size >= PARALLEL_CHUNK_SIZE:
+                    yield batch, batch_size
+                    batch = []
+                    batch_size = 0
+            if batch:
+                yield batch, batch_size
+        
+        def report(results):
+            nonlocal shown
+            for path, matches in results:
+                for line_number, line in matches:
+                    if max_count is not None and shown >= max_count:
+                        return
+                    yield ("\n" if shown else "") + f"{self._relative(path)}:{line_number}:{line}"
+                    shown += 1
+        
+        try:
+            for batch in batches():
+                if isinstance(batch, str):
+                    yield ("\n" if shown else "") + batch
+                    shown += 1
+                    continue
+                paths, batch_size = batch
+                remaining = None if max_count is None else max_count - shown
+                if pool is None and jobs > 1 and scanned >= PARALLEL_MIN_SIZE:
+                    from concurrent.futures import ProcessPoolExecutor
+                    pool = ProcessPoolExecutor(max_workers=jobs)
+                scanned += batch_size
+                _counters.mapped_read += batch_size
+                if pool is None:
+                    yield from report(_grep_files(paths, pattern, ignore_case, remaining))
+                else:
+                    pending.add(pool.submit(_grep_files, paths, pattern, ignore_case, remaining))
+                    # Keep a bounded number of batches in flight
+                    while len(pending) >= jobs * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield from report(future.result())
+                if max_count is not None and shown >= max_count:
+                    return
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from report(future.result())
+                if max_count is not None and shown >= max_count:
+                    return
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        if not shown:
+            yield "No matches found"
+    
+    def index(self, *args):
+        """Build or update the full-text index of the current directory tree"""
+        if args and args != ("--rebuild",):
+            return "Usage: index [--rebuild]"
+        start = time.perf_counter()
+        text_index = TextIndex.open(self.current_dir, create=True)
+        if args:
+            with text_index.db:
+                text_index.db.execute("DELETE FROM postings")
+                text_index.db.execute("DELETE FROM files")
+        indexed, unchanged, removed = text_index.build()
+        return (f"Indexed {indexed} files in {self.current_dir} ({unchanged} unchanged, {removed} removed) "
+                f"in {time.perf_counter() - start:.2f}s")
+    
+    def search(self, *args):
+        """Search the full-text index of the current directory (or the nearest indexed parent)"""
+        limit = 100
+        if len(args) >= 2 and args[-2] == "--limit":
+            try:
+                limit = int(args[-1])
+            except ValueError:
+                return "Error: Limit must be an integer"
+            args = args[:-2]
+        if not args:
+            return "Usage: search {word} [word ...] [--limit N]"
+        
+        directory = self.current_dir
+        text_index = TextIndex.open(directory)
+        while text_index is None and os.path.dirname(directory) != directory:
+            directory = os.path.dirname(directory)
+            text_index = TextIndex.open(directory)
+        if text_index is None:
+            return "Error: No index for this directory (run 'index' first)"
+        
+        hits = text_index.search(" ".join(args), limit)
+        if not hits:
+            return "No matches found"
+        output = []
+        by_file = OrderedDict()
+        for path, line_number in hits:
+            by_file.setdefault(path, []).append(line_number)
+        for path, line_numbers in by_file.items():
+            lines = self._lines_of(path, line_numbers)
+            for line_number in line_numbers:
+                output.append(f"{self._relative(path)}:{line_number}:{lines.get(line_number, '')}")
+        return "\n".join(output)
+    
+    def _lines_of(self, file_path, line_numbers):
+        """Fetch some 1-based lines of a file as {line number: text}"""
+        lines = {}
+        try:
+            index = self._line_index(file_path)
+            if index is not None:
+                with open(file_path, 'rb') as f:
+                    for line_number in line_numbers:
+                        start, end = index.span(line_number - 1, line_number)
+                        f.seek(start)
+                        lines[line_number] = _decode_line(f.read(end - start)).rstrip('\n')
+            else:
+                wanted = set(line_numbers)
+                last = max(wanted)
+                with open(file_path, 'rb') as f:
+                    for line_number, line in enumerate(f, 1):
+                        if line_number in wanted:
+                            lines[line_number] = _decode_line(line).rstrip('\n')
+                        if line_number >= last:
+                            break
+        except OSError:
+            pass
+        return lines
+    
+    def _appended(self, file_path, appended_from):
+        """Update the indexes of a file after write -add (appended_from: size before, or None)"""
+        LineIndex.appended(file_path)
+        self._file_changed(file_path, appended_from)
+    
+    def buffer_appends(self, fsync=False):
+        """Queue write -add lines in an AppendBuffer instead of appending them one by one"""
+        if self.appends is None:
+            self.appends = AppendBuffer(fsync=fsync, on_flush=self._appended)
+        return self.appends
+    
+    def sync(self, *args):
+        """Write out buffered appends and fsync the files they went to"""
+        if args:
+            return "Usage: sync"
+        if self.appends is None:
+            return "Nothing to sync (appends are not buffered)"
+        lines, files = self.appends.pending()
+        self.appends.flush(sync=True)
+        return f"Synced {lines} pending lines to {files} files"
+    
+    def _file_changed(self, file_path, appended_from=None):
+        """Update the full-text indexes covering a file written through guyOS"""
+        for text_index in TextIndex.covering(file_path):
+            text_index.update(file_path, appended_from)
+    
+    def _tree_moved(self, src, dst):
+        """Update the full-text indexes after a directory was renamed from src to dst
+        
+        Indexes covering both places only re-key the moved files; the others
+        drop them or index them from scratch.
+        """
+        before = TextIndex.covering(src + os.sep)
+        after = TextIndex.covering(dst + os.sep)
+        for text_index in before:
+            if text_index in after:
+                text_index.move_tree(src, dst)
+            else:
+                text_index.remove_tree(src)
+        added = [text_index for text_index in after if text_index not in before]
+        if added:
+            for path, is_dir, _, _ in _walk_parallel(dst):
+                if not is_dir:
+                    for text_index in added:
+                        text_index.update(path)
+    
+    def ver(self):
+        """Show version information"""
+        return f"guyOS Version {self.version}\nCopyright (c) 2024 Guy Industries\nMock Operating System"
+    
+    def help(self):
+        """Show help information"""
+        plugin_help = [help_line for _, help_line in _plugin_commands.values() if help_line]
+        if plugin_help:
+            return HELP_TEXT + "\n\nPlugin commands:\n" + "\n".join(plugin_help)
+        return HELP_TEXT
+    
+    def _guython_interpreter(self):
+        """Return (path, exists) for the Guython interpreter, resolving it only once"""
+        if self._guython_path is None:
+            path = _find_guython()
+            if not os.path.exists(path):
+                return path, False
+            self._guython_path = path
+        return self._guython_path, True
+    
+    def _guython_runner(self, guython_path):
+        """Return the GuythonPool to run jobs on, or None to spawn one process per call
+        
+        The pool is only used when $GUYTHON_WORKER_ARGS gives the arguments
+        that start the interpreter in worker mode; $GUYTHON_WORKERS and
+        $GUYTHON_WORKER_MAX_JOBS size it.
+        """
+        if self.guython_pool is None:
+            worker_args = os.environ.get('GUYTHON_WORKER_ARGS')
+            if not worker_args:
+                return None
+            import atexit
+            import shlex
+            self.guython_pool = GuythonPool([guython_path] + shlex.split(worker_args),
+                                            size=int(os.environ.get('GUYTHON_WORKERS', 2)),
+                                            max_jobs=int(os.environ.get('GUYTHON_WORKER_MAX_JOBS', 100)),
+                                            timeout=self._guython_timeout())
+            atexit.register(self.guython_pool.close)
+            self.guython_pool.warm_up()
+        return self.guython_pool
+    
+    def _guython_timeout(self):
+        """Per-job timeout in seconds from $GUYTHON_TIMEOUT (None for no limit)"""
+        timeout = os.environ.get('GUYTHON_TIMEOUT')
+        return float(timeout) if timeout else None
+    
+    def _guython_job(self, guython_path, args):
+        """Turn guython arguments into (argv, pool request), or an error message"""
+        # Handle different argument patterns
+        if args[0] == "-c":
+            # Execute code directly
+            if len(args) < 2:
+                return "Error: No code provided for -c option"
+            code = " ".join(args[1:])
+            return [guython_path, "-c", code], {"code": code, "cwd": self.current_dir}
+        
+        # Execute script file
+        script_file = args[0]
+        script_args = list(args[1:]) if len(args) > 1 else []
+        
+        # Check if script file exists (handle relative/absolute paths)
+        if not os.path.isabs(script_file):
+            script_path = os.path.join(self.current_dir, script_file)
+        else:
+            script_path = script_file
+        
+        if not os.path.exists(script_path):
+            return f"Error: Script file '{script_file}' not found"
+        
+        request = {"script": os.path.abspath(script_path), "args": script_args, "cwd": self.current_dir}
+        return [guython_path, script_path] + script_args, request
+    
+    def _guython_stream(self, *args):
+        """Stream Guython output line by line while the script runs
+        
+        stdout and stderr are forwarded through a bounded queue by one reader
+        thread per pipe, so memory stays constant however much the script
+        prints. Only the last GUYTHON_TAIL_LINES lines of stderr are kept for
+        the error summary, and --tee copies the output to a file as it comes.
+        """
+        import queue
+        import subprocess
+        tee_path = None
+        while args and args[0] in ("--stream", "--tee"):
+            if args[0] == "--tee":
+                if len(args) < 2:
+                    yield "Error: No file given for --tee"
+                    return
+                tee_path = os.path.join(self.current_dir, args[1])
+                args = args[2:]
+            else:
+                args = args[1:]
+        
+        guython_path, found = self._guython_interpreter()
+        if not found:
+            yield f"Error: Guython interpreter not found at {guython_path}\nPlease install Guython or check the installation path."
+            return
+        if not args:
+            yield GUYTHON_USAGE
+            return
+        job = self._guython_job(guython_path, args)
+        if isinstance(job, str):
+            yield job
+            return
+        argv, _ = job
+        
+        try:
+            process = subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=self.current_dir)
+        except FileNotFoundError:
+            yield f"Error: Could not execute Guython interpreter at {guython_path}"
+            return
+        lines = queue.Queue(maxsize=1024)
+        stop = threading.Event()
+        for name, pipe in (("stdout", process.stdout), ("stderr", process.stderr)):
+            threading.Thread(target=_pump_pipe, args=(pipe, name, lines, stop), daemon=True).start()
+        
+        stderr_tail = deque(maxlen=GUYTHON_TAIL_LINES)
+        tee = open(tee_path, 'w', encoding='utf-8') if tee_path else None
+        timeout = self._guython_timeout()
+        deadline = time.monotonic() + timeout if timeout else None
+        printed = False
+        at_line_start = True
+        timed_out = False
+        try:
+            open_pipes = 2
+            while open_pipes:
+                try:
+                    wait = None if deadline is None else max(deadline - time.monotonic(), 0)
+                    name, line = lines.get(timeout=wait)
+                except queue.Empty:
+                    timed_out = True
+                    break
+                if line is None:
+                    open_pipes -= 1
+                    continue
+                text = line.decode('utf-8', errors='replace')
+                if tee is not None:
+                    tee.write(text)
+                if name == "stderr":
+                    stderr_tail.append(text)
+                    if at_line_start:
+                        text = "stderr: " + text
+                printed = True
+                at_line_start = text.endswith("\n")
+                yield text
+            if timed_out:
+                process.kill()
+            returncode = process.wait()
+        finally:
+            stop.set()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            if tee is not None:
+                tee.close()
+        
+        summary = [] if at_line_start else [""]
+        if timed_out:
+            summary.append("Error: Guython execution timed out")
+        elif returncode != 0:
+            summary.append(f"Process exited with code: {returncode}")
+            if stderr_tail:
+                summary.append(f"Last {len(stderr_tail)} lines of errors:")
+                summary.append("-" * 20)
+                summary.append("".join(stderr_tail).rstrip("\n"))
+        elif not printed:
+            summary.append("Script executed successfully (no output)")
+        if summary != [""]:
+            text = "\n".join(summary)
+            yield CommandFailure(text, returncode or 1) if returncode or timed_out else text
+    
+    def guython(self, *args):
+        """Execute Guython scripts or commands"""
+        import subprocess
+        if args and args[0] in ("--stream", "--tee"):
+            chunks = list(self._guython_stream(*args))
+            failures = [chunk for chunk in chunks if isinstance(chunk, CommandFailure)]
+            return CommandFailure("".join(chunks), failures[-1].returncode) if failures else "".join(chunks)
+        guython_path, found = self._guython_interpreter()
+        
+        # Check if Guython interpreter exists
+        if not found:
+            return f"Error: Guython interpreter not found at {guython_path}\nPlease install Guython or check the installation path."
+        
+        if len(args) == 0:
+            return "Usage: guython {script_file}"
+        
+        job = self._guython_job(guython_path, args)
+        if isinstance(job, str):
+            return job
+        argv, request = job
+        
+        try:
+            pool = self._guython_runner(guython_path)
+            if pool is not None:
+                result = pool.run(request)
+            else:
+                result = subprocess.run(argv, capture_output=True, text=True,
+                                        cwd=self.current_dir, timeout=self._guython_timeout())
+            
+            # Format output
+            output = []
+            if result.stdout:
+                output.append("Output:")
+                output.append("-" * 20)
+                output.append(result.stdout.strip())
+            
+            if result.stderr:
+                if output:
+                    output.append("")
+                output.append("Errors:")
+                output.append("-" * 20)
+                output.append(result.stderr.strip())
+            
+            if result.returncode != 0:
+                if output:
+                    output.append("")
+                output.append(f"Process exited with code: {result.returncode}")
+                return CommandFailure("\n".join(output), result.returncode)
+            
+            return "\n".join(output) if output else "Script executed successfully (no output)"
+            
+        except subprocess.TimeoutExpired:
+            return "Error: Guython execution timed out"
+        except subprocess.CalledProcessError as e:
+            return f"Error: Guython execution failed with code {e.returncode}\n{e.stderr}"
+        except FileNotFoundError:
+            return f"Error: Could not execute Guython interpreter at {guython_path}"
+        except RuntimeError as e:
+            return f"Error: {str(e)}"
+    
+    def pwd(self):
+        """Print working directory"""
+        return f"Current real directory: {self.current_dir}"
+    
+    @property
+    def scheduler(self):
+        """The JobScheduler for background jobs, started on first use"""
+        if self._scheduler is None:
+            self._scheduler = JobScheduler(self)
+        return self._scheduler
+    
+    def background(self, command, args):
+        """Start a command as a background job"""
+        if command == "parallel":
+            return self.parallel(*args, wait=False)
+        if command in FOREGROUND_COMMANDS:
+            return f"Error: '{command}' cannot run in the background"
+        if command not in self.commands:
+            return f"Unknown command: {command}\nType 'help' for available commands"
+        job, = self.scheduler.submit([(command, args)])
+        return f"[{job.id}] Started: {job.line}"
+    
+    def jobs(self):
+        """List background jobs"""
+        return self.scheduler.list()
+    
+    def _find_jobs(self, args):
+        """Look up job ids given as arguments; returns (jobs, error)"""
+        found = []
+        for arg in args:
+            try:
+                found.append(self.scheduler.jobs[int(arg.lstrip('%'))])
+            except (ValueError, KeyError):
+                return None, f"Error: No such job '{arg}'"
+        return found, None
+    
+    def wait(self, *args):
+        """Wait for background jobs (all of them without arguments)"""
+        jobs, error = self._find_jobs(args)
+        if error:
+            return error
+        self.scheduler.wait(jobs or None)
+        return "All jobs finished" if not args else f"Job(s) {' '.join(args)} finished"
+    
+    def kill(self, *args):
+        """Kill background jobs"""
+        if not args:
+            return "Usage: kill {job_id} [job_id ...]"
+        jobs, error = self._find_jobs(args)
+        if error:
+            return error
+        output = []
+        for job in jobs:
+            if self.scheduler.kill(job):
+                output.append(f"[{job.id}] Killing: {job.line}")
+            else:
+                output.append(f"[{job.id}] Already finished: {job.line}")
+        return "\n".join(output)
+    
+    def parallel(self, *args, wait=True):
+        """Fan out guython scripts or file counts over a bounded number of jobs"""
+        limit = os.cpu_count() or 1
+        if len(args) >= 2 and args[0] == "-j":
+            try:
+                limit = int(args[1])
+            except ValueError:
+                return "Error: Number of jobs must be an integer"
+            if limit < 1:
+                return "Error: Number of jobs must be at least 1"
+            args = args[2:]
+        
+        if len(args) >= 2 and args[0] == "guython":
+            commands = [("guython", [script]) for script in args[1:]]
+        elif len(args) >= 3 and args[0] == "count":
+            commands = [("read", ["-count", args[1], filename, "--jobs", "1"]) for filename in args[2:]]
+        else:
+            return PARALLEL_USAGE
+        
+        jobs = self.scheduler.submit(commands, limit)
+        if wait:
+            self.scheduler.wait(jobs)
+            failed = [job for job in jobs if job.status != "Done"]
+            if failed:
+                return CommandFailure(f"{len(jobs)} jobs finished, {len(failed)} failed: " +
+                                      ", ".join(f"[{job.id}] {job.status}" for job in failed))
+            return f"{len(jobs)} jobs finished"
+        return "\n".join(f"[{job.id}] Started: {job.line}" for job in jobs)
+    
+    def _pipeline(self, parts):
+        """Run 'command [args] | stage [args] | ...' (see PIPELINE_FILTERS)
+        
+        Every stage is checked before anything runs. The output of the first
+        command is split into lines and pulled through the stages one line at
+        a time, so a stage that stops early (head) also stops the command:
+        read only gets as far into the file as the pipeline needed.
+        """
+        stages = [[]]
+        for part in parts:
+            if part == "|":
+                stages.append([])
+            else:
+                stages[-1].append(part)
+        if not all(stages):
+            return "Error: Empty pipeline stage"
+        filters = []
+        for name, *args in stages[1:]:
+            make_filter = PIPELINE_FILTERS.get(name.lower())
+            if make_filter is None:
+                return f"Error: Unknown pipeline stage '{name}' (available: {', '.join(PIPELINE_FILTERS)})"
+            try:
+                filters.append(make_filter(args))
+            except ValueError as e:
+                return str(e)
+        return self._pipeline_lines(stages[0][0].lower(), stages[0][1:], filters)
+    
+    def _pipeline_lines(self, command, args, filters):
+        if command == "read":
+            # Without headers, read yields '' before the file's lines, so that a file
+            # starting with 'Error' is not taken for one
+            source = iter(self._read_chunks(*args, headers=False))
+        else:
+            source = self.execute(command, args)
+            source = iter((source,) if isinstance(source, str) else source)
+        opened = [source]
+        try:
+            first_chunk = next(source, "")
+            if first_chunk.startswith(BATCH_FAILURE_PREFIXES):
+                # Errors go straight to the output
+                yield first_chunk
+                yield from source
+                return
+            lines = _chunk_lines(chain((first_chunk,), source))
+            opened.append(lines)
+            for make_filter in filters:
+                lines = make_filter(lines)
+                opened.append(lines)
+            first = True
+            for line in lines:
+                yield line if first else "\n" + line
+                first = False
+        finally:
+            for stage in reversed(opened):
+                if hasattr(stage, "close"):
+                    stage.close()
+    
+    def _command_table(self):
+        """Map command names to handlers that take the argument list
+        
+        Handlers return a string or an iterable of text chunks (see _emit).
+        Commands registered by plugins (see register_command) are added after
+        the built-in ones.
+        """
+        _load_plugins()
+        table = {
+            "ls": lambda args: self._ls_lines(*args),
+            "cd": lambda args: self.cd(args[0] if args else ""),
+            "read": lambda args: self._read_chunks(*args),
+            "write": lambda args: self.write(*args) if len(args) >= 3 else WRITE_USAGE,
+            "guython": self._guython_command,
+            "ver": lambda args: self.ver(),
+            "help": lambda args: self.help(),
+            "pwd": lambda args: self.pwd(),
+            "jobs": lambda args: self.jobs(),
+            "wait": lambda args: self.wait(*args),
+            "kill": lambda args: self.kill(*args),
+            "parallel": lambda args: self.parallel(*args),
+            "cp": lambda args: self.cp(*args),
+            "mv": lambda args: self.mv(*args),
+            "find": lambda args: self._find_lines(*args),
+            "grep": lambda args: self._grep_lines(*args),
+            "index": lambda args: self.index(*args),
+            "search": lambda args: self.search(*args),
+            "sync": lambda args: self.sync(*args),
+            "time": self._time_command,
+            "stats": lambda args: self.profiler.summary(),
+        }
+        for name, (handler, _) in _plugin_commands.items():
+            table.setdefault(name, lambda args, handler=handler: handler(self, args))
+        return table
+    
+    def _guython_command(self, args):
+        """Dispatch guython, streaming its output when --stream or --tee is given"""
+        if not args:
+            return GUYTHON_USAGE
+        if args[0] in ("--stream", "--tee"):
+            return self._guython_stream(*args)
+        return self.guython(*args)
+    
+    def _time_command(self, args):
+        """Run a command and report its detailed metrics after its output"""
+        if not args:
+            return "Usage: time {command} [args]"
+        command = args[0].lower()
+        return self.profiler.track(command, lambda: self.execute(command, args[1:]), report=True)
+    
+    def _measured(self, command, args, handler=None):
+        """Execute a command, recording its metrics once its output has been consumed
+        
+        Buffered appends are flushed before any command other than write -add,
+        so every command sees the lines appended before it.
+        """
+        if self.appends is not None and command != "sync" and not (command == "write" and args[:1] == ["-add"]):
+            self.appends.flush()
+        if command == "time":
+            # Recorded under the name of the command it times
+            return handler(args) if handler else self.execute(command, args)
+        if handler is None:
+            return self.profiler.track(command, lambda: self.execute(command, args))
+        return self.profiler.track(command, lambda: handler(args))
+    
+    def execute(self, command, args):
+        """Run one command and return its result
+        
+        A trailing '&' argument runs the command as a background job, and '|'
+        arguments make it the first command of a pipeline.
+        """
+        if args and args[-1] == "&":
+            return self.background(command, args[:-1])
+        if "|" in args:
+            return self._pipeline([command] + args)
+        handler = self.commands.get(command)
+        if handler is None:
+            return f"Unknown command: {command}\nType 'help' for available commands"
+        return handler(args)
+    
+    def _emit(self, result, out=None):
+        """Print a command result given as a string or an iterable of text chunks"""
+        out = out or sys.stdout
+        if isinstance(result, str):
+            result = (result,)
+        for chunk in result:
+            if not chunk:
+                # Commands that wait for more output yield '' before blocking
+                out.flush()
+            out.write(chunk)
+        out.write("\n")
+    
+    def run_batch(self, script, out=None, status=False, stop_on_error=False):
+        """Run a script of guyOS commands without prompting
+        
+        The whole script is parsed and every command resolved to its handler
+        before anything runs. Output goes through one large write buffer and
+        failed commands (and, with status, every command) are reported on
+        stderr. Returns the exit code: 0 if every command succeeded, else 1.
+        """
+        out = out or open(sys.stdout.fileno(), 'w', buffering=1024 * 1024,
+                          encoding=sys.stdout.encoding, errors='replace', closefd=False)
+        lookup = self.commands.get
+        jobs = []
+        for line_number, line in enumerate(script, 1):
+            parts = line.split()
+            if not parts or parts[0].startswith('#'):
+                continue
+            command = parts[0].lower()
+            # Background jobs ('... &') and pipelines go through execute()
+            handler = lookup(command) if parts[-1] != "&" and "|" not in parts else None
+            jobs.append((line_number, line.strip(), command, handler, parts[1:]))
+        
+        executed = failed = 0
+        try:
+            for line_number, line, command, handler, args in jobs:
+                if command == "exit":
+                    break
+                executed += 1
+                result = self._measured(command, args, handler)
+                ok = True
+                first = True
+                for chunk in result:
+                    if first and chunk:
+                        ok = not chunk.startswith(BATCH_FAILURE_PREFIXES)
+                        first = False
+                    elif not chunk:
+                        out.flush()
+                    if isinstance(chunk, CommandFailure):
+                        ok = False
+                    out.write(chunk)
+                out.write("\n")
+                if not ok:
+                    failed += 1
+                if status or not ok:
+                    out.flush()
+                    print(f"[{'ok' if ok else 'FAILED'}] line {line_number}: {line}", file=sys.stderr)
+                if not ok and stop_on_error:
+                    break
+        finally:
+            out.flush()
+            if self._scheduler is not None:
+                self._scheduler.wait()
+            if self.appends is not None:
+                self.appends.flush()
+        print(f"guyOS batch: {executed} commands, {failed} failed", file=sys.stderr)
+        return 1 if failed else 0
+    
+    def run(self):
+        """Main loop for the operating system"""
+        print("=" * 50)
+        print("Welcome to guyOS!")
+        print("=" * 50)
+        print("Type 'help' for available commands or 'exit' to quit.")
+        print("All commands now work with your computer's real file system!")
+        print()
+        
+        while True:
+            try:
+                # Show prompt
+                prompt = f"guyOS:{self.current_dir}$ "
+                user_input = input(prompt).strip()
+                
+                if not user_input:
+                    continue
+                
+                # Parse command
+                parts = user_input.split()
+                command = parts[0].lower()
+                args = parts[1:]
+                
+                # Execute commands
+                if command == "exit":
+                    if self._scheduler is not None:
+                        self._scheduler.shutdown()
+                    print("Goodbye from guyOS!")
+                    break
+                self._emit(self._measured(command, args))
+                
+                print()  # Add blank line for readability
+                
+            except KeyboardInterrupt:
+                print("\nUse 'exit' to quit guyOS")
+            except EOFError:
+                print("\nGoodbye")
+                break
+
+
+BENCH_DIR_SIZES = (10, 10000, 100000)
+BENCH_FILE_SIZES = (1024, 1024 ** 2, 64 * 1024 ** 2, 1024 ** 3, 4 * 1024 ** 3)
+
+
+def _parse_size(text):
+    """Parse a byte count such as 4096, 64K, 16M or 4G"""
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    text = text.strip().upper().rstrip("B")
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def _format_size(size):
+    for unit in ("G", "M", "K"):
+        factor = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}[unit]
+        if size >= factor and size % factor == 0:
+            return f"{size // factor}{unit}"
+    return str(size)
+
+
+def _bench_fixtures(root, dir_sizes, file_sizes):
+    """Create the directories and text files the benchmark runs against"""
+    import random
+    rng = random.Random(0)
+    words = ["guy", "os", "alpha", "beta", "gamma", "delta", "epsilon", "read", "write", "x" * 40]
+    lines = []
+    while sum(map(len, lines)) < 1024 * 1024:
+        # Line lengths vary from empty to a few hundred characters
+        lines.append(" ".join(rng.choice(words) for _ in range(rng.randint(0, 40))) + "\n")
+    block = "".join(lines).encode("utf-8")
+    
+    for count in dir_sizes:
+        directory = os.path.join(root, f"dir_{count}")
+        os.makedirs(directory, exist_ok=True)
+        for i in range(count):
+            open(os.path.join(directory, f"entry_{i:06d}.txt"), "wb").close()
+    
+    files = os.path.join(root, "files")
+    os.makedirs(files, exist_ok=True)
+    for size in file_sizes:
+        with open(os.path.join(files, f"file_{_format_size(size)}.txt"), "wb") as f:
+            written = 0
+            while written < size:
+                piece = block[:size - written]
+                if written == 0:
+                    piece = b"MARKER " + piece[7:]
+                f.write(piece)
+                written += len(piece)
+
+
+def _bench_cases(root, dir_sizes, file_sizes, guython):
+    """List the benchmark cases as (name, command line, working directory, cold) tuples"""
+    cases = []
+    for count in dir_sizes:
+        directory = os.path.join(root, f"dir_{count}")
+        cases.append((f"ls/{count}/cold", "ls", directory, True))
+        cases.append((f"ls/{count}/warm", "ls", directory, False))
+    files = os.path.join(root, "files")
+    for size in file_sizes:
+        name = f"file_{_format_size(size)}.txt"
+        tag = _format_size(size)
+        for case, line in (("read", f"read . {name}"),
+                           ("read-head", f"read -head . {name} 10"),
+                           ("read-tail", f"read -tail . {name} 10"),
+                           ("read-lines", f"read -lines . {name} 1000 1010"),
+                           ("read-count", f"read -count . {name}"),
+                           ("write-add", f"write -add . {name} appended line"),
+                           ("write-line", f"write -line . {name} 1000 replaced line"),
+                           ("write-insert", f"write -insert . {name} 1000 inserted line"),
+                           ("write-replace-same", f"write -replace . {name} MARKER MARKER"),
+                           # A different length forces a full copy instead of an in-place patch
+                           ("write-replace-grow", f"write -replace . {name} MARKER MARKERS")):
+            cases.append((f"{case}/{tag}", line, files, False))
+    if guython:
+        cases.append(("guython-dispatch", "guython -c pass", root, False))
+    return cases
+
+
+def _bench_run_case(line, cwd, cold, repeats):
+    """Run one benchmark case in the current (fresh) process"""
+    try:
+        import resource
+        rss = lambda: resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // (1024 if sys.platform == "darwin" else 1)
+    except ImportError:
+        rss = lambda: None
+    shell = guyOS()
+    shell.current_dir = cwd
+    parts = line.split()
+    fixture = None
+    if parts[0] == "write":
+        # Writes run against a fresh copy of the fixture, made before each run and not
+        # timed, so that every repetition (and every later case) sees the same file
+        import shutil
+        import tempfile
+        fixture = os.path.join(cwd, parts[3])
+        shell.current_dir = tempfile.mkdtemp(prefix="scratch-", dir=os.path.dirname(cwd))
+    
+    def run():
+        if fixture is not None:
+            shutil.copy2(fixture, os.path.join(shell.current_dir, parts[3]))
+        start = time.perf_counter()
+        result = shell.execute(parts[0], parts[1:])
+        if not isinstance(result, str):
+            for _ in result:
+                pass
+        return time.perf_counter() - start
+    
+    rss_before = rss()
+    try:
+        if not cold:
+            # Warm the caches the case is supposed to hit
+            run()
+        timings = []
+        for _ in range(repeats):
+            if cold:
+                shell.listings = ListingCache()
+            timings.append(run())
+    finally:
+        if fixture is not None:
+            shutil.rmtree(shell.current_dir, ignore_errors=True)
+    rss_after = rss()
+    timings.sort()
+    return {
+        "median_s": timings[len(timings) // 2],
+        "min_s": timings[0],
+        "max_s": timings[-1],
+        "repeats": repeats,
+        "peak_rss_kb": rss_after,
+        "rss_growth_kb": None if rss_after is None else rss_after - rss_before,
+    }
+
+
+def _bench_compare(results, baseline, threshold):
+    """Return lines describing cases whose median got slower than baseline by more than threshold"""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous.get("median_s"):
+            continue
+        ratio = result["median_s"] / previous["median_s"]
+        if ratio > 1 + threshold:
+            regressions.append(f"{name}: {previous['median_s']:.6f}s -> {result['median_s']:.6f}s "
+                               f"(+{(ratio - 1) * 100:.1f}%)")
+    return regressions
+
+
+def bench(argv=None):
+    """Benchmark the guyOS commands on synthetic fixtures: guyOS bench --help"""
+    import json
+    import shutil
+    import tempfile
+    import argparse
+    import platform
+    from concurrent.futures import ProcessPoolExecutor
+    parser = argparse.ArgumentParser(prog="guyOS bench", description="Benchmark guyOS commands")
+    parser.add_argument("--dir-sizes", default=",".join(map(str, BENCH_DIR_SIZES)),
+                        help="comma separated entry counts of the listed directories")
+    parser.add_argument("--max-file-size", default="64M",
+                        help="largest file fixture to generate (fixtures go up to 4G)")
+    parser.add_argument("--repeats", type=int, default=5, help="timed runs per case")
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this text")
+    parser.add_argument("--workdir", help="where to create the fixtures (default: a temporary directory)")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown of the median that counts as a regression")
+    options = parser.parse_args(argv)
+    
+    dir_sizes = [int(size) for size in options.dir_sizes.split(",") if size]
+    max_size = _parse_size(options.max_file_size)
+    file_sizes = [size for size in BENCH_FILE_SIZES if size <= max_size]
+    root = options.workdir or tempfile.mkdtemp(prefix="guyOS-bench-")
+    _, found = guyOS()._guython_interpreter()
+    # Keep line indexes of the fixtures out of the user's cache
+    os.environ.setdefault('GUYOS_CACHE_DIR', os.path.join(root, "cache"))
+    try:
+        print(f"Generating fixtures in {root}...", file=sys.stderr)
+        _bench_fixtures(root, dir_sizes, file_sizes)
+        results = {}
+        for name, line, cwd, cold in _bench_cases(root, dir_sizes, file_sizes, found):
+            if options.filter not in name:
+                continue
+            # Every case gets a fresh process so peak RSS belongs to that case alone
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                results[name] = pool.submit(_bench_run_case, line, cwd, cold, options.repeats).result()
+            print(f"{name:32} {results[name]['median_s'] * 1000:10.3f} ms", file=sys.stderr)
+    finally:
+        if not options.workdir:
+            shutil.rmtree(root, ignore_errors=True)
+    
+    report = {
+        "version": guyOS().version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    
+    if options.baseline:
+        with open(options.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("results", {})
+        regressions = _bench_compare(results, baseline, options.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions beyond {options.threshold * 100:.0f}%", file=sys.stderr)
+    return 0
+
+
+class GuyOSServer:
+    """guyOS daemon serving the commands of one shared process on a Unix socket
+    
+    Every connection gets its own session (see guyOS.session) with its own
+    current directory, while the directory listing cache, line and text
+    indexes, buffered appends, Guython interpreter and worker pool are shared.
+    The protocol is JSON lines: a request is {"command": "ls --sort size"}
+    and its response is any number of {"output": "..."} messages followed by
+    {"done": true, "ok": ..., "cwd": "..."}. Commands run on a thread pool
+    and their output is sent as it is produced, in pieces of at most
+    SERVE_CHUNK_SIZE characters, at the pace the client reads it. A command
+    that is waiting for more output (read -follow) is stopped once its
+    client hangs up, and every command is stopped when the daemon shuts down.
+    """
+    
+    def __init__(self, path, shell=None, workers=None):
+        self.path = path
+        self.shell = shell or guyOS()
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        self.clients = 0
+        self._writers = set()
+        self._stopping = threading.Event()
+    
+    def run(self):
+        import asyncio
+        try:
+            asyncio.run(self.serve())
+        finally:
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+    
+    async def serve(self):
+        import asyncio
+        import signal
+        import stat
+        from concurrent.futures import ThreadPoolExecutor
+        self.shell.listings.watch_changes()
+        # Resolve what sessions share once, before any client needs it
+        guython_path, found = self.shell._guython_interpreter()
+        if found:
+            self.shell._guython_runner(guython_path)
+        if os.path.exists(self.path) and stat.S_ISSOCK(os.stat(self.path).st_mode):
+            os.unlink(self.path)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="guyOS-serve")
+        server = await asyncio.start_unix_server(self._client, path=self.path, limit=SERVE_CHUNK_SIZE * 4)
+        stop = asyncio.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            asyncio.get_running_loop().add_signal_handler(signum, stop.set)
+        print(f"guyOS serving on {self.path} ({self.workers} workers)", file=sys.stderr)
+        async with server:
+            await stop.wait()
+        # Make running commands stop at their next chunk and unblock those waiting on a client
+        self._stopping.set()
+        for writer in list(self._writers):
+            writer.transport.abort()
+        await asyncio.get_running_loop().run_in_executor(
+            None, lambda: self._executor.shutdown(wait=True, cancel_futures=True))
+    
+    async def _client(self, reader, writer):
+        import json
+        import asyncio
+        loop = asyncio.get_running_loop()
+        session = self.shell.session()
+        self.clients += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    parts = json.loads(line)["command"].split()
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    await self._send(writer, {"output": "Error: Bad request"})
+                    await self._send(writer, {"done": True, "ok": False, "cwd": session.current_dir})
+                    continue
+                if parts and parts[0].lower() == "exit":
+                    break
+                ok = await loop.run_in_executor(self._executor, self._run, session, parts, writer, loop)
+                await self._send(writer, {"done": True, "ok": ok, "cwd": session.current_dir})
+        except (ConnectionError, ValueError):
+            # Client went away (or sent a line over the size limit)
+            pass
+        finally:
+            self.clients -= 1
+            self._writers.discard(writer)
+            writer.close()
+    
+    @staticmethod
+    async def _send(writer, message):
+        import json
+        writer.write((json.dumps(message, ensure_ascii=False) + "\n").encode('utf-8'))
+        await writer.drain()
+    
+    def _run(self, session, parts, writer, loop):
+        """Run one command in a worker thread, forwarding its output; returns whether it succeeded"""
+        import asyncio
+        import select
+        
+        def send(text):
+            asyncio.run_coroutine_threadsafe(self._send(writer, {"output": text}), loop).result()
+        
+        def hung_up():
+            # A closed Unix socket peer shows as POLLHUP; a client that only shut down
+            # its sending side (and still reads the output) does not
+            poller = select.poll()
+            poller.register(writer.get_extra_info('socket').fileno(), select.POLLHUP)
+            return any(events & (select.POLLHUP | select.POLLERR) for _, events in poller.poll(0))
+        
+        if not parts:
+            return True
+        command, args = parts[0].lower(), parts[1:]
+        if command in SERVE_UNSUPPORTED or (args and args[-1] == "&"):
+            send(f"Error: '{command}{' &' if args and args[-1] == '&' else ''}' is not available over --serve")
+            return False
+        result = session._measured(command, args)
+        if isinstance(result, str):
+            result = (result,)
+        ok = True
+        first = True
+        pending = []
+        size = 0
+        try:
+            for chunk in result:
+                if self._stopping.is_set():
+                    return False
+                if first and chunk:
+                    ok = not chunk.startswith(BATCH_FAILURE_PREFIXES)
+                    first = False
+                if isinstance(chunk, CommandFailure):
+                    ok = False
+                pending.append(chunk)
+                size += len(chunk)
+                # An empty chunk means the command is about to wait for more output
+                if size >= SERVE_CHUNK_SIZE or (not chunk and size):
+                    send("".join(pending))
+                    pending = []
+                    size = 0
+                elif not chunk and hung_up():
+                    raise ConnectionResetError("client went away")
+            if size:
+                send("".join(pending))
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+        return ok
+
+
+def connect(path):
+    """Thin client of a guyOS daemon: send the commands read from stdin, print the responses
+    
+    The session starts in the client's working directory. Returns 0 if every
+    command succeeded, else 1 (2 if the daemon cannot be reached).
+    """
+    import json
+    import socket
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(path)
+    except OSError as e:
+        print(f"Error: Cannot connect to guyOS daemon at '{path}': {e.strerror}", file=sys.stderr)
+        return 2
+    responses = client.makefile('r', encoding='utf-8', newline='\n')
+    interactive = sys.stdin.isatty()
+    
+    def request(line, show=True):
+        client.sendall((json.dumps({"command": line}) + "\n").encode('utf-8'))
+        for message in responses:
+            message = json.loads(message)
+            if message.get("done"):
+                if show:
+                    sys.stdout.write("\n")
+                    sys.stdout.flush()
+                return message
+            if show:
+                sys.stdout.write(message["output"])
+        raise ConnectionError("guyOS daemon closed the connection")
+    
+    failed = 0
+    try:
+        cwd = request(f"cd {os.getcwd()}", show=False)["cwd"]
+        while True:
+            try:
+                line = input(f"guyOS@{path}:{cwd}$ ") if interactive else sys.stdin.readline()
+            except EOFError:
+                break
+            if not interactive and not line:
+                break
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.lower() == "exit":
+                break
+            response = request(line)
+            cwd = response["cwd"]
+            if not response["ok"]:
+                failed += 1
+    except KeyboardInterrupt:
+        pass
+    except (ConnectionError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        client.close()
+    return 1 if failed else 0
+
+
+def loadgen(argv=None):
+    """Measure the requests per second of a guyOS daemon: guyOS loadgen --help"""
+    import json
+    import shutil
+    import tempfile
+    import argparse
+    import asyncio
+    parser = argparse.ArgumentParser(prog="guyOS loadgen", description="Load generator for guyOS --serve")
+    parser.add_argument("socket", nargs="?",
+                        help="socket of a running daemon (default: start one on a temporary socket)")
+    parser.add_argument("--clients", type=int, default=8, help="concurrent connections")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per connection")
+    parser.add_argument("--command", default="ls", help="command line to send")
+    parser.add_argument("--cwd", default=os.getcwd(), help="directory the sessions run the command in")
+    options = parser.parse_args(argv)
+    
+    daemon = None
+    path = options.socket
+    if path is None:
+        import subprocess
+        path = os.path.join(tempfile.mkdtemp(prefix="guyOS-loadgen-"), "guyOS.sock")
+        daemon = subprocess.Popen([sys.executable, LAUNCHER, "--serve", path],
+                                  stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + 10
+        while not os.path.exists(path):
+            if daemon.poll() is not None or time.monotonic() > deadline:
+                print("Error: The guyOS daemon did not start", file=sys.stderr)
+                return 2
+            time.sleep(0.05)
+    
+    request = (json.dumps({"command": options.command}) + "\n").encode('utf-8')
+    cd = (json.dumps({"command": f"cd {options.cwd}"}) + "\n").encode('utf-8')
+    
+    async def client(latencies, failures):
+        reader, writer = await asyncio.open_unix_connection(path, limit=SERVE_CHUNK_SIZE * 8)
+        
+        async def call(line):
+            writer.write(line)
+            while True:
+                message = json.loads(await reader.readline())
+                if message.get("done"):
+                    return message
+        
+        await call(cd)
+        for _ in range(options.requests):
+            start = time.perf_counter()
+            message = await call(request)
+            latencies.append(time.perf_counter() - start)
+            if not message["ok"]:
+                failures.append(message)
+        writer.close()
+    
+    async def run_clients():
+        latencies = []
+        failures = []
+        start = time.perf_counter()
+        await asyncio.gather(*(client(latencies, failures) for _ in range(options.clients)))
+        return latencies, failures, time.perf_counter() - start
+    
+    try:
+        latencies, failures, elapsed = asyncio.run(run_clients())
+    except OSError as e:
+        print(f"Error: Cannot connect to guyOS daemon at '{path}': {e.strerror}", file=sys.stderr)
+        return 2
+    finally:
+        if daemon is not None:
+            daemon.terminate()
+            daemon.wait()
+            shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+    
+    latencies.sort()
+    percentile = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    print(f"{len(latencies)} requests of '{options.command}' from {options.clients} clients in {elapsed:.2f}s")
+    print(f"Throughput: {len(latencies) / elapsed:.0f} requests/s")
+    print(f"Latency: p50 {percentile(0.5):.3f} ms, p99 {percentile(0.99):.3f} ms, max {latencies[-1] * 1000:.3f} ms")
+    if failures:
+        print(f"Failed requests: {len(failures)}")
+    return 1 if failures else 0
+
+
+def startup_profile(runs=10):
+    """Measure how long guyOS takes to reach its first prompt, and which imports it pays for
+    
+    Every run starts a fresh interpreter that exits at the first prompt, as
+    'python guyOS.py' (checked against STARTUP_BUDGET_MS) and as
+    'python -m guyOS'. Both only compile the small launcher and load this
+    module from its cached bytecode, refreshed here first. A bare
+    interpreter is timed the same way for comparison. The imports are those
+    python -X importtime reports beyond the interpreter's own.
+    """
+    import subprocess
+    import py_compile
+    module_env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        filter(None, [os.path.dirname(LAUNCHER), os.environ.get('PYTHONPATH')])))
+    as_script = [sys.executable, LAUNCHER]
+    as_module = [sys.executable, "-m", os.path.splitext(os.path.basename(LAUNCHER))[0]]
+    
+    def median_ms(argv, stdin=b"exit\n", env=None):
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run(argv, input=stdin, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
+            times.append((time.perf_counter() - start) * 1000)
+        return sorted(times)[len(times) // 2]
+    
+    def top_level_imports(argv, env=None):
+        report = subprocess.run(argv[:1] + ["-X", "importtime"] + argv[1:], input=b"exit\n", env=env,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE).stderr.decode('utf-8', 'replace')
+        modules = {}
+        for line in report.splitlines():
+            fields = line.split("|")
+            if len(fields) == 3 and fields[2].startswith(" ") and not fields[2].startswith("  "):
+                try:
+                    modules[fields[2].strip()] = int(fields[1]) / 1000
+                except ValueError:
+                    pass
+        return modules
+    
+    py_compile.compile(os.path.abspath(__file__))
+    bare = median_ms([sys.executable, "-c", "pass"], b"")
+    script_ms = median_ms(as_script)
+    module_ms = median_ms(as_module, env=module_env)
+    baseline = top_level_imports([sys.executable, "-c", "pass"])
+    imports = {name: ms for name, ms in top_level_imports(as_script).items() if name not in baseline}
+    print(f"Start to first prompt, median of {runs} runs:")
+    print(f"  python {os.path.basename(LAUNCHER):17} {script_ms:8.1f} ms (budget {STARTUP_BUDGET_MS} ms)")
+    print(f"  python -m {as_module[-1]:14} {module_ms:8.1f} ms")
+    print(f"  python -c pass {'':11} {bare:8.1f} ms")
+    print(f"Imports made by guyOS: {sum(imports.values()):.1f} ms")
+    for name, ms in sorted(imports.items(), key=lambda item: -item[1]):
+        print(f"  {name:24} {ms:8.2f} ms")
+    return 0 if script_ms <= STARTUP_BUDGET_MS else 1
+
+
+def main(argv=None):
+    """Command line entry point"""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["bench"]:
+        return bench(argv[1:])
+    if argv[:1] == ["loadgen"]:
+        return loadgen(argv[1:])
+    if not argv:
+        # Plain interactive start: argparse alone would cost more than the rest of startup
+        guyOS().run()
+        return 0
+    
+    import argparse
+    parser = argparse.ArgumentParser(prog="guyOS", description="guyOS shell")
+    parser.add_argument("--batch", metavar="SCRIPT",
+                        help="run the commands in SCRIPT ('-' for stdin) and exit")
+    parser.add_argument("--status", action="store_true",
+                        help="with --batch, report the status of every command on stderr")
+    parser.add_argument("--stop-on-error", action="store_true",
+                        help="with --batch, stop at the first failed command")
+    parser.add_argument("--profile", action="store_true",
+                        help="collect detailed metrics and a cProfile of every command")
+    parser.add_argument("--profile-out", metavar="FILE",
+                        help="with --profile, save pstats data to FILE instead of printing a summary")
+    parser.add_argument("--buffer-appends", action=argparse.BooleanOptionalAction,
+                        help="queue 'write -add' lines and append them in batches (default with --batch)")
+    parser.add_argument("--fsync", action="store_true",
+                        help="with buffered appends, fsync every file each time its lines are written")
+    parser.add_argument("--startup-profile", metavar="RUNS", nargs="?", type=int, const=10,
+                        help="measure the time to the first prompt and the imports behind it (default 10 runs)")
+    parser.add_argument("--serve", metavar="SOCKET",
+                        help="run as a daemon serving guyOS sessions on the Unix socket SOCKET")
+    parser.add_argument("--connect", metavar="SOCKET",
+                        help="send commands from stdin to the daemon at SOCKET")
+    parser.epilog = ("Run 'guyOS bench --help' for the benchmark suite and "
+                     "'guyOS loadgen --help' to load test a daemon.")
+    options = parser.parse_args(argv)
+    if options.profile and options.serve:
+        # cProfile follows one thread at a time and cannot separate the daemon's sessions
+        parser.error("--profile cannot be used with --serve (use the time prefix instead)")
+    
+    if options.connect:
+        return connect(options.connect)
+    if options.startup_profile:
+        return startup_profile(options.startup_profile)
+    
+    os_instance = guyOS()
+    if options.buffer_appends or (options.buffer_appends is None and options.batch):
+        os_instance.buffer_appends(fsync=options.fsync)
+    if options.profile:
+        os_instance.profiler.enable_cprofile()
+    try:
+        if options.serve:
+            GuyOSServer(options.serve, os_instance).run()
+            return 0
+        if options.batch:
+            if options.batch == "-":
+                return os_instance.run_batch(sys.stdin.readlines(), status=options.status,
+                                             stop_on_error=options.stop_on_error)
+            try:
+                with open(options.batch, 'r', encoding='utf-8') as f:
+                    script = f.readlines()
+            except OSError as e:
+                print(f"Error: Cannot read batch script '{options.batch}': {e.strerror}", file=sys.stderr)
+                return 2
+            return os_instance.run_batch(script, status=options.status, stop_on_error=options.stop_on_error)
+        os_instance.run()
+        return 0
+    finally:
+        if options.profile:
+            print(os_instance.profiler.summary(), file=sys.stderr)
+            os_instance.profiler.dump(options.profile_out)
+
+# Run GuyOS
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), "guyOS"))
+
+import guyOS_core  # noqa: E402
+
+FAKE_GUYTHON = os.path.join(TESTS_DIR, "fake_guython.py")
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Keep line and text indexes in a per-test cache, with nothing loaded from earlier tests"""
+    cache = tmp_path / "cache"
+    monkeypatch.setenv("GUYOS_CACHE_DIR", str(cache))
+    monkeypatch.setattr(guyOS_core.LineIndex, "_loaded", {})
+    monkeypatch.setattr(guyOS_core.TextIndex, "_roots", None)
+    monkeypatch.setattr(guyOS_core.TextIndex, "_open", {})
+    return cache
+
+
+@pytest.fixture
+def worker_command():
+    """Command starting the stand-in interpreter in worker mode"""
+    return [sys.executable, FAKE_GUYTHON, "--worker"]
+
+
+@pytest.fixture
+def guython_shell(tmp_path, monkeypatch):
+    """Shell in tmp_path running guython through the stand-in interpreter, one process per call"""
+    monkeypatch.setenv("GUYTHON_PATH", FAKE_GUYTHON)
+    monkeypatch.delenv("GUYTHON_WORKER_ARGS", raising=False)
+    monkeypatch.delenv("GUYTHON_TIMEOUT", raising=False)
+    shell = guyOS_core.guyOS()
+    shell.current_dir = str(tmp_path)
+    yield shell
+    if shell.guython_pool is not None:
+        shell.guython_pool.close()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Guython interpreter, running its code as Python
+
+    fake_guython.py -c "code"           run code
+    fake_guython.py script.gy [args]    run a script
+    fake_guython.py --worker            speak the worker protocol of GuythonPool
+
+Exit codes, stdout and stderr behave as they would for a real interpreter,
+so the guyOS tests can exercise both the spawning and the pooled paths.
+"""
+import contextlib
+import io
+import json
+import os
+import sys
+import traceback
+
+
+def execute(code, filename, argv):
+    """Run code with argv as sys.argv; returns the exit code"""
+    sys.argv = argv
+    try:
+        exec(compile(code, filename, "exec"), {"__name__": "__main__"})
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        print(e.code, file=sys.stderr)
+        return 1
+    except BaseException:
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+def serve():
+    """Answer one JSON request per line of stdin with one JSON reply on stdout"""
+    for line in sys.stdin:
+        request = json.loads(line)
+        stdout, stderr = io.StringIO(), io.StringIO()
+        os.chdir(request.get("cwd") or os.getcwd())
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            if "script" in request:
+                with open(request["script"], encoding="utf-8") as f:
+                    code = f.read()
+                returncode = execute(code, request["script"], [request["script"]] + request.get("args", []))
+            else:
+                returncode = execute(request.get("code", ""), "<string>", ["-c"])
+        reply = {"id": request["id"], "stdout": stdout.getvalue(), "stderr": stderr.getvalue(),
+                 "returncode": returncode}
+        sys.stdout.write(json.dumps(reply) + "\n")
+        sys.stdout.flush()
+
+
+def main(argv):
+    if argv[:1] == ["--worker"]:
+        serve()
+        return 0
+    if argv[:1] == ["-c"]:
+        return execute(" ".join(argv[1:]), "<string>", ["-c"])
+    with open(argv[0], encoding="utf-8") as f:
+        code = f.read()
+    return execute(code, argv[0], argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
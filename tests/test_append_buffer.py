@@ -0,0 +1,125 @@
+import gzip
+import os
+import time
+
+import pytest
+
+from guyOS_core import AppendBuffer, guyOS
+
+
+@pytest.fixture
+def make_buffer():
+    buffers = []
+
+    def make(**kwargs):
+        kwargs.setdefault("max_delay", None)
+        buffer = AppendBuffer(**kwargs)
+        buffers.append(buffer)
+        return buffer
+
+    yield make
+    for buffer in buffers:
+        buffer.close()
+
+
+def run(shell, lines):
+    for line in lines:
+        shell.write("-add", ".", "log.txt", line)
+
+
+@pytest.mark.parametrize("existing", [None, b"", b"first", b"first\n"])
+def test_buffered_appends_match_direct_appends(tmp_path, existing):
+    lines = ["one", "two words", "", "three"]
+    results = []
+    for buffered in (False, True):
+        directory = tmp_path / str(buffered)
+        directory.mkdir()
+        if existing is not None:
+            (directory / "log.txt").write_bytes(existing)
+        shell = guyOS()
+        shell.current_dir = str(directory)
+        if buffered:
+            shell.buffer_appends()
+        run(shell, lines)
+        if buffered:
+            shell.appends.close()
+        results.append((directory / "log.txt").read_bytes())
+    assert results[0] == results[1]
+
+
+def test_a_file_replaced_under_an_open_handle_gets_the_lines(tmp_path, make_buffer):
+    path = str(tmp_path / "log.txt")
+    buffer = make_buffer()
+    buffer.add(path, "a")
+    buffer.flush()
+    assert path in buffer._handles
+    os.rename(path, path + ".1")
+    buffer.add(path, "b")
+    buffer.flush()
+    with open(path + ".1", "rb") as f:
+        assert f.read() == b"a"
+    with open(path, "rb") as f:
+        assert f.read() == b"b"
+
+
+def test_lines_are_written_once_max_bytes_are_queued(tmp_path, make_buffer):
+    path = str(tmp_path / "log.txt")
+    buffer = make_buffer(max_bytes=10)
+    buffer.add(path, "1234")
+    assert buffer.pending() == (1, 1) and not os.path.exists(path)
+    buffer.add(path, "5678")
+    assert buffer.pending() == (0, 0)
+    with open(path, "rb") as f:
+        assert f.read() == os.linesep.join(["1234", "5678"]).encode()
+
+
+def test_lines_are_written_after_max_delay(tmp_path, make_buffer):
+    path = str(tmp_path / "log.txt")
+    buffer = make_buffer(max_delay=0.05)
+    buffer.add(path, "late")
+    deadline = time.monotonic() + 5
+    while buffer.pending() != (0, 0) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with open(path, "rb") as f:
+        assert f.read() == b"late"
+
+
+def test_open_handles_are_capped(tmp_path, make_buffer):
+    buffer = make_buffer(max_handles=2)
+    paths = [str(tmp_path / f"{i}.txt") for i in range(4)]
+    for path in paths:
+        buffer.add(path, "x")
+        buffer.flush()
+    assert list(buffer._handles) == paths[2:]
+    buffer.add(paths[0], "y")
+    buffer.flush()
+    assert list(buffer._handles) == [paths[3], paths[0]]
+    with open(paths[0], "rb") as f:
+        assert f.read() == ("x" + os.linesep + "y").encode()
+
+
+def test_on_flush_gets_the_size_before_the_append(tmp_path, make_buffer):
+    calls = []
+    path = str(tmp_path / "log.txt")
+    buffer = make_buffer(on_flush=lambda *args: calls.append(args))
+    buffer.add(path, "abc")
+    buffer.flush()
+    buffer.add(path, "de")
+    buffer.add(path, "f")
+    buffer.flush()
+    assert calls == [(path, None), (path, 3)]
+
+
+def test_a_missing_directory_is_reported_by_add(tmp_path, make_buffer):
+    buffer = make_buffer()
+    with pytest.raises(FileNotFoundError):
+        buffer.add(str(tmp_path / "missing" / "log.txt"), "x")
+    assert buffer.pending() == (0, 0)
+
+
+def test_compressed_files_are_not_buffered(tmp_path, make_buffer):
+    path = tmp_path / "log.txt"
+    path.write_bytes(gzip.compress(b"one"))
+    buffer = make_buffer()
+    assert buffer.add(str(path), "two") is False
+    assert buffer.pending() == (0, 0)
@@ -0,0 +1,89 @@
+import io
+import subprocess
+import sys
+
+import pytest
+
+from guyOS_core import LAUNCHER, guyOS
+
+
+@pytest.fixture
+def shell(tmp_path):
+    shell = guyOS()
+    shell.current_dir = str(tmp_path)
+    return shell
+
+
+def run_batch(shell, text, **options):
+    out = io.StringIO()
+    code = shell.run_batch(text.splitlines(keepends=True), out=out, **options)
+    return code, out.getvalue()
+
+
+def test_commands_run_in_order_and_skip_comments(shell, tmp_path, capsys):
+    code, output = run_batch(shell, "# set up\nwrite . a.txt hello\n\nread . a.txt\n")
+    assert code == 0
+    assert output == f"File 'a.txt' written successfully to {tmp_path / 'a.txt'}\nContent of a.txt:\n{'-' * 30}\nhello\n"
+    assert capsys.readouterr().err == "guyOS batch: 2 commands, 0 failed\n"
+
+
+def test_failures_are_reported_and_set_the_exit_code(shell, capsys):
+    code, output = run_batch(shell, "read . missing.txt\nfrobnicate\nwrite . b.txt x\nwrite\n")
+    assert code == 1
+    assert "Unknown command: frobnicate" in output
+    err = capsys.readouterr().err
+    assert "[FAILED] line 1: read . missing.txt" in err
+    assert "[FAILED] line 2: frobnicate" in err
+    assert "[FAILED] line 4: write" in err
+    assert "line 3" not in err
+    assert err.endswith("guyOS batch: 4 commands, 3 failed\n")
+
+
+def test_status_reports_every_command(shell, capsys):
+    run_batch(shell, "write . a.txt x\nread . nope\n", status=True)
+    err = capsys.readouterr().err
+    assert "[ok] line 1: write . a.txt x" in err
+    assert "[FAILED] line 2: read . nope" in err
+
+
+def test_stop_on_error_and_exit_end_the_script(shell, tmp_path, capsys):
+    code, _ = run_batch(shell, "read . nope\nwrite . a.txt x\n", stop_on_error=True)
+    assert code == 1 and not (tmp_path / "a.txt").exists()
+    code, _ = run_batch(shell, "write . b.txt x\nexit\nwrite . c.txt x\n")
+    assert code == 0 and (tmp_path / "b.txt").exists() and not (tmp_path / "c.txt").exists()
+    assert capsys.readouterr().err.endswith("guyOS batch: 1 commands, 0 failed\n")
+
+
+def test_file_content_that_looks_like_an_error_is_not_a_failure(shell, tmp_path):
+    (tmp_path / "log.txt").write_text("Error: disk full\n")
+    code, output = run_batch(shell, "read -head . log.txt 1\n")
+    assert code == 0 and output.endswith("Error: disk full\n\n")
+
+
+def test_pipelines_go_through_execute(shell, tmp_path):
+    (tmp_path / "log.txt").write_text("a\nb\na\n")
+    code, output = run_batch(shell, "read . log.txt | grep a | count\n")
+    assert code == 0 and output == "2\n"
+
+
+def test_batch_command_line(tmp_path):
+    script = tmp_path / "script.txt"
+    script.write_text("write . a.txt hi\nread . a.txt\n")
+    result = subprocess.run([sys.executable, LAUNCHER, "--batch", str(script)], cwd=tmp_path,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0 and result.stdout.endswith("hi\n")
+    result = subprocess.run([sys.executable, LAUNCHER, "--batch", "-", "--stop-on-error"], cwd=tmp_path,
+                            input="read . nope\nwrite . b.txt x\n", capture_output=True, text=True, timeout=60)
+    assert result.returncode == 1 and not (tmp_path / "b.txt").exists()
+    result = subprocess.run([sys.executable, LAUNCHER, "--batch", str(tmp_path / "none.txt")],
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 2 and result.stderr.startswith("Error: Cannot read batch script")
+
+
+def test_a_failing_guython_script_fails_its_line(guython_shell, tmp_path, capsys):
+    (tmp_path / "ok.gy").write_text("print('fine')\n")
+    (tmp_path / "bad.gy").write_text("print('Everything went well')\nraise SystemExit(3)\n")
+    code, output = run_batch(guython_shell, "guython ok.gy\nguython bad.gy\n")
+    assert code == 1 and "Everything went well" in output
+    err = capsys.readouterr().err
+    assert "[FAILED] line 2: guython bad.gy" in err and "line 1" not in err
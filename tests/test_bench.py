@@ -0,0 +1,49 @@
+import json
+import os
+
+import pytest
+
+from guyOS_core import _bench_compare, _bench_fixtures, _bench_run_case, _format_size, _parse_size, bench
+
+
+@pytest.mark.parametrize("text, size", [("4096", 4096), ("64K", 64 * 1024), ("16m", 16 * 1024 ** 2),
+                                        ("4G", 4 * 1024 ** 3), ("1.5KB", 1536)])
+def test_sizes(text, size):
+    assert _parse_size(text) == size
+
+
+@pytest.mark.parametrize("size, text", [(1024, "1K"), (64 * 1024 ** 2, "64M"), (1024 ** 3, "1G"), (1500, "1500")])
+def test_size_names(size, text):
+    assert _format_size(size) == text
+
+
+def test_only_slowdowns_beyond_the_threshold_are_regressions():
+    baseline = {"a": {"median_s": 1.0}, "b": {"median_s": 1.0}, "c": {"median_s": 0}}
+    results = {"a": {"median_s": 1.05}, "b": {"median_s": 1.5}, "c": {"median_s": 1.0}, "new": {"median_s": 9.0}}
+    assert _bench_compare(results, baseline, 0.10) == ["b: 1.000000s -> 1.500000s (+50.0%)"]
+
+
+def test_write_cases_run_on_a_copy_of_their_fixture(tmp_path):
+    root = tmp_path / "bench"
+    _bench_fixtures(str(root), [], [1024])
+    fixture = root / "files" / "file_1K.txt"
+    before = fixture.read_bytes()
+    assert len(before) == 1024 and before.startswith(b"MARKER ")
+    result = _bench_run_case("write -replace . file_1K.txt MARKER MARKERS", str(fixture.parent), False, 3)
+    assert result["repeats"] == 3 and result["min_s"] <= result["median_s"] <= result["max_s"]
+    assert fixture.read_bytes() == before
+    assert os.listdir(root) == ["files"]
+
+
+def test_bench_reports_and_compares_with_a_baseline(tmp_path, monkeypatch):
+    monkeypatch.delenv("GUYTHON_PATH", raising=False)
+    output = tmp_path / "results.json"
+    options = ["--dir-sizes", "10", "--max-file-size", "1K", "--repeats", "1", "--filter", "read-"]
+    assert bench(options + ["--workdir", str(tmp_path / "work"), "--output", str(output)]) == 0
+    report = json.loads(output.read_text())
+    assert sorted(report["results"]) == ["read-count/1K", "read-head/1K", "read-lines/1K", "read-tail/1K"]
+    # A baseline that is far faster makes every case a regression
+    for result in report["results"].values():
+        result["median_s"] /= 1000
+    output.write_text(json.dumps(report))
+    assert bench(options + ["--output", str(tmp_path / "again.json"), "--baseline", str(output)]) == 1
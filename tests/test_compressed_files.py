@@ -0,0 +1,65 @@
+import bz2
+import gzip
+import lzma
+
+import pytest
+
+from guyOS_core import _compression, guyOS
+
+TEXT = "".join(f"line {i}\n" for i in range(1, 1001))
+COMPRESSORS = {"gzip": gzip.compress, "bz2": bz2.compress, "xz": lzma.compress}
+
+
+@pytest.fixture
+def shell(tmp_path):
+    shell = guyOS()
+    shell.current_dir = str(tmp_path)
+    return shell
+
+
+@pytest.fixture(params=sorted(COMPRESSORS))
+def compressed(request, tmp_path):
+    path = tmp_path / "log.z"
+    path.write_bytes(COMPRESSORS[request.param](TEXT.encode()))
+    return request.param, path
+
+
+def body(output):
+    """Output of read without its header line"""
+    return output.split("-" * 30 + "\n", 1)[1]
+
+
+def test_compression_is_detected_from_the_content(compressed):
+    name, path = compressed
+    assert _compression(str(path)) == name
+
+
+@pytest.mark.parametrize("data", [b"", b"plain text\n", b"BZh9 looks like bz2\n", b"\x1f\x8b\x08 but broken"])
+def test_plain_files_are_not_taken_as_compressed(tmp_path, data):
+    path = tmp_path / "f.txt"
+    path.write_bytes(data)
+    assert _compression(str(path)) is None
+
+
+def test_read_modifiers_see_the_decompressed_text(shell, compressed):
+    lines = TEXT.splitlines(keepends=True)
+    assert shell.read(".", "log.z").endswith(TEXT)
+    assert body(shell.read("-head", ".", "log.z", "3")) == "".join(lines[:3])
+    assert body(shell.read("-tail", ".", "log.z", "2")) == "".join(lines[-2:])
+    assert body(shell.read("-lines", ".", "log.z", "10", "12")) == "".join(lines[9:12])
+
+
+def test_write_add_appends_a_compressed_member(shell, compressed):
+    name, path = compressed
+    assert name in shell.write("-add", ".", "log.z", "extra")
+    # Like a plain file, the new line goes after a newline of its own
+    assert body(shell.read("-tail", ".", "log.z", "3")) == "line 1000\n\nextra"
+
+
+@pytest.mark.parametrize("args", [("-line", "1", "oops"), ("-insert", "1", "oops"), ("-replace", "line", "LINE")])
+def test_line_edits_refuse_compressed_files(shell, compressed, args):
+    name, path = compressed
+    before = path.read_bytes()
+    result = shell.write(args[0], ".", "log.z", *args[1:])
+    assert result.startswith("Error:") and name in result
+    assert path.read_bytes() == before
@@ -0,0 +1,132 @@
+import errno
+import os
+import stat
+
+import pytest
+
+import guyOS_core
+from guyOS_core import LineIndex, guyOS
+
+BINARY = bytes(range(256)) * 1000 + b"\r\n\xff\xfe no trailing newline"
+
+
+@pytest.fixture
+def shell(tmp_path):
+    shell = guyOS()
+    shell.current_dir = str(tmp_path)
+    return shell
+
+
+@pytest.fixture
+def tree(tmp_path):
+    src = tmp_path / "src"
+    (src / "sub" / "empty").mkdir(parents=True)
+    (src / "data.bin").write_bytes(BINARY)
+    (src / "sub" / "notes.txt").write_text("hello\n")
+    (src / "sub" / "run.sh").write_text("#!/bin/sh\n")
+    (src / "sub" / "run.sh").chmod(0o750)
+    (src / "link").symlink_to("sub/notes.txt")
+    return src
+
+
+def contents(root):
+    """Every file, link and directory below root, with what it holds"""
+    found = {}
+    for path, directories, names in os.walk(root):
+        for name in directories + names:
+            full = os.path.join(path, name)
+            relative = os.path.relpath(full, root)
+            if os.path.islink(full):
+                found[relative] = ("link", os.readlink(full))
+            elif os.path.isdir(full):
+                found[relative] = ("dir",)
+            else:
+                with open(full, "rb") as f:
+                    found[relative] = (f.read(), stat.S_IMODE(os.stat(full).st_mode))
+    return found
+
+
+def test_cp_copies_bytes_and_mode(shell, tree, tmp_path, monkeypatch):
+    # Small pieces, so that a copy that is not reflinked takes several
+    monkeypatch.setattr(guyOS_core, "COPY_PIECE_SIZE", 4096)
+    assert shell.cp("src/sub/run.sh", "copy.sh").startswith("Copied 1 files (10 B) from 'src/sub/run.sh'")
+    assert stat.S_IMODE(os.stat(tmp_path / "copy.sh").st_mode) == 0o750
+    shell.cp("src/data.bin", ".")
+    assert (tmp_path / "data.bin").read_bytes() == BINARY
+
+
+def test_cp_r_copies_a_tree_with_links_and_empty_directories(shell, tree, tmp_path):
+    result = shell.cp("-r", "src", "dst")
+    assert result.startswith("Copied 4 files")
+    assert contents(tmp_path / "dst") == contents(tree)
+    # Into an existing directory, the tree goes below it
+    (tmp_path / "backup").mkdir()
+    shell.cp("-r", "src", "backup")
+    assert contents(tmp_path / "backup" / "src") == contents(tree)
+
+
+def test_cp_overwrites_an_indexed_file(shell, tmp_path, monkeypatch):
+    monkeypatch.setattr(guyOS_core, "LINE_INDEX_MIN_SIZE", 0)
+    (tmp_path / "a.txt").write_text("1\n2\n3\n")
+    (tmp_path / "b.txt").write_text("x\n")
+    assert shell.read("-lines", ".", "b.txt", "1", "1").endswith("x\n")
+    shell.cp("a.txt", "b.txt")
+    assert shell.read("-lines", ".", "b.txt", "3", "3").endswith("3\n")
+    assert list(LineIndex.get(str(tmp_path / "b.txt")).offsets) == [0, 2, 4, 6]
+
+
+def test_cp_reports_the_files_that_failed(shell, tree, tmp_path, monkeypatch):
+    copy_file = guyOS_core._copy_file
+
+    def failing(src, dst, progress):
+        if src.endswith("notes.txt"):
+            raise PermissionError(errno.EACCES, "Permission denied")
+        copy_file(src, dst, progress)
+
+    monkeypatch.setattr(guyOS_core, "_copy_file", failing)
+    result = shell.cp("-r", "src", "dst")
+    assert result.startswith("Error: 1 files could not be copied\n  src/sub/notes.txt: Permission denied\nCopied 3 files")
+    assert (tmp_path / "dst" / "data.bin").read_bytes() == BINARY
+
+
+@pytest.mark.parametrize("args, expected", [
+    (("src",), guyOS_core.CP_USAGE),
+    (("missing", "x"), "Error: 'missing' not found"),
+    (("src", "copy"), "Error: 'src' is a directory (use -r)"),
+    (("-r", "src", "src/sub"), "Error: Cannot copy 'src' into itself"),
+    (("src/data.bin", "src/data.bin"), "Error: 'src/data.bin' and 'src/data.bin' are the same file"),
+])
+def test_cp_errors(shell, tree, args, expected):
+    assert shell.cp(*args) == expected
+
+
+def test_mv_renames_files_and_trees(shell, tree, tmp_path):
+    expected = contents(tree)
+    assert shell.mv("src", "moved") == "Moved 'src' to 'moved'"
+    assert not tree.exists() and contents(tmp_path / "moved") == expected
+    (tmp_path / "target.txt").write_text("old")
+    shell.mv("moved/sub/notes.txt", "target.txt")
+    assert (tmp_path / "target.txt").read_text() == "hello\n"
+    assert shell.mv("nothing", "x") == "Error: 'nothing' not found"
+    assert shell.mv("x") == guyOS_core.MV_USAGE
+
+
+def test_mv_across_filesystems_copies_then_removes(shell, tree, tmp_path, monkeypatch):
+    def cross_device(src, dst):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(os, "rename", cross_device)
+    monkeypatch.setattr(os, "replace", cross_device)
+    expected = contents(tree)
+    result = shell.mv("src", "moved")
+    assert result.startswith("Moved 4 files") and result.endswith("(copied across filesystems)")
+    assert not tree.exists() and contents(tmp_path / "moved") == expected
+
+
+def test_mv_keeps_the_text_index_in_step(shell, tree, tmp_path):
+    (tree / "link").unlink()
+    shell.index()
+    shell.mv("src", "moved")
+    assert shell.search("hello") == os.path.join("moved", "sub", "notes.txt") + ":1:hello"
+    shell.mv("moved/sub/notes.txt", "notes.txt")
+    assert shell.search("hello") == "notes.txt:1:hello"
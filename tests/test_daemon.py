@@ -0,0 +1,125 @@
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import pytest
+
+from guyOS_core import LAUNCHER
+
+
+class Session:
+    """Client connection to a guyOS daemon"""
+
+    def __init__(self, path):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.connect(path)
+        self.responses = self.socket.makefile("r", encoding="utf-8")
+
+    def send(self, command):
+        self.socket.sendall((json.dumps({"command": command}) + "\n").encode())
+
+    def run(self, command):
+        """Return (output, ok, cwd) of one command"""
+        self.send(command)
+        output = []
+        for line in self.responses:
+            message = json.loads(line)
+            if message.get("done"):
+                return "".join(output), message["ok"], message["cwd"]
+            output.append(message["output"])
+        raise ConnectionError("daemon closed the connection")
+
+    def close(self):
+        self.responses.close()
+        self.socket.close()
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    # Unix socket paths are limited to about 100 bytes
+    path = os.path.join(tempfile.mkdtemp(prefix="guyos"), "s")
+    env = dict(os.environ, GUYOS_CACHE_DIR=str(tmp_path / "cache"))
+    env.pop("GUYTHON_WORKER_ARGS", None)
+    process = subprocess.Popen([sys.executable, LAUNCHER, "--serve", path], cwd=tmp_path, env=env,
+                               stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while not os.path.exists(path):
+        assert process.poll() is None and time.monotonic() < deadline, "daemon did not start"
+        time.sleep(0.02)
+    sessions = []
+
+    def connect():
+        sessions.append(Session(path))
+        return sessions[-1]
+
+    connect.path = path
+    connect.process = process
+    yield connect
+    for session in sessions:
+        session.close()
+    if process.poll() is None:
+        process.terminate()
+        process.wait(10)
+    os.rmdir(os.path.dirname(path))
+
+
+def test_sessions_have_their_own_directory_and_share_files(daemon, tmp_path):
+    (tmp_path / "sub").mkdir()
+    one, two = daemon(), daemon()
+    one.run(f"cd {tmp_path}")
+    two.run(f"cd {tmp_path}")
+    output, ok, cwd = one.run("cd sub")
+    assert ok and cwd == str(tmp_path / "sub")
+    assert two.run("pwd") == (f"Current real directory: {tmp_path}", True, str(tmp_path))
+    assert one.run("write . f.txt hello")[1]
+    assert two.run("read sub f.txt")[0].endswith("hello")
+
+
+def test_failures_and_unsupported_commands(daemon):
+    session = daemon()
+    assert session.run("read . missing.txt")[1] is False
+    output, ok, cwd = session.run("jobs")
+    assert not ok and "not available over --serve" in output
+    session.socket.sendall(b"not json\n")
+    assert [json.loads(session.responses.readline()) for _ in range(2)] == [
+        {"output": "Error: Bad request"}, {"done": True, "ok": False, "cwd": cwd}]
+    assert session.run("pwd")[1]
+
+
+def test_connect_client_reports_failures_in_its_exit_code(daemon, tmp_path):
+    (tmp_path / "f.txt").write_text("abc\n")
+    client = subprocess.run([sys.executable, LAUNCHER, "--connect", daemon.path], cwd=tmp_path,
+                            input="read . f.txt\nread . none.txt\n", capture_output=True, text=True, timeout=30)
+    assert "abc" in client.stdout and "Error: File 'none.txt' not found" in client.stdout
+    assert client.returncode == 1
+
+
+def test_clients_that_hang_up_while_following_free_their_workers(daemon, tmp_path):
+    (tmp_path / "log.txt").write_text("start\n")
+    followers = []
+    for _ in range(40):
+        follower = daemon()
+        follower.send(f"read -follow {tmp_path} log.txt")
+        followers.append(follower)
+    time.sleep(0.5)
+    for follower in followers:
+        follower.close()
+    session = daemon()
+    start = time.monotonic()
+    assert session.run("pwd")[1]
+    assert time.monotonic() - start < 10
+
+
+def test_sigterm_stops_the_daemon_and_removes_the_socket(daemon, tmp_path):
+    (tmp_path / "log.txt").write_text("start\n")
+    session = daemon()
+    session.send(f"read -follow {tmp_path} log.txt")
+    time.sleep(0.3)
+    daemon.process.send_signal(signal.SIGTERM)
+    assert daemon.process.wait(10) == 0
+    assert not os.path.exists(daemon.path)
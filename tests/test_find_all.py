@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+import guyOS_core
+from guyOS_core import _find_all, _iter_matches, _replace_all
+
+
+def reference(data, needle):
+    """Non-overlapping matches of needle, left to right"""
+    matches = []
+    found = data.find(needle)
+    while found != -1:
+        matches.append(found)
+        found = data.find(needle, found + len(needle))
+    return matches
+
+
+@pytest.fixture
+def write(tmp_path):
+    def write(data):
+        path = tmp_path / "data.txt"
+        path.write_bytes(data)
+        return str(path)
+    return write
+
+
+def test_empty_file_and_missing_needle(write):
+    assert _find_all(write(b""), b"x") == []
+    assert _find_all(write(b"abc\n" * 100000), b"zz", jobs=4) == []
+
+
+def random_text(seed, size=1024 * 1024):
+    """Text with runs of repeated bytes, so that matches cross the chunk ends"""
+    rng = random.Random(seed)
+    pieces = []
+    total = 0
+    while total < size:
+        pieces.append(rng.choice([b"a" * rng.randint(1, 9), b"\n" * rng.randint(1, 3), b"ab\n",
+                                  b"MARKER", b"xyz " * rng.randint(1, 50)]))
+        total += len(pieces[-1])
+    return b"".join(pieces)
+
+
+@pytest.fixture(params=[False, True], ids=["serial", "pool"])
+def pool(request, monkeypatch):
+    if request.param:
+        # Search even small files on a process pool
+        monkeypatch.setattr(guyOS_core, "PARALLEL_MIN_SIZE", 0)
+    return request.param
+
+
+@pytest.mark.parametrize("jobs", [1, 3, 8])
+@pytest.mark.parametrize("needle", [b"aa", b"a\na", b"\n\n", b"MARKER", b"ab\nab"])
+def test_matches_agree_with_a_single_left_to_right_search(write, pool, jobs, needle):
+    # Chunks are at least 64 KiB
+    data = random_text(f"{jobs} {needle}")
+    assert _find_all(write(data), needle, jobs=jobs) == reference(data, needle)
+
+
+def test_matches_are_passed_on_as_they_are_found(write):
+    matches = _iter_matches(write(b"x\n" * 10), b"x")
+    assert next(matches) == 0
+    assert list(matches) == list(range(2, 20, 2))
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+@pytest.mark.parametrize("needle, data", [(b"aa", b"bb"), (b"aa", b"a"), (b"a", b"a\na"), (b"MARKER", b"\n"),
+                                          (b"a\na", b"b\nb"), (b"\n\n", b"\n"), (b"ab\nab", b"-")])
+def test_replace_all_agrees_with_bytes_replace(write, pool, jobs, needle, data):
+    text = random_text(f"{jobs} {needle} {data}", 512 * 1024)
+    path = write(text)
+    assert _replace_all(path, needle, data, jobs=jobs) == len(reference(text, needle))
+    with open(path, "rb") as f:
+        assert f.read() == text.replace(needle, data)
+
+
+def test_replace_all_without_a_match_leaves_the_file_alone(write, tmp_path):
+    path = write(b"abc\n" * 1000)
+    for needle, data in ((b"zz", b"yy"), (b"zz", b"y"), (b"z\nz", b"y"), (b"", b"y")):
+        assert _replace_all(path, needle, data) == 0
+    with open(path, "rb") as f:
+        assert f.read() == b"abc\n" * 1000
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_match_running_over_a_chunk_end_shadows_the_next_chunk(write):
+    # One long line of 'a' split into chunks only at newlines placed near every 64 KiB
+    block = b"a" * (64 * 1024 - 1) + b"\n"
+    data = block * 16
+    for needle in (b"aaa", b"a\naa", b"\na"):
+        assert _find_all(write(data), needle, jobs=4) == reference(data, needle)
@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+import guyOS_core
+from guyOS_core import guyOS
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+    (tmp_path / "src" / "a.py").write_text("import os\ndef one():\n    pass\ndef two():\n    return 1\n")
+    (tmp_path / "src" / "pkg" / "b.py").write_text("x = 1\ny = 2\nno newline at end")
+    (tmp_path / "notes.txt").write_text("alpha beta\nGamma\n\nbeta\n")
+    (tmp_path / "blob.bin").write_bytes(b"\0def one\n" * 100)
+    return tmp_path
+
+
+@pytest.fixture
+def shell(tree):
+    shell = guyOS()
+    shell.current_dir = str(tree)
+    return shell
+
+
+def lines(output):
+    return sorted(output.split("\n"))
+
+
+@pytest.mark.parametrize("pattern, expected", [
+    ("^def", ["src/a.py:2:def one():", "src/a.py:4:def two():"]),
+    (r"\(\):$", ["src/a.py:2:def one():", "src/a.py:4:def two():"]),
+    ("^    ", ["src/a.py:3:    pass", "src/a.py:5:    return 1"]),
+    (r"pass\s+def", []),
+    (r"1\n", []),
+    ("^$", ["notes.txt:3:"]),
+    ("end$", ["src/pkg/b.py:3:no newline at end"]),
+    ("beta$", ["notes.txt:1:alpha beta", "notes.txt:4:beta"]),
+    ("[^x]beta", ["notes.txt:1:alpha beta"]),
+])
+def test_patterns_apply_to_one_line_at_a_time(shell, pattern, expected):
+    output = shell.grep("-r", pattern, ".")
+    if expected:
+        assert lines(output) == sorted(expected)
+    else:
+        assert output == "No matches found"
+
+
+def test_case_insensitive_and_max_count(shell):
+    assert shell.grep("-i", "gamma", "notes.txt") == "notes.txt:2:Gamma"
+    assert shell.grep("--max-count", "1", "beta", "notes.txt") == "notes.txt:1:alpha beta"
+
+
+def test_grep_errors(shell):
+    assert shell.grep("x", "src").startswith("Error: 'src' is a directory")
+    assert shell.grep("x", "missing.txt").startswith("Error: File 'missing.txt' not found")
+    assert shell.grep("(", "notes.txt").startswith("Error: Invalid pattern")
+    assert shell.grep().startswith("Usage:")
+
+
+def test_grep_on_a_process_pool_matches_a_serial_grep(shell, monkeypatch):
+    serial = lines(shell.grep("-r", "--jobs", "1", "^[dxy]", "."))
+    monkeypatch.setattr(guyOS_core, "PARALLEL_MIN_SIZE", 0)
+    assert lines(shell.grep("-r", "--jobs", "2", "^[dxy]", ".")) == serial
+    assert len(serial) == 4
+
+
+@pytest.mark.parametrize("args, expected", [
+    (("-name", "*.py"), ["src/a.py", "src/pkg/b.py"]),
+    (("src", "-type", "d"), ["src/pkg"]),
+    (("-type", "f", "-size", "+100"), ["blob.bin"]),
+    (("-name", "*.txt", "-mtime", "-1"), ["notes.txt"]),
+    (("-name", "*.none",), ["No files found"]),
+])
+def test_find_filters(shell, args, expected):
+    assert lines(shell.find(*args)) == sorted(os.path.normpath(path) for path in expected)
+
+
+def test_find_errors(shell):
+    assert shell.find("missing").startswith("Error: Directory 'missing' not found")
+    assert shell.find("-type", "x") == guyOS_core.FIND_USAGE
@@ -0,0 +1,98 @@
+import os
+
+import pytest
+
+import guyOS_core
+from guyOS_core import guyOS
+
+
+@pytest.fixture
+def shell(tmp_path, monkeypatch):
+    monkeypatch.setattr(guyOS_core, "FOLLOW_POLL_INTERVAL", 0.05)
+    shell = guyOS()
+    shell.current_dir = str(tmp_path)
+    (tmp_path / "a.log").write_text("old line\n")
+    (tmp_path / "b.log").write_text("")
+    return shell
+
+
+def follow(shell, *args):
+    chunks = shell._read_chunks("-follow", *args)
+    assert next(chunks).startswith("Following ")
+    return chunks
+
+
+def next_text(chunks, pulls=100):
+    """The next non-empty chunk, skipping the empty ones yielded while idle"""
+    for _ in range(pulls):
+        chunk = next(chunks)
+        if chunk:
+            return chunk
+    raise AssertionError("nothing was followed")
+
+
+def unavailable(*_):
+    raise OSError("inotify is unavailable")
+
+
+def append(path, text):
+    with open(path, "a") as f:
+        f.write(text)
+
+
+@pytest.mark.parametrize("inotify", [True, False])
+def test_only_appended_text_is_shown(shell, tmp_path, monkeypatch, inotify):
+    if not inotify:
+        monkeypatch.setattr(guyOS_core._Inotify, "__init__", unavailable)
+    chunks = follow(shell, ".", "a.log")
+    assert next(chunks) == ""
+    append(tmp_path / "a.log", "first\n")
+    assert next_text(chunks) == "first\n"
+    append(tmp_path / "a.log", "second, no newline")
+    assert next_text(chunks) == "second, no newline"
+    chunks.close()
+
+
+def test_multibyte_characters_split_across_writes(shell, tmp_path):
+    chunks = follow(shell, ".", "a.log")
+    euro = "€".encode()
+    with open(tmp_path / "a.log", "ab") as f:
+        f.write(euro[:1])
+    assert next(chunks) == ""
+    with open(tmp_path / "a.log", "ab") as f:
+        f.write(euro[1:] + b"\n")
+    assert next_text(chunks) == "€\n"
+    chunks.close()
+
+
+def test_truncation_and_rotation(shell, tmp_path):
+    chunks = follow(shell, ".", "a.log")
+    next(chunks)
+    # A truncation only shows when the file ends up shorter than what was read
+    (tmp_path / "a.log").write_text("short\n")
+    assert next_text(chunks) == "\n[a.log: file truncated]\n"
+    assert next_text(chunks) == "short\n"
+    append(tmp_path / "a.log", "last words\n")
+    os.rename(tmp_path / "a.log", tmp_path / "a.log.1")
+    (tmp_path / "a.log").write_text("new file\n")
+    assert next_text(chunks) == "\n[a.log: file replaced, following the new file]\n"
+    assert next_text(chunks) == "last words\nnew file\n"
+    chunks.close()
+
+
+def test_several_files_are_prefixed_line_by_line(shell, tmp_path):
+    chunks = follow(shell, ".", "a.log", ".", "b.log")
+    next(chunks)
+    append(tmp_path / "a.log", "one\ntw")
+    assert next_text(chunks) == "[a.log] one\n"
+    append(tmp_path / "b.log", "b line\n")
+    append(tmp_path / "a.log", "o\n")
+    received = next_text(chunks) + next_text(chunks)
+    assert sorted(received.splitlines()) == ["[a.log] two", "[b.log] b line"]
+    chunks.close()
+
+
+def test_follow_errors(shell):
+    assert shell.read("-follow", ".", "a.log", ".") == guyOS_core.READ_USAGE
+    assert shell.read("-follow", ".", "a.log", ".", "none.log") == "Error: File 'none.log' not found"
+    assert shell.read("-follow", ".", "none.log") == "Error: File 'none.log' not found"
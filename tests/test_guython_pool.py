@@ -0,0 +1,135 @@
+import os
+import signal
+import subprocess
+import threading
+
+import pytest
+
+from conftest import FAKE_GUYTHON
+from guyOS_core import CommandFailure, GuythonPool, guyOS
+
+PID = "import os; print(os.getpid())"
+
+
+@pytest.fixture
+def make_pool(worker_command):
+    pools = []
+
+    def make(**kwargs):
+        pool = GuythonPool(worker_command, **kwargs)
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.close()
+
+
+def run_pid(pool):
+    return int(pool.run({"code": PID, "cwd": os.getcwd()}).stdout)
+
+
+def gone(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    return False
+
+
+def test_warm_up_starts_every_worker(make_pool):
+    pool = make_pool(size=3)
+    pool.warm_up()
+    workers = list(pool._idle.queue)
+    assert len(workers) == 3
+    assert all(worker is not None and worker.alive() for worker in workers)
+    assert len({worker.process.pid for worker in workers}) == 3
+
+
+def test_jobs_reuse_a_warm_worker(make_pool):
+    pool = make_pool(size=1)
+    pool.warm_up()
+    warm = pool._idle.queue[0].process.pid
+    assert [run_pid(pool) for _ in range(3)] == [warm] * 3
+
+
+def test_result_carries_output_and_exit_code(make_pool, tmp_path):
+    pool = make_pool(size=1)
+    script = tmp_path / "s.gy"
+    script.write_text("import sys\nprint('out', sys.argv[1:])\nprint('err', file=sys.stderr)\nsys.exit(3)\n")
+    result = pool.run({"script": str(script), "args": ["a", "b"], "cwd": str(tmp_path)})
+    assert isinstance(result, subprocess.CompletedProcess)
+    assert (result.stdout, result.stderr, result.returncode) == ("out ['a', 'b']\n", "err\n", 3)
+
+
+def test_worker_is_recycled_after_max_jobs(make_pool):
+    pool = make_pool(size=1, max_jobs=3)
+    pids = [run_pid(pool) for _ in range(4)]
+    assert pids[0] == pids[1] == pids[2]
+    assert pids[3] != pids[0]
+    assert gone(pids[0])
+
+
+def test_timeout_kills_the_worker_and_replaces_it(make_pool):
+    pool = make_pool(size=1, timeout=0.5)
+    before = run_pid(pool)
+    with pytest.raises(subprocess.TimeoutExpired):
+        pool.run({"code": "import time; time.sleep(30)", "cwd": os.getcwd()})
+    assert gone(before)
+    after = run_pid(pool)
+    assert after != before
+
+
+def test_a_crashed_worker_is_replaced(make_pool):
+    pool = make_pool(size=1)
+    before = run_pid(pool)
+    with pytest.raises(RuntimeError):
+        pool.run({"code": "import os; os._exit(5)", "cwd": os.getcwd()})
+    assert run_pid(pool) != before
+
+
+def test_concurrent_jobs_run_on_separate_workers(make_pool):
+    pool = make_pool(size=2)
+    pool.warm_up()
+    pids = []
+
+    def job():
+        pids.append(int(pool.run({"code": "import os, time; time.sleep(0.3); print(os.getpid())",
+                                  "cwd": os.getcwd()}).stdout))
+
+    threads = [threading.Thread(target=job) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(pids)) == 2
+
+
+@pytest.mark.parametrize("pooled", [False, True])
+def test_guython_command_reports_a_non_zero_exit_as_failure(pooled, tmp_path, monkeypatch):
+    monkeypatch.setenv("GUYTHON_PATH", FAKE_GUYTHON)
+    if pooled:
+        monkeypatch.setenv("GUYTHON_WORKER_ARGS", "--worker")
+    else:
+        monkeypatch.delenv("GUYTHON_WORKER_ARGS", raising=False)
+    (tmp_path / "ok.gy").write_text("print('hello')\n")
+    (tmp_path / "bad.gy").write_text("raise SystemExit(3)\n")
+    shell = guyOS()
+    shell.current_dir = str(tmp_path)
+    try:
+        ok = shell.guython("ok.gy")
+        assert "hello" in ok and not isinstance(ok, CommandFailure)
+        bad = shell.guython("bad.gy")
+        assert isinstance(bad, CommandFailure) and bad.returncode == 3
+        assert shell.run_batch(["guython ok.gy\n", "guython bad.gy\n"], out=open(os.devnull, "w")) == 1
+    finally:
+        if shell.guython_pool is not None:
+            shell.guython_pool.close()
+
+
+def test_a_worker_killed_while_idle_is_replaced(make_pool):
+    pool = make_pool(size=1)
+    before = run_pid(pool)
+    os.kill(before, signal.SIGKILL)
+    pool._idle.queue[0].process.wait()
+    assert run_pid(pool) != before
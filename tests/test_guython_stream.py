@@ -0,0 +1,49 @@
+import io
+
+from guyOS_core import CommandFailure
+
+
+def script(tmp_path, name, code):
+    (tmp_path / name).write_text(code)
+    return name
+
+
+def test_output_is_passed_on_line_by_line(guython_shell, tmp_path):
+    name = script(tmp_path, "s.gy", "import sys\nfor i in range(3):\n    print('line', i, flush=True)\n"
+                                    "print('oops', file=sys.stderr)\n")
+    chunks = list(guython_shell._guython_stream("--stream", name))
+    assert "line 0\n" in chunks and "line 2\n" in chunks
+    assert "stderr: oops\n" in chunks
+    assert not any(isinstance(chunk, CommandFailure) for chunk in chunks)
+
+
+def test_no_output_is_reported(guython_shell, tmp_path):
+    name = script(tmp_path, "s.gy", "x = 1\n")
+    assert guython_shell.guython("--stream", name) == "Script executed successfully (no output)"
+
+
+def test_tee_copies_the_output(guython_shell, tmp_path):
+    name = script(tmp_path, "s.gy", "print('a')\nprint('b')\n")
+    assert guython_shell.guython("--stream", "--tee", "out.txt", name) == "a\nb\n"
+    assert (tmp_path / "out.txt").read_text() == "a\nb\n"
+
+
+def test_a_non_zero_exit_is_a_failure_with_the_last_errors(guython_shell, tmp_path):
+    name = script(tmp_path, "s.gy", "import sys\nprint('partial')\nsys.exit('bad input')\n")
+    result = guython_shell.guython("--stream", name)
+    assert isinstance(result, CommandFailure) and result.returncode == 1
+    assert "partial\n" in result and "stderr: bad input\n" in result
+    assert result.endswith("Process exited with code: 1\nLast 1 lines of errors:\n" + "-" * 20 + "\nbad input")
+
+
+def test_a_timeout_is_a_failure_even_after_output(guython_shell, tmp_path, monkeypatch):
+    monkeypatch.setenv("GUYTHON_TIMEOUT", "1")
+    name = script(tmp_path, "s.gy", "import time\nprint('started', flush=True)\ntime.sleep(30)\n")
+    result = guython_shell.guython("--stream", name)
+    assert isinstance(result, CommandFailure)
+    assert result == "started\nError: Guython execution timed out"
+    assert guython_shell.run_batch([f"guython --stream {name}\n"], out=io.StringIO()) == 1
+
+
+def test_missing_script(guython_shell):
+    assert guython_shell.guython("--stream", "none.gy") == "Error: Script file 'none.gy' not found"
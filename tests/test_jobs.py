@@ -0,0 +1,71 @@
+import io
+import time
+
+import pytest
+
+from guyOS_core import CommandFailure, JobScheduler
+
+
+@pytest.fixture
+def shell(guython_shell):
+    guython_shell._scheduler = JobScheduler(guython_shell, out=io.StringIO())
+    yield guython_shell
+    guython_shell._scheduler.shutdown()
+    guython_shell._scheduler.wait()
+
+
+def output(shell):
+    return shell._scheduler.out.getvalue()
+
+
+def script(tmp_path, name, code):
+    (tmp_path / name).write_text(code)
+    return name
+
+
+def test_parallel_guython_runs_every_script(shell, tmp_path):
+    names = [script(tmp_path, f"s{i}.gy", f"print('hello from {i}')\n") for i in range(3)]
+    assert shell.parallel("-j", "2", "guython", *names) == "3 jobs finished"
+    for i in range(3):
+        assert f"hello from {i}" in output(shell)
+    assert output(shell).count("Done\tguython") == 3
+
+
+def test_parallel_reports_failed_jobs(shell, tmp_path):
+    ok = script(tmp_path, "ok.gy", "print('fine')\n")
+    bad = script(tmp_path, "bad.gy", "raise SystemExit(2)\n")
+    result = shell.parallel("guython", bad, ok, bad)
+    assert isinstance(result, CommandFailure)
+    assert result == "3 jobs finished, 2 failed: [1] Exit 2, [3] Exit 2"
+    assert shell.run_batch([f"parallel guython {bad} {bad}\n"], out=io.StringIO()) == 1
+
+
+def test_parallel_count(shell, tmp_path):
+    (tmp_path / "a.txt").write_text("one two\n")
+    (tmp_path / "b.txt").write_text("three\n")
+    assert shell.parallel("count", ".", "a.txt", "b.txt") == "2 jobs finished"
+    assert "Words: 2" in output(shell) and "Words: 1" in output(shell)
+    result = shell.parallel("count", ".", "a.txt", "missing.txt")
+    assert isinstance(result, CommandFailure) and "[4] Exit 1" in result
+
+
+def test_parallel_usage(shell):
+    assert shell.parallel().startswith("Usage:")
+    assert shell.parallel("-j", "0", "guython", "x.gy") == "Error: Number of jobs must be at least 1"
+
+
+def test_background_jobs_can_be_listed_waited_for_and_killed(shell, tmp_path):
+    slow = script(tmp_path, "slow.gy", "import time\ntime.sleep(30)\n")
+    quick = script(tmp_path, "quick.gy", "print('quick')\n")
+    assert shell.execute("guython", [slow, "&"]) == f"[1] Started: guython {slow}"
+    assert shell.execute("guython", [quick, "&"]) == f"[2] Started: guython {quick}"
+    assert shell.wait("2") == "Job(s) 2 finished"
+    assert "[1] Running" in shell.jobs() and "[2] Done" in shell.jobs()
+    assert shell.kill("1") == f"[1] Killing: guython {slow}"
+    start = time.monotonic()
+    assert shell.wait() == "All jobs finished"
+    assert time.monotonic() - start < 10
+    assert "[1] Killed" in shell.jobs()
+    assert shell.kill("1") == f"[1] Already finished: guython {slow}"
+    assert shell.wait("7") == "Error: No such job '7'"
+    assert shell.execute("cd", [".", "&"]) == "Error: 'cd' cannot run in the background"
@@ -0,0 +1,176 @@
+import os
+import threading
+import time
+
+import pytest
+
+import guyOS_core
+from guyOS_core import LineIndex, guyOS
+
+
+def line_starts(data):
+    """Offsets at which every line starts, plus the end of the file after a final newline"""
+    offsets = [0]
+    position = data.find(b"\n")
+    while position != -1:
+        offsets.append(position + 1)
+        position = data.find(b"\n", position + 1)
+    return offsets
+
+
+@pytest.fixture
+def shell(tmp_path, monkeypatch):
+    # Index every file, however small
+    monkeypatch.setattr(guyOS_core, "LINE_INDEX_MIN_SIZE", 0)
+    shell = guyOS()
+    shell.current_dir = str(tmp_path)
+    return shell
+
+
+@pytest.mark.parametrize("data", [b"", b"one", b"one\n", b"a\r\nb\nc", b"\n\n\n", b"x\n" * 5000 + b"tail"])
+def test_offsets_match_a_plain_scan(tmp_path, data):
+    path = tmp_path / "f.txt"
+    path.write_bytes(data)
+    index = LineIndex.get(str(path))
+    assert list(index.offsets) == line_starts(data)
+    assert index.line_count == len(data.splitlines())
+
+
+def test_span_clamps_past_the_last_line_without_a_trailing_newline(tmp_path):
+    path = tmp_path / "f.txt"
+    path.write_bytes(b"a\nbb\nccc")
+    index = LineIndex.get(str(path))
+    assert index.line_count == 3
+    assert index.span(2, 3) == (5, 8)
+    assert index.span(3, 6) == (8, 8)
+    assert index.span(10, 20) == (8, 8)
+
+
+def test_appends_are_indexed_incrementally_and_rewrites_from_scratch(tmp_path):
+    path = tmp_path / "f.txt"
+    path.write_bytes(b"a\nb\n")
+    index = LineIndex.get(str(path))
+    with open(path, "ab") as f:
+        f.write(b"c\nd")
+    assert LineIndex.get(str(path)) is index
+    assert list(index.offsets) == line_starts(b"a\nb\nc\nd")
+    # Same size, different bytes before the appended region: not an append
+    path.write_bytes(b"x\ny\nz\nw\n")
+    assert list(LineIndex.get(str(path)).offsets) == line_starts(b"x\ny\nz\nw\n")
+
+
+def test_sidecar_is_reloaded_in_a_new_process(tmp_path, monkeypatch):
+    path = tmp_path / "f.txt"
+    path.write_bytes(b"1\n22\n333\n")
+    built = list(LineIndex.get(str(path)).offsets)
+    monkeypatch.setattr(LineIndex, "_loaded", {})
+    loaded = LineIndex._load(os.path.abspath(path))
+    assert loaded is not None and list(loaded.offsets) == built
+    assert not [name for name in os.listdir(os.path.dirname(LineIndex.sidecar_path(str(path))))
+                if name.endswith(".tmp")]
+
+
+def test_concurrent_refreshes_of_a_growing_file(tmp_path):
+    path = tmp_path / "g.log"
+    path.write_bytes(b"".join(b"line %07d\n" % i for i in range(20000)))
+    done = threading.Event()
+    errors = []
+
+    def writer():
+        for n in range(20000, 120000, 500):
+            with open(path, "ab") as f:
+                f.write(b"".join(b"line %07d\n" % i for i in range(n, n + 500)))
+            time.sleep(0.001)
+        done.set()
+
+    def reader():
+        while not done.is_set():
+            index = LineIndex.get(str(path))
+            start, end = index.span(19999, 20000)
+            with open(path, "rb") as f:
+                f.seek(start)
+                line = f.read(end - start)
+            if line != b"line 0019999\n":
+                errors.append(line)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert list(LineIndex.get(str(path)).offsets) == line_starts(path.read_bytes())
+
+
+def test_read_and_write_lines_past_the_end_of_an_indexed_file(shell, tmp_path):
+    path = tmp_path / "log.txt"
+    path.write_bytes(b"one\ntwo\nthree")
+    assert shell.read("-lines", ".", "log.txt", "3", "5").endswith("-\nthree")
+    assert "replaced successfully" in shell.write("-line", ".", "log.txt", "5", "five")
+    assert path.read_bytes() == b"one\ntwo\nthree\n\nfive\n"
+    assert "inserted" in shell.write("-insert", ".", "log.txt", "2", "new")
+    assert path.read_bytes() == b"one\nnew\ntwo\nthree\n\nfive\n"
+    assert list(LineIndex.get(str(path)).offsets) == line_starts(path.read_bytes())
+
+
+@pytest.mark.parametrize("args", [
+    ("-line", "3", "a much longer third line"),
+    ("-line", "3", ""),
+    ("-line", "1", "first\nsplit in two"),
+    ("-line", "8", "last line, no newline before"),
+    ("-line", "12", "past the end"),
+    ("-insert", "1", "new first"),
+    ("-insert", "5", "x"),
+])
+def test_line_edits_shift_the_index_instead_of_rebuilding_it(shell, tmp_path, monkeypatch, args):
+    path = tmp_path / "log.txt"
+    path.write_bytes(b"".join(b"line %d\n" % i for i in range(1, 8)) + b"line 8")
+    LineIndex.get(str(path))
+
+    scan = LineIndex._scan
+
+    def scan_appended_bytes_only(index, f, end):
+        assert index.size > 0, "the index was rebuilt"
+        scan(index, f, end)
+
+    monkeypatch.setattr(LineIndex, "_scan", scan_appended_bytes_only)
+    shell.write(args[0], ".", "log.txt", *args[1:])
+    index = LineIndex.get(str(path))
+    assert list(index.offsets) == line_starts(path.read_bytes())
+    # The sidecar holds the shifted offsets too
+    monkeypatch.setattr(LineIndex, "_loaded", {})
+    assert list(LineIndex._load(os.path.abspath(path)).offsets) == line_starts(path.read_bytes())
+
+
+@pytest.mark.parametrize("offsets, length, data", [
+    ([0, 12, 30], 3, b"X\nY\nZ"),
+    ([5, 6], 1, b""),
+    ([0], 0, b"\n\n"),
+    ([2, 40], 4, b"abcdef"),
+])
+def test_spliced_matches_a_fresh_scan(tmp_path, offsets, length, data):
+    original = b"".join(b"%d\n" % i for i in range(20))
+    path = tmp_path / "f.txt"
+    path.write_bytes(original)
+    LineIndex.get(str(path))
+    before = os.stat(path)
+    edited, position = b"", 0
+    for offset in offsets:
+        edited += original[position:offset] + data
+        position = offset + length
+    path.write_bytes(edited + original[position:])
+    LineIndex.spliced(str(path), before, offsets, length, data)
+    assert list(LineIndex._loaded[os.path.abspath(path)].offsets) == line_starts(path.read_bytes())
+
+
+def test_splice_of_a_file_changed_behind_the_index_drops_it(tmp_path):
+    path = tmp_path / "f.txt"
+    path.write_bytes(b"a\nb\nc\n")
+    LineIndex.get(str(path))
+    with open(path, "ab") as f:
+        f.write(b"d\n")
+    before = os.stat(path)
+    path.write_bytes(b"aa\nb\nc\nd\n")
+    LineIndex.spliced(str(path), before, [0], 1, b"aa")
+    assert not os.path.exists(LineIndex.sidecar_path(os.path.abspath(path)))
+    assert list(LineIndex.get(str(path)).offsets) == line_starts(b"aa\nb\nc\nd\n")
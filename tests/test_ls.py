@@ -0,0 +1,70 @@
+import os
+import time
+
+import pytest
+
+from guyOS_core import ListingCache, guyOS
+
+
+@pytest.fixture
+def shell(tmp_path):
+    for name, size in (("b.txt", 3), ("a.txt", 10), ("c.txt", 1)):
+        (tmp_path / name).write_bytes(b"x" * size)
+    (tmp_path / "dir").mkdir()
+    shell = guyOS()
+    shell.current_dir = str(tmp_path)
+    return shell
+
+
+def names(output):
+    return [line.split("\t")[0] for line in output.split("\n")]
+
+
+def test_sorting_and_paging(shell):
+    assert names(shell.ls()) == ["a.txt", "b.txt", "c.txt", "dir/"]
+    assert names(shell.ls("--reverse")) == ["dir/", "c.txt", "b.txt", "a.txt"]
+    assert names(shell.ls("--limit", "2", "--offset", "1")) == ["b.txt", "c.txt"]
+    assert names(shell.ls("--reverse", "--limit", "1", "--offset", "1")) == ["c.txt"]
+    assert shell.ls("--sort", "colour") == shell.ls("--limit") == shell.ls("x")
+
+
+def test_sort_by_size_and_time(shell, tmp_path):
+    files = [line for line in shell.ls("--sort", "size").split("\n") if "bytes" in line]
+    assert [line.split("\t")[0] for line in files] == ["c.txt", "b.txt", "a.txt"]
+    os.utime(tmp_path / "c.txt", (0, 0))
+    assert names(shell.ls("--sort", "time"))[0] == "c.txt"
+    assert names(shell.ls("--sort", "time", "--reverse"))[-1] == "c.txt"
+
+
+def test_sizes_are_current_after_a_write_to_a_listed_file(shell, tmp_path):
+    assert "c.txt\t\t1 bytes" in shell.ls()
+    mtime = os.stat(tmp_path).st_mtime_ns
+    with open(tmp_path / "c.txt", "ab") as f:
+        f.write(b"1234567")
+    assert os.stat(tmp_path).st_mtime_ns == mtime
+    assert "c.txt\t\t8 bytes" in shell.ls()
+
+
+def test_new_and_removed_entries_show_up(shell, tmp_path):
+    shell.ls()
+    time.sleep(0.01)
+    (tmp_path / "new.txt").write_text("n")
+    os.remove(tmp_path / "a.txt")
+    assert names(shell.ls()) == ["b.txt", "c.txt", "dir/", "new.txt"]
+
+
+def test_empty_directory_and_unreadable_entries(tmp_path):
+    shell = guyOS()
+    shell.current_dir = str(tmp_path)
+    assert shell.ls() == "Directory is empty"
+    os.symlink(tmp_path / "missing", tmp_path / "dangling")
+    assert shell.ls() == "dangling\t\t<UNKNOWN>\t<UNKNOWN>"
+
+
+def test_only_names_are_cached(tmp_path):
+    (tmp_path / "f").write_text("x")
+    cache = ListingCache()
+    assert cache.get(str(tmp_path)) == ["f"]
+    assert cache.get(str(tmp_path)) is cache.get(str(tmp_path))
+    [(name, is_dir, size, _)] = cache.stat(str(tmp_path), ["f"])
+    assert (name, is_dir, size) == ("f", False, 1)
@@ -0,0 +1,47 @@
+import pytest
+
+from guyOS_core import guyOS
+
+
+@pytest.fixture
+def shell(tmp_path):
+    (tmp_path / "log.txt").write_text("".join(f"{'ERROR' if i % 7 == 0 else 'INFO'} event {i}\n"
+                                              for i in range(100)))
+    (tmp_path / "errors.txt").write_text("Error: first line\nsecond\n")
+    shell = guyOS()
+    shell.current_dir = str(tmp_path)
+    return shell
+
+
+def pipe(shell, line):
+    parts = line.split()
+    return "".join(shell.execute(parts[0], parts[1:]))
+
+
+def test_stages_filter_the_file_lines(shell):
+    assert pipe(shell, "read . log.txt | grep ERROR | count") == "15"
+    assert pipe(shell, "read . log.txt | grep -v INFO | head 2") == "ERROR event 0\nERROR event 7"
+    assert pipe(shell, "read . log.txt | tail 1") == "INFO event 99"
+    assert pipe(shell, "read -head . log.txt 3 | grep -i info") == "INFO event 1\nINFO event 2"
+
+
+def test_read_count_goes_through_the_stages(shell):
+    assert pipe(shell, "read -count . log.txt | grep Words") == "Words: 300"
+    assert pipe(shell, "read -count . log.txt | count") == "4"
+
+
+def test_file_content_that_looks_like_an_error_is_filtered(shell):
+    assert pipe(shell, "read . errors.txt | grep second") == "second"
+    assert pipe(shell, "read . errors.txt | count") == "2"
+
+
+def test_errors_skip_the_stages(shell):
+    assert pipe(shell, "read . missing.txt | count") == "Error: File 'missing.txt' not found"
+    assert pipe(shell, "read . log.txt | sort").startswith("Error: Unknown pipeline stage 'sort'")
+    assert pipe(shell, "read . log.txt | | count") == "Error: Empty pipeline stage"
+    assert pipe(shell, "read . log.txt | head x") == "Error: Number of lines must be an integer"
+
+
+def test_other_commands_feed_pipelines(shell):
+    assert pipe(shell, "ls | grep txt | count") == "2"
+    assert pipe(shell, "grep -r event . | grep ERROR | head 1").endswith(":1:ERROR event 0")
@@ -0,0 +1,57 @@
+import threading
+
+import guyOS_core
+from guyOS_core import CommandProfiler
+
+
+def run(profiler, command, result="ok"):
+    return "".join(profiler.track(command, lambda: result))
+
+
+def test_wall_times_kept_per_command_are_capped(monkeypatch):
+    monkeypatch.setattr(guyOS_core, "PROFILE_MAX_SAMPLES", 50)
+    profiler = CommandProfiler()
+    for _ in range(500):
+        run(profiler, "ls")
+    run(profiler, "pwd")
+    samples = profiler.samples["ls"]
+    assert samples.count == 500 and len(samples.walls) == 50
+    assert samples.max_wall >= max(samples.walls)
+    lines = profiler.summary().split("\n")
+    assert lines[1].split()[:2] == ["ls", "500"]
+    assert lines[2].split()[:2] == ["pwd", "1"]
+
+
+def test_summary_while_other_sessions_record(monkeypatch):
+    monkeypatch.setattr(guyOS_core, "PROFILE_MAX_SAMPLES", 100)
+    profiler = CommandProfiler()
+    done = threading.Event()
+    errors = []
+
+    def session(n):
+        for i in range(2000):
+            run(profiler, f"cmd{(n + i) % 40}")
+
+    def reader():
+        while not done.is_set():
+            try:
+                profiler.summary()
+            except Exception as e:
+                errors.append(e)
+
+    sessions = [threading.Thread(target=session, args=(n,)) for n in range(4)]
+    watcher = threading.Thread(target=reader)
+    watcher.start()
+    for thread in sessions:
+        thread.start()
+    for thread in sessions:
+        thread.join()
+    done.set()
+    watcher.join()
+    assert errors == []
+    assert sum(samples.count for samples in profiler.samples.values()) == 8000
+    assert all(len(samples.walls) <= 100 for samples in profiler.samples.values())
+
+
+def test_no_commands():
+    assert CommandProfiler().summary() == "No commands recorded yet"
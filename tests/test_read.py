@@ -0,0 +1,77 @@
+import pytest
+
+import guyOS_core
+from guyOS_core import _tail_lines, guyOS
+
+TEXT = "".join(f"line {i} {'x' * (i % 50)}\n" for i in range(1, 5001))
+
+
+@pytest.fixture
+def shell(tmp_path):
+    shell = guyOS()
+    shell.current_dir = str(tmp_path)
+    return shell
+
+
+@pytest.fixture
+def log(tmp_path):
+    path = tmp_path / "log.txt"
+    path.write_text(TEXT)
+    return path
+
+
+def body(output):
+    """Output of read without its header line"""
+    return output.split("-" * 30 + "\n", 1)[1]
+
+
+def test_plain_read_streams_the_whole_file_in_blocks(shell, log):
+    chunks = list(shell._read_chunks(".", "log.txt"))
+    assert chunks[0] == f"Content of log.txt:\n{'-' * 30}\n"
+    assert "".join(chunks[1:]) == TEXT
+    assert max(len(chunk) for chunk in chunks) <= guyOS_core.READ_BLOCK_SIZE
+    assert shell.read(".", "log.txt") == "".join(chunks)
+
+
+@pytest.mark.parametrize("count", [0, 1, 3, 4999, 5000, 6000])
+def test_head_and_tail(shell, log, count):
+    lines = TEXT.splitlines(keepends=True)
+    head = shell.read("-head", ".", "log.txt", str(count))
+    tail = shell.read("-tail", ".", "log.txt", str(count))
+    assert head.startswith(f"First {min(count, 5000)} lines of log.txt:")
+    assert body(head) == "".join(lines[:count])
+    assert tail.startswith(f"Last {min(count, 5000)} lines of log.txt:")
+    assert body(tail) == "".join(lines[-count:] if count else [])
+
+
+@pytest.mark.parametrize("start, end, expected", [(1, 3, (0, 3)), (4998, 5010, (4997, 5000)),
+                                                  (0, 2, (0, 2)), (10, 5, (9, 9)), (6000, 6001, (5000, 5000))])
+def test_lines(shell, log, start, end, expected):
+    lines = TEXT.splitlines(keepends=True)
+    output = shell.read("-lines", ".", "log.txt", str(start), str(end))
+    assert body(output) == "".join(lines[expected[0]:expected[1]])
+
+
+@pytest.mark.parametrize("data, count, expected", [
+    (b"a\nb\nc\n", 2, ["b\n", "c\n"]),
+    (b"a\nb\nc", 2, ["b\n", "c"]),
+    (b"a\r\nb\r\n", 5, ["a\n", "b\n"]),
+    (b"\n\n\n", 2, ["\n", "\n"]),
+    (b"", 3, []),
+    (b"no newline", 1, ["no newline"]),
+])
+def test_tail_lines_across_small_blocks(tmp_path, data, count, expected):
+    path = tmp_path / "f.txt"
+    path.write_bytes(data)
+    for block_size in (1, 2, 3, 1024):
+        assert _tail_lines(str(path), count, block_size=block_size) == expected
+
+
+def test_read_errors(shell, tmp_path, log):
+    (tmp_path / "dir").mkdir()
+    assert shell.read(".", "missing.txt") == "Error: File 'missing.txt' not found"
+    assert shell.read(".", "dir") == "Error: 'dir' is not a file"
+    assert shell.read("-tail", ".", "log.txt", "x") == "Error: Number of lines must be an integer"
+    assert shell.read("-lines", ".", "log.txt", "1", "x") == "Error: Line numbers must be integers"
+    assert shell.read("-head", ".", "log.txt").startswith("Usage:")
+    assert shell.read(".").startswith("Usage:")
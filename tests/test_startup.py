@@ -0,0 +1,60 @@
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+import guyOS_core
+from guyOS_core import HELP_TEXT, LAUNCHER, guyOS
+
+# Modules that only the commands needing them may import
+LAZY_IMPORTS = ["argparse", "asyncio", "json", "mmap", "re", "sqlite3", "subprocess", "tempfile"]
+
+
+@pytest.fixture
+def plugins(monkeypatch):
+    """Start from no loaded plugins, whatever earlier tests loaded"""
+    monkeypatch.setattr(guyOS_core, "_plugin_commands", {})
+    monkeypatch.setattr(guyOS_core, "_plugins_loaded", False)
+
+
+def test_the_launcher_reaches_the_prompt_and_exits(tmp_path):
+    for argv, env in (([sys.executable, LAUNCHER], None),
+                      ([sys.executable, "-m", "guyOS"], dict(os.environ, PYTHONPATH=os.path.dirname(LAUNCHER)))):
+        result = subprocess.run(argv, input="pwd\nexit\n", capture_output=True, text=True,
+                                cwd=tmp_path, env=env, timeout=60)
+        assert result.returncode == 0
+        assert "Welcome to guyOS!" in result.stdout and str(tmp_path) in result.stdout
+
+
+def test_importing_the_shell_leaves_heavy_modules_unloaded():
+    code = ("import sys, guyOS_core; guyOS_core.guyOS(); "
+            f"print(' '.join(m for m in {LAZY_IMPORTS!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=60,
+                            env=dict(os.environ, PYTHONPATH=os.path.dirname(LAUNCHER)))
+    assert result.returncode == 0 and result.stdout.strip() == ""
+
+
+def test_help_documents_every_command():
+    documented = {match.group(1) for match in re.finditer(r"^(\w+)\b", HELP_TEXT, re.MULTILINE)}
+    # exit is handled by the prompt loop and batch runner, not the command table
+    assert documented - {"guyOS", "exit"} == set(guyOS().commands)
+
+
+def test_plugins_add_commands_and_help_lines(tmp_path, monkeypatch, plugins, capsys):
+    plugin = tmp_path / "hello_plugin.py"
+    plugin.write_text("def register(register_command):\n"
+                      "    register_command('hello', lambda shell, args: 'Hello ' + ' '.join(args),\n"
+                      "                     'hello {name}             - Say hello')\n"
+                      "    register_command('ls', lambda shell, args: 'replaced')\n")
+    broken = tmp_path / "broken_plugin.py"
+    broken.write_text("raise ImportError('missing dependency')\n")
+    monkeypatch.setenv("GUYOS_PLUGINS", os.pathsep.join([str(plugin), str(broken)]))
+    shell = guyOS()
+    shell.current_dir = str(tmp_path)
+    assert "".join(shell.execute("hello", ["world"])) == "Hello world"
+    assert shell.help().endswith("Plugin commands:\nhello {name}             - Say hello")
+    # Built-in commands cannot be replaced
+    assert "".join(shell.execute("ls", [])) != "replaced"
+    assert "Cannot load plugin" in capsys.readouterr().err
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from guyOS_core import TextIndex, guyOS
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "a.txt").write_text("The quick brown fox\njumps over\nthe lazy dog\n")
+    (tmp_path / "b.txt").write_text("a brown dog\nQUICK thinking\n")
+    (tmp_path / "blob.bin").write_bytes(b"\0quick brown fox\n")
+    return tmp_path
+
+
+@pytest.fixture
+def shell(tree):
+    shell = guyOS()
+    shell.current_dir = str(tree)
+    assert shell.index().startswith("Indexed 2 files")
+    return shell
+
+
+def test_search_needs_every_word_on_the_line(shell):
+    assert shell.search("quick") == "b.txt:2:QUICK thinking\n" + os.path.join("docs", "a.txt") + ":1:The quick brown fox"
+    assert shell.search("brown", "dog") == "b.txt:1:a brown dog"
+    assert shell.search("fox", "dog") == "No matches found"
+    assert shell.search("the", "--limit", "1") == os.path.join("docs", "a.txt") + ":1:The quick brown fox"
+
+
+def test_reindexing_only_reads_changed_files(shell, tree):
+    assert shell.index().startswith(f"Indexed 0 files in {tree} (2 unchanged, 0 removed)")
+    (tree / "b.txt").write_text("nothing here\n")
+    (tree / "docs" / "a.txt").unlink()
+    output = shell.index()
+    assert output.startswith(f"Indexed 1 files in {tree} (0 unchanged, 1 removed)")
+    assert shell.search("quick") == "No matches found"
+    assert shell.search("nothing") == "b.txt:1:nothing here"
+    assert shell.index("--rebuild").startswith("Indexed 1 files")
+
+
+def test_writes_through_guyos_update_the_index(shell, tree):
+    shell.write("-add", ".", "b.txt", "zebra crossing")
+    assert shell.search("zebra") == "b.txt:4:zebra crossing"
+    shell.write("-line", ".", "b.txt", "1", "a grey dog")
+    assert shell.search("brown") == os.path.join("docs", "a.txt") + ":1:The quick brown fox"
+    assert shell.search("grey") == "b.txt:1:a grey dog"
+    shell.write(".", "c.txt", "new file with zebra")
+    assert shell.search("zebra").split("\n") == ["b.txt:4:zebra crossing", "c.txt:1:new file with zebra"]
+
+
+def test_subdirectories_search_the_nearest_indexed_parent(shell, tree):
+    shell.current_dir = str(tree / "docs")
+    assert shell.search("lazy") == "a.txt:3:the lazy dog"
+
+
+def test_the_index_persists_across_processes(shell, tree, monkeypatch):
+    monkeypatch.setattr(TextIndex, "_roots", None)
+    monkeypatch.setattr(TextIndex, "_open", {})
+    assert shell.search("lazy") == os.path.join("docs", "a.txt") + ":3:the lazy dog"
+
+
+def test_search_errors(tmp_path):
+    shell = guyOS()
+    shell.current_dir = str(tmp_path)
+    assert shell.search("x") == "Error: No index for this directory (run 'index' first)"
+    assert shell.search().startswith("Usage:")
+    assert shell.search("x", "--limit", "many") == "Error: Limit must be an integer"
+    assert shell.index("--fast") == "Usage: index [--rebuild]"
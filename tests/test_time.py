@@ -0,0 +1,68 @@
+import os
+import re
+
+import pytest
+
+from guyOS_core import guyOS
+
+
+@pytest.fixture
+def shell(tmp_path):
+    shell = guyOS()
+    shell.current_dir = str(tmp_path)
+    (tmp_path / "log.txt").write_text("one two\nthree\n" * 1000)
+    for i in range(5):
+        (tmp_path / f"f{i}.txt").write_text("x")
+    return shell
+
+
+def run(shell, line):
+    command, *args = line.split()
+    return "".join(shell._measured(command, args, shell.commands.get(command)))
+
+
+def report(output):
+    """The '[time] ...' line of output, as a dict of its figures"""
+    last = output.rsplit("\n", 1)[1]
+    assert last.startswith("[time] ")
+    name, figures = last[len("[time] "):].split(": ", 1)
+    return name, {re.sub(r"[\d.]+( [KMG]?B| ms)?", "", part).strip(): part for part in figures.split(", ")}
+
+
+def test_time_reports_after_the_output_of_the_command(shell):
+    output = run(shell, "time read -count . log.txt")
+    assert output.startswith("File statistics for log.txt:\nLines: 2000\nWords: 3000\n")
+    name, figures = report(output)
+    assert name == "read"
+    assert {"wall", "cpu", "peak memory"} <= set(figures)
+    # -count searches the file through mmap, which the syscall counters cannot see
+    assert figures["mmap read"] == "mmap read 13.7 KB"
+
+
+def test_time_counts_the_files_stated(shell):
+    _, figures = report(run(shell, "time ls"))
+    stated = int(figures["files stat'ed"].split()[0])
+    assert stated >= 6
+
+
+def test_os_stat_is_restored_after_time(shell):
+    stat, lstat = os.stat, os.lstat
+    run(shell, "time ls")
+    run(shell, "time read . missing.txt")
+    assert (os.stat, os.lstat) == (stat, lstat)
+
+
+def test_timed_commands_are_recorded_under_their_own_name(shell):
+    run(shell, "time pwd")
+    run(shell, "pwd")
+    run(shell, "ls")
+    assert sorted(shell.profiler.samples) == ["ls", "pwd"]
+    assert shell.profiler.samples["pwd"].count == 2
+    table = run(shell, "stats").split("\n")
+    assert table[0].split() == ["command", "count", "p50", "ms", "p90", "ms", "p99", "ms", "max", "ms", "cpu", "ms"]
+    # stats is recorded once its own output is done
+    assert [row.split()[:2] for row in table[1:]] == [["ls", "1"], ["pwd", "2"]]
+
+
+def test_time_usage(shell):
+    assert run(shell, "time") == "Usage: time {command} [args]"
@@ -0,0 +1,76 @@
+import os
+import stat
+
+import pytest
+
+import guyOS_core
+from guyOS_core import _rewrite_file, guyOS
+
+
+@pytest.fixture
+def shell(tmp_path):
+    shell = guyOS()
+    shell.current_dir = str(tmp_path)
+    return shell
+
+
+def test_rewrite_file_joins_bytes_and_short_and_long_ranges(tmp_path):
+    data = bytes(range(256)) * (3 * guyOS_core.REWRITE_COPY_MIN // 256)
+    path = tmp_path / "f.bin"
+    path.write_bytes(data)
+    long = guyOS_core.REWRITE_COPY_MIN
+    pieces = [b"head", (0, 10), (5, 0), b"", (100, long), b"mid" * 1000, (10, long + 7), (len(data) - 3, 3)]
+    expected = b"head" + data[:10] + data[100:100 + long] + b"mid" * 1000 + data[10:long + 17] + data[-3:]
+    _rewrite_file(str(path), iter(pieces))
+    assert path.read_bytes() == expected
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".tmp")] == []
+
+
+@pytest.mark.parametrize("old, new", [("INFO", "INFORMATION"), ("INFO", "WARN"), ("INFO", ""),
+                                      ("O\nl", "O l"), ("\n", "\r\n")])
+def test_replace_matches_bytes_replace(shell, tmp_path, old, new):
+    data = b"".join(b"line %d INFO%s\n" % (i, b"INFO" * (i % 3)) for i in range(5000))
+    path = tmp_path / "log.txt"
+    path.write_bytes(data)
+    assert "replaced" in shell.write("-replace", ".", "log.txt", old, new)
+    assert path.read_bytes() == data.replace(old.encode(), new.encode())
+
+
+def test_replace_reports_missing_text(shell, tmp_path):
+    (tmp_path / "log.txt").write_bytes(b"abc\n")
+    assert shell.write("-replace", ".", "log.txt", "zz", "y") == "Text 'zz' not found in 'log.txt'"
+    assert shell.write("-replace", ".", "none.txt", "zz", "y").startswith("Error:")
+
+
+@pytest.mark.parametrize("args, expected", [
+    (("-line", "2", "B"), b"a\nB\nc"),
+    (("-line", "3", "C"), b"a\nb\nC\n"),
+    (("-line", "5", "E"), b"a\nb\nc\n\nE\n"),
+    (("-insert", "1", "zero"), b"zero\na\nb\nc"),
+    (("-insert", "3", "x"), b"a\nb\nx\nc"),
+    (("-insert", "5", "y"), b"a\nb\nc\n\ny\n"),
+])
+def test_line_edits(shell, tmp_path, args, expected):
+    path = tmp_path / "f.txt"
+    path.write_bytes(b"a\nb\nc")
+    assert "successfully" in shell.write(args[0], ".", "f.txt", *args[1:])
+    assert path.read_bytes() == expected
+
+
+def test_line_edits_keep_crlf_line_endings(shell, tmp_path):
+    path = tmp_path / "f.txt"
+    path.write_bytes(b"a\r\nb\r\n")
+    shell.write("-line", ".", "f.txt", "1", "A")
+    shell.write("-insert", ".", "f.txt", "2", "x")
+    assert path.read_bytes() == b"A\r\nx\r\nb\r\n"
+
+
+def test_rewrites_go_through_symlinks_and_keep_the_mode(shell, tmp_path):
+    target = tmp_path / "target.txt"
+    target.write_bytes(b"one\ntwo\n")
+    target.chmod(0o640)
+    (tmp_path / "link.txt").symlink_to(target)
+    shell.write("-replace", ".", "link.txt", "one", "three")
+    assert os.path.islink(tmp_path / "link.txt")
+    assert target.read_bytes() == b"three\ntwo\n"
+    assert stat.S_IMODE(target.stat().st_mode) == 0o640